@@ -3,24 +3,75 @@
 FastAPI application for the RAG system.
 """
 
+import asyncio
+import json
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Awaitable, Optional, TypeVar
 
-from fastapi import FastAPI, HTTPException, Request, APIRouter
+import anyio
+from fastapi import FastAPI, HTTPException, Request, Response, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
-from src.core.rag_pipeline import answer_question
+from src.core.rag_pipeline import (
+    admission,
+    answer_cache,
+    answer_flights,
+    answer_question_async,
+    astream_answer,
+    chain_manager,
+    context_packer,
+    embedding_cache_stats,
+    intent_router,
+    stream_flights
+)
 from src.backend.api import tts
+from src.core.metrics import MetricsMiddleware, registry
+from src.core.ollama_http import pool as ollama_pool
+from src.core.tracing import TraceLogging, TracingMiddleware, annotate
+
+T = TypeVar("T")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the shared RAG chain once at startup so requests never rebuild it.
+
+    A missing or broken index does not stop the server; the failure is reported
+    on /health and the chain is retried lazily on the next question. The TTS
+    workers start loading their models in the background, and with several
+    Ollama backends their health is probed in the background too.
+    """
+    trace_logging = TraceLogging()
+    trace_logging.start()
+    if os.environ.get("TTS_PRELOAD", "true").lower() == "true":
+        tts.tts_pool.start()
+    if ollama_pool.backends is not None:
+        ollama_pool.backends.start()
+    try:
+        await asyncio.to_thread(chain_manager.load)
+    except Exception as e:
+        print(f"Warning: RAG chain not ready at startup: {e}")
+    yield
+    chain_manager.reset()
+    await ollama_pool.aclose()
+    if ollama_pool.backends is not None:
+        ollama_pool.backends.stop()
+    tts.tts_pool.shutdown()
+    trace_logging.stop()
+
 
 app = FastAPI(
     title="Personal Skills RAG System",
     description="A RAG system that answers questions about my skills and experience",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Register the TTS router with prefix /api so /api/tts is available
@@ -71,6 +122,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Requests in flight, and per-route request counts and durations, for /metrics
+app.add_middleware(MetricsMiddleware)
+# A sampled trace of stage timings per API request, plus Server-Timing headers
+app.add_middleware(TracingMiddleware)
+
 
 # Define request model
 class QuestionRequest(BaseModel):
@@ -97,12 +153,98 @@ async def read_root(request: Request):
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint, including the readiness of the shared RAG chain."""
+    rag_status = chain_manager.status()
+    return {
+        "status": "healthy",
+        "ready": rag_status["ready"],
+        "rag_chain": rag_status,
+        "answer_cache": answer_cache.stats(),
+        "embedding_cache": embedding_cache_stats(),
+        "context_packing": context_packer.stats(),
+        "intent_router": intent_router.stats(),
+        "coalescing": {"answers": answer_flights.stats(), "streams": stream_flights.stats()},
+        "admission": admission.stats(),
+        "ollama_http": ollama_pool.stats(),
+        "tts": tts.tts_pool.stats(),
+        "tts_cache": tts.audio_cache.stats()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics: per-stage pipeline latencies, TTS, caches and requests in flight."""
+    return PlainTextResponse(registry.render(), media_type=registry.CONTENT_TYPE)
 
 
 api_router = APIRouter()
 
+
+async def unless_disconnected(request: Request, awaitable: Awaitable[T]) -> Optional[T]:
+    """
+    Await something, giving up as soon as the client disconnects.
+    
+    Args:
+        request (Request): The request, whose body has been read already
+        awaitable (Awaitable[T]): What to wait for; cancelled if the client leaves
+    
+    Returns:
+        Optional[T]: Its result, or None if the client left
+    """
+    async def wait_for_disconnect():
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+    
+    work = asyncio.ensure_future(awaitable)
+    disconnect = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await asyncio.wait({work, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+        if not work.done():
+            work.cancel()
+    if not work.done():
+        await asyncio.gather(work, return_exceptions=True)
+        annotate(client_disconnected=True)
+        return None
+    return work.result()
+
+
+async def answer_unless_disconnected(request: Request, query: str) -> Optional[Dict[str, Any]]:
+    """
+    Answer a question, giving up as soon as the client disconnects.
+
+    Cancelling the answer takes a question that is still waiting for an
+    admission slot out of the queue, and stops a generation in progress
+    unless other requests share it.
+    
+    Args:
+        request (Request): The request, whose body has been read already
+        query (str): The question to answer
+    
+    Returns:
+        Optional[Dict[str, Any]]: The result of answer_question_async, or None if the client left
+    """
+    return await unless_disconnected(request, answer_question_async(query))
+
+
+def busy_response(content: Any, result: Dict[str, Any]) -> JSONResponse:
+    """
+    Respond to a question the admission controller turned away.
+    
+    Args:
+        content (Any): Response body in the endpoint's format
+        result (Dict[str, Any]): Result carrying ``status_code`` (429 or 503) and ``retry_after``
+    
+    Returns:
+        JSONResponse: The response, with a ``Retry-After`` header
+    """
+    return JSONResponse(
+        status_code=result["status_code"],
+        content=content,
+        headers={"Retry-After": str(result["retry_after"])}
+    )
+
 @api_router.post("/ask")
 async def ask(request: Request):
     """
@@ -127,10 +269,14 @@ async def ask(request: Request):
                 )
             )
             
-        print(f"API received question: {query}")
-        
         # Get the answer from the RAG pipeline
-        result = answer_question(query)
+        result = await answer_unless_disconnected(request, query)
+        if result is None:
+            # Nobody is listening any more
+            return Response(status_code=499)
+        
+        if "retry_after" in result:
+            return busy_response(create_response(status="error", data={}, message=result["answer"]), result)
         
         if not result["success"]:
             # Check if we have error details for debugging
@@ -149,8 +295,6 @@ async def ask(request: Request):
                 )
             )
             
-        print(f"Successfully generated answer of length: {len(result['answer'])}")
-        
         return JSONResponse(
             status_code=200,
             content=create_response(
@@ -182,11 +326,115 @@ async def ask(request: Request):
             )
         )
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format a Server-Sent Events message.
+    
+    Args:
+        event (str): Event name
+        data (Dict[str, Any]): JSON-serialisable payload
+    
+    Returns:
+        str: The encoded SSE message
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _replay_first(first: Dict[str, Any], events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    # An answer stream whose first event was already read
+    try:
+        yield first
+        async for event in events:
+            yield event
+    finally:
+        await events.aclose()
+
+
+async def sse_answer_events(
+    request: Request, query: str, events: Optional[AsyncIterator[Dict[str, Any]]] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the answer to a query as SSE messages until done or the client disconnects.
+    
+    Args:
+        request (Request): The request, polled for client disconnects
+        query (str): The question to answer
+        events (Optional[AsyncIterator[Dict[str, Any]]]): Its answer stream if already opened, else one is opened
+    
+    Yields:
+        str: Encoded ``token``, ``done`` or ``error`` SSE messages
+    """
+    events = astream_answer(query) if events is None else events
+    try:
+        async for event in events:
+            if await request.is_disconnected():
+                annotate(client_disconnected=True)
+                break
+            # Events are shared by the streams coalesced on one generation; not modified
+            data = {key: value for key, value in event.items() if key != "type"}
+            yield format_sse(event["type"], data)
+    finally:
+        # Runs on cancellation too; closing the stream stops the Ollama generation
+        with anyio.CancelScope(shield=True):
+            await events.aclose()
+
+
+@api_router.post("/ask/stream")
+async def ask_stream(request: Request):
+    """
+    Endpoint to ask a question and receive the answer as Server-Sent Events.
+    
+    Emits ``token`` events with text as it is generated, then a ``done`` event
+    with metadata (including ``time_to_first_token_ms``) or an ``error`` event.
+    
+    Args:
+        request (Request): The request object
+        
+    Returns:
+        StreamingResponse: A ``text/event-stream`` response
+    """
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    query = data.get("query", "") if isinstance(data, dict) else ""
+    if not query or query.strip() == "":
+        return JSONResponse(
+            status_code=200,  # Always return 200 for frontend compatibility
+            content=create_response(
+                status="error",
+                data={},
+                message="Query cannot be empty"
+            )
+        )
+    
+    # Wait for the first event before answering, so a question the admission
+    # controller turns away gets a 429 or 503 rather than a 200 stream. Cached
+    # answers and streams joining one in flight are never turned away.
+    events = astream_answer(query)
+    first = await unless_disconnected(request, anext(events))
+    if first is None:
+        await events.aclose()
+        return Response(status_code=499)
+    if first["type"] == "error" and "retry_after" in first:
+        await events.aclose()
+        result = {"status_code": first["status_code"], "retry_after": first["retry_after"]}
+        return busy_response(create_response(status="error", data={}, message=first["message"]), result)
+    
+    return StreamingResponse(
+        sse_answer_events(request, query, _replay_first(first, events)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.post("/chat")
 async def chat(request: Request):
     """
     Endpoint for the chat interface.
     
+    Failures are answered with a 200 like successes, for the chat UI, and
+    carry ``"status": "error"``.
+    
     Args:
         request (Request): The request object
         
@@ -204,11 +452,17 @@ async def chat(request: Request):
             )
             
         # Process the query through the RAG pipeline
-        result = answer_question(query)
+        result = await answer_unless_disconnected(request, query)
+        if result is None:
+            return Response(status_code=499)
+        
+        if "retry_after" in result:
+            return busy_response({"response": result["answer"]}, result)
         
         if not result["success"]:
+            # Still a 200 for the chat UI; ``status`` tells clients it failed
             return JSONResponse(
-                content={"response": result["answer"] or "I couldn't process that query."}
+                content={"response": result["answer"] or "I couldn't process that query.", "status": "error"}
             )
             
         return JSONResponse(
@@ -217,7 +471,7 @@ async def chat(request: Request):
     except Exception as e:
         print(f"Error in chat endpoint: {str(e)}")
         return JSONResponse(
-            content={"response": f"An error occurred: {str(e)}"}
+            content={"response": f"An error occurred: {str(e)}", "status": "error"}
         )
 
 # Register the API router with prefix /api
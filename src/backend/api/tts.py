@@ -1,29 +1,31 @@
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Literal, Optional
 import asyncio
-import tempfile
-from TTS.api import TTS
-import os
 import logging
+import time
+
+from src.backend.audio import read_wav, wav_header
+from src.backend.audio_cache import AudioCache, audio_cache_key, is_audio_cache_key
+from src.backend.tts_pool import TTS_MODEL_NAME, TTSQueueFull, TTSWorkerPool
+from src.core.metrics import TTS_AUDIO_SECONDS, TTS_REQUESTS, TTS_SYNTHESIS_SECONDS, registry, wav_duration
 
 router = APIRouter()
 
 # Set up logger
 logger = logging.getLogger("tts_api")
 
-tts_model = None
+# Worker threads with preloaded models; started at API startup or on first use
+tts_pool = TTSWorkerPool.from_env()
+# Synthesized audio on disk, so repeated texts are a file read
+audio_cache = AudioCache.from_env()
 
-def get_tts_model() -> TTS:
-    """
-    Lazily load and return the Coqui TTS model.
-    Returns:
-        TTS: Coqui TTS model instance
-    """
-    global tts_model
-    if tts_model is None:
-        tts_model = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False, gpu=os.environ.get("TTS_USE_GPU", "false").lower() == "true")
-    return tts_model
+registry.callback_gauge("tts_workers_busy", "TTS workers synthesizing now.", lambda: tts_pool.stats()["busy"])
+registry.callback_gauge("tts_queue_depth", "TTS jobs waiting for a worker.", lambda: tts_pool.stats()["queued"])
+registry.callback_gauge(
+    "tts_audio_cache_hit_ratio", "Share of audio cache lookups that were hits.", lambda: audio_cache.stats()["hit_rate"]
+)
 
 def create_response(status: str, data: Any, message: str) -> Dict[str, Any]:
     """
@@ -40,17 +42,56 @@ def create_response(status: str, data: Any, message: str) -> Dict[str, Any]:
 class TTSRequest(BaseModel):
     text: str
 
+class TTSStreamRequest(BaseModel):
+    text: str
+    format: Literal["wav", "pcm"] = "wav"
+
 class TTSResponse(BaseModel):
     status: str
     data: Dict[str, Any]
     message: str
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against an ETag.
+    Args:
+        if_none_match: Header value, possibly a list or ``*``
+        etag: Quoted strong ETag of the resource
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+async def synthesize(text: str) -> bytes:
+    """Synthesize a WAV file on the worker pool, recording synthesis time and audio length."""
+    with TTS_SYNTHESIS_SECONDS.time(endpoint="tts"):
+        audio_bytes = await tts_pool.synthesize(text)
+    TTS_AUDIO_SECONDS.inc(wav_duration(audio_bytes))
+    return audio_bytes
+
+def cached_audio_headers(key: str) -> Dict[str, str]:
+    """Headers for audio served from the cache; the key doubles as a strong ETag."""
+    return {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, max-age=86400",
+        "Content-Location": f"/api/tts/audio/{key}",
+        "Content-Disposition": "inline; filename=output.wav",
+    }
+
 @router.post("/tts", response_class=Response, tags=["TTS"], summary="Convert text to speech (Coqui TTS)")
-async def text_to_speech(request: TTSRequest) -> Response:
+async def text_to_speech(request: TTSRequest, if_none_match: Optional[str] = Header(None)) -> Response:
     """
     Convert text to speech using Coqui TTS and return audio as WAV.
+
+    Audio is cached on disk per text and model: repeats are served from the
+    file with an ``ETag`` (``If-None-Match`` gives 304) and ``Range``
+    support, and concurrent requests for the same text share one synthesis.
     Args:
         request: TTSRequest with text to convert
+        if_none_match: ETag of the client's cached copy
     Returns:
         WAV audio bytes in a standardized API response
     """
@@ -58,16 +99,140 @@ async def text_to_speech(request: TTSRequest) -> Response:
         error = create_response("error", {}, "Text is required for TTS.")
         return Response(content=str(error), media_type="application/json", status_code=400)
     try:
-        tts = get_tts_model()
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
-            tts.tts_to_file(text=request.text, file_path=tmp.name)
-            tmp.seek(0)
-            audio_bytes = tmp.read()
         headers = {"Content-Disposition": "inline; filename=output.wav"}
         headers["X-API-Status"] = "success"
         headers["X-API-Message"] = "Audio generated successfully."
-        return Response(content=audio_bytes, media_type="audio/wav", headers=headers)
+        if not audio_cache.enabled:
+            audio_bytes = await synthesize(request.text)
+            TTS_REQUESTS.inc(endpoint="tts", outcome="ok")
+            return Response(content=audio_bytes, media_type="audio/wav", headers=headers)
+        key = audio_cache_key(request.text, model=TTS_MODEL_NAME)
+        headers.update(cached_audio_headers(key))
+        if etag_matches(if_none_match, headers["ETag"]) and key in audio_cache:
+            TTS_REQUESTS.inc(endpoint="tts", outcome="not_modified")
+            return Response(status_code=304, headers={"ETag": headers["ETag"]})
+        path = await audio_cache.get_or_create(key, lambda: synthesize(request.text))
+        TTS_REQUESTS.inc(endpoint="tts", outcome="ok")
+        return FileResponse(path, media_type="audio/wav", headers=headers)
+    except TTSQueueFull as e:
+        TTS_REQUESTS.inc(endpoint="tts", outcome="rejected")
+        logger.warning("TTS request rejected: queue is full")
+        error = create_response("error", {}, "TTS is busy, please retry shortly.")
+        return Response(content=str(error), media_type="application/json", status_code=503,
+                        headers={"Retry-After": str(e.retry_after)})
+    except asyncio.TimeoutError:
+        TTS_REQUESTS.inc(endpoint="tts", outcome="timeout")
+        logger.error("TTS generation timed out")
+        error = create_response("error", {}, "TTS generation took too long.")
+        return Response(content=str(error), media_type="application/json", status_code=504)
     except Exception as e:
+        TTS_REQUESTS.inc(endpoint="tts", outcome="error")
         logger.error(f"TTS generation failed: {e}")
         error = create_response("error", {}, f"TTS generation failed: {str(e)}")
         return Response(content=str(error), media_type="application/json", status_code=500)
+
+
+@router.get("/tts/audio/{key}", response_class=FileResponse, tags=["TTS"], summary="Fetch cached speech audio")
+async def cached_audio(key: str, if_none_match: Optional[str] = Header(None)) -> Response:
+    """
+    Serve previously synthesized audio by cache key, with ``ETag`` and ``Range`` support.
+    Args:
+        key: Cache key, as returned in the ``Content-Location`` header of ``/api/tts``
+        if_none_match: ETag of the client's cached copy
+    Returns:
+        The WAV file, 304 if the client's copy is current, or 404
+    """
+    path = audio_cache.get(key) if is_audio_cache_key(key) else None
+    if path is None:
+        error = create_response("error", {}, "Audio not found.")
+        return Response(content=str(error), media_type="application/json", status_code=404)
+    headers = cached_audio_headers(key)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers={"ETag": headers["ETag"]})
+    return FileResponse(path, media_type="audio/wav", headers=headers)
+
+
+@router.post("/tts/stream", response_class=StreamingResponse, tags=["TTS"], summary="Stream speech sentence by sentence (Coqui TTS)")
+async def text_to_speech_stream(request: TTSStreamRequest) -> Response:
+    """
+    Convert text to speech one sentence at a time and stream the audio as it is produced.
+
+    ``wav`` streams a WAV file whose header declares an unknown length; ``pcm``
+    streams raw 16-bit mono little-endian PCM, with the sample rate in the
+    ``X-Sample-Rate`` header, for players that schedule the frames themselves.
+    Args:
+        request: TTSStreamRequest with text to convert and the stream format
+    Returns:
+        Chunked audio response, or a standardized error response
+    """
+    if not request.text or not request.text.strip():
+        error = create_response("error", {}, "Text is required for TTS.")
+        return Response(content=str(error), media_type="application/json", status_code=400)
+    key = audio_cache_key(request.text, model=TTS_MODEL_NAME)
+    path = audio_cache.get(key)
+    if path is not None:
+        TTS_REQUESTS.inc(endpoint="stream", outcome="ok")
+        headers = cached_audio_headers(key)
+        if request.format == "wav":
+            return FileResponse(path, media_type="audio/wav", headers=headers)
+        data = await asyncio.to_thread(path.read_bytes)
+        sample_rate, pcm = read_wav(data)
+        headers["X-Sample-Rate"] = str(sample_rate)
+        return Response(content=pcm, media_type=f"audio/L16; rate={sample_rate}; channels=1", headers=headers)
+    started = time.perf_counter()
+    try:
+        pieces = tts_pool.stream(request.text)
+        # Wait for the first sentence so failures still get a proper status code
+        sample_rate, first = await pieces.__anext__()
+    except StopAsyncIteration:
+        TTS_REQUESTS.inc(endpoint="stream", outcome="empty")
+        error = create_response("error", {}, "Text contains nothing to speak.")
+        return Response(content=str(error), media_type="application/json", status_code=400)
+    except TTSQueueFull as e:
+        TTS_REQUESTS.inc(endpoint="stream", outcome="rejected")
+        logger.warning("TTS stream rejected: queue is full")
+        error = create_response("error", {}, "TTS is busy, please retry shortly.")
+        return Response(content=str(error), media_type="application/json", status_code=503,
+                        headers={"Retry-After": str(e.retry_after)})
+    except asyncio.TimeoutError:
+        TTS_REQUESTS.inc(endpoint="stream", outcome="timeout")
+        logger.error("TTS stream timed out before the first sentence")
+        error = create_response("error", {}, "TTS generation took too long.")
+        return Response(content=str(error), media_type="application/json", status_code=504)
+    except Exception as e:
+        TTS_REQUESTS.inc(endpoint="stream", outcome="error")
+        logger.error(f"TTS streaming failed: {e}")
+        error = create_response("error", {}, f"TTS generation failed: {str(e)}")
+        return Response(content=str(error), media_type="application/json", status_code=500)
+
+    async def audio() -> AsyncIterator[bytes]:
+        try:
+            if request.format == "wav":
+                yield wav_header(sample_rate)
+            yield first
+            frames = [first]
+            async for _, pcm in pieces:
+                frames.append(pcm)
+                yield pcm
+            pcm = b"".join(frames)
+            TTS_SYNTHESIS_SECONDS.observe(time.perf_counter() - started, endpoint="stream")
+            # 16-bit mono
+            TTS_AUDIO_SECONDS.inc(len(pcm) / 2 / sample_rate)
+            TTS_REQUESTS.inc(endpoint="stream", outcome="ok")
+            if audio_cache.enabled:
+                await asyncio.to_thread(audio_cache.put, key, wav_header(sample_rate, len(pcm)) + pcm)
+        except Exception as e:
+            # Headers are sent already; the client sees a truncated stream
+            TTS_REQUESTS.inc(endpoint="stream", outcome="error")
+            logger.error(f"TTS streaming failed mid-stream: {e}")
+        finally:
+            await pieces.aclose()
+
+    media_type = "audio/wav" if request.format == "wav" else f"audio/L16; rate={sample_rate}; channels=1"
+    headers = {
+        "X-Sample-Rate": str(sample_rate),
+        "X-API-Status": "success",
+        "X-API-Message": "Audio streaming.",
+        "Cache-Control": "no-store",
+    }
+    return StreamingResponse(audio(), media_type=media_type, headers=headers)
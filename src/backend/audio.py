@@ -0,0 +1,107 @@
+"""
+Audio helpers for TTS: sentence splitting and in-memory PCM/WAV encoding.
+"""
+
+import io
+import re
+import struct
+import wave
+from typing import Any, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+SAMPLE_WIDTH = 2  # bytes per sample, 16-bit PCM
+CHANNELS = 1
+# Streamed WAV files do not know their length up front; players accept the maximum
+STREAMING_SIZE = 0xFFFFFFFF
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?;:])\s+|\n+")
+_SPEAKABLE_RE = re.compile(r"\w")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences to synthesize one at a time.
+    Args:
+        text: Text to speak; lines (e.g. Markdown list items) count as sentences
+    Returns:
+        List[str]: Sentences containing something speakable, in order
+    """
+    return [part.strip() for part in _SENTENCE_RE.split(text) if _SPEAKABLE_RE.search(part)]
+
+
+def to_pcm16(samples: Sequence[float]) -> bytes:
+    """
+    Encode float samples in [-1, 1] as little-endian 16-bit PCM.
+    Args:
+        samples: Mono audio samples
+    Returns:
+        bytes: PCM frames
+    """
+    audio = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (audio * 32767).astype("<i2").tobytes()
+
+
+def wav_header(sample_rate: int, data_size: int = STREAMING_SIZE) -> bytes:
+    """
+    Build the 44-byte header of a mono 16-bit PCM WAV file.
+    Args:
+        sample_rate: Samples per second
+        data_size: Bytes of PCM data following the header; the default marks a stream of unknown length
+    Returns:
+        bytes: The header
+    """
+    riff_size = STREAMING_SIZE if data_size == STREAMING_SIZE else 36 + data_size
+    byte_rate = sample_rate * CHANNELS * SAMPLE_WIDTH
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, CHANNELS, sample_rate, byte_rate, CHANNELS * SAMPLE_WIDTH, SAMPLE_WIDTH * 8,
+        b"data", data_size,
+    )
+
+
+def read_wav(data: bytes) -> Tuple[int, bytes]:
+    """
+    Split a WAV file into its sample rate and PCM frames, whatever chunks its header holds.
+    Args:
+        data: WAV file contents
+    Returns:
+        Tuple[int, bytes]: Sample rate and PCM frames
+    Raises:
+        wave.Error: If the data is not a PCM WAV file
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        return wav.getframerate(), wav.readframes(wav.getnframes())
+
+
+def model_sample_rate(model: Any) -> int:
+    """Output sample rate of a Coqui TTS model."""
+    return int(model.synthesizer.output_sample_rate)
+
+
+def synthesize_wav(model: Any, text: str) -> bytes:
+    """
+    Synthesize text to a WAV file in memory with a loaded model.
+    Args:
+        model: Coqui TTS model instance
+        text: Text to speak
+    Returns:
+        bytes: The WAV file
+    """
+    pcm = to_pcm16(model.tts(text=text))
+    return wav_header(model_sample_rate(model), len(pcm)) + pcm
+
+
+def synthesize_sentences(model: Any, text: str) -> Iterator[Tuple[int, bytes]]:
+    """
+    Synthesize text one sentence at a time.
+    Args:
+        model: Coqui TTS model instance
+        text: Text to speak
+    Yields:
+        Tuple[int, bytes]: Sample rate and the PCM frames of one sentence
+    """
+    sample_rate = model_sample_rate(model)
+    for sentence in split_sentences(text):
+        yield sample_rate, to_pcm16(model.tts(text=sentence))
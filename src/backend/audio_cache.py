@@ -0,0 +1,225 @@
+"""
+Persistent, size-bounded cache of synthesized audio files.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("audio_cache")
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+AUDIO_CACHE_DIR = BASE_DIR / "data" / "tts_cache"
+# Bump when the audio encoding changes, so old files are no longer served
+AUDIO_FORMAT_VERSION = 1
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def normalize_text(text: str) -> str:
+    """Text as it is keyed in the cache: NFC-normalized with whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def audio_cache_key(text: str, **settings: Any) -> str:
+    """
+    Key of the audio for a text.
+    Args:
+        text: Text to speak
+        settings: Everything else that changes the audio, e.g. the model name
+    Returns:
+        str: Hex SHA-256 of the normalized text, settings and audio format version
+    """
+    payload = json.dumps(
+        {"text": normalize_text(text), "settings": settings, "format": AUDIO_FORMAT_VERSION},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_audio_cache_key(key: str) -> bool:
+    """True if ``key`` has the shape of a cache key (and is safe to use as a file name)."""
+    return bool(_KEY_RE.match(key))
+
+
+class AudioCache:
+    """
+    WAV files on disk, one per key, evicted least recently used first.
+
+    Recency survives restarts through file modification times, which are
+    refreshed on every hit. Concurrent requests for an uncached key share a
+    single synthesis.
+    """
+
+    def __init__(self, directory: Path = AUDIO_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024, enabled: bool = True):
+        """
+        Args:
+            directory: Directory holding the cached files
+            max_bytes: Maximum total size of the cached files
+            enabled: When False, nothing is cached and every request synthesizes
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "AudioCache":
+        """
+        Create a cache configured from ``TTS_CACHE_*`` environment variables.
+
+        Returns:
+            AudioCache: The configured cache; ``TTS_CACHE_MAX_MB=0`` disables it
+        """
+        max_mb = float(os.environ.get("TTS_CACHE_MAX_MB", "512"))
+        return cls(
+            directory=Path(os.environ.get("TTS_CACHE_DIR", str(AUDIO_CACHE_DIR))),
+            max_bytes=int(max_mb * 1024 * 1024),
+            enabled=max_mb > 0,
+        )
+
+    def _index(self) -> "OrderedDict[str, int]":
+        # Built on first use from the files on disk, oldest first; call with the lock held
+        if self._entries is None:
+            self._entries = OrderedDict()
+            self._bytes = 0
+            if self.directory.is_dir():
+                files = []
+                for path in self.directory.glob("*.wav"):
+                    if is_audio_cache_key(path.stem):
+                        stat = path.stat()
+                        files.append((stat.st_mtime, path.stem, stat.st_size))
+                for _, key, size in sorted(files):
+                    self._entries[key] = size
+                    self._bytes += size
+        return self._entries
+
+    def path(self, key: str) -> Path:
+        """File of a key, whether or not it is cached."""
+        return self.directory / f"{key}.wav"
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self.enabled and key in self._index()
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Look up cached audio and mark it as recently used.
+        Args:
+            key: Cache key
+        Returns:
+            Optional[Path]: The cached file, or None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entries = self._index()
+            if key not in entries:
+                self.misses += 1
+                return None
+            path = self.path(key)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Deleted behind our back
+                self._bytes -= entries.pop(key)
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """
+        Store audio, evicting the least recently used files beyond the size limit.
+        Args:
+            key: Cache key
+            data: WAV file contents
+        Returns:
+            Path: The cached file
+        """
+        path = self.path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            entries = self._index()
+            self._bytes += len(data) - entries.pop(key, 0)
+            entries[key] = len(data)
+            while self._bytes > self.max_bytes and len(entries) > 1:
+                old_key, size = entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                try:
+                    self.path(old_key).unlink()
+                except FileNotFoundError:
+                    pass
+        return path
+
+    async def get_or_create(self, key: str, produce: Callable[[], Awaitable[bytes]]) -> Path:
+        """
+        Return cached audio, producing and storing it on a miss.
+
+        Concurrent calls for the same uncached key wait for one ``produce``
+        call; its failure is raised to all of them.
+        Args:
+            key: Cache key
+            produce: Coroutine function synthesizing the WAV file
+        Returns:
+            Path: The cached file
+        """
+        path = self.get(key)
+        if path is not None:
+            return path
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._create(key, produce))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # One caller going away must not cancel the synthesis the others wait for
+        return await asyncio.shield(task)
+
+    async def _create(self, key: str, produce: Callable[[], Awaitable[bytes]]) -> Path:
+        data = await produce()
+        return await asyncio.to_thread(self.put, key, data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache usage.
+        Returns:
+            Dict[str, Any]: Size, hit and eviction counters
+        """
+        with self._lock:
+            entries = self._index() if self.enabled else {}
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight),
+                "evictions": self.evictions,
+            }
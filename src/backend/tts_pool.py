@@ -0,0 +1,299 @@
+"""
+TTS execution pool: worker threads holding preloaded Coqui models, fed from a bounded queue.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from src.backend.audio import synthesize_sentences, synthesize_wav
+
+logger = logging.getLogger("tts_pool")
+
+TTS_MODEL_NAME = os.environ.get("TTS_MODEL_NAME", "tts_models/en/ljspeech/tacotron2-DDC")
+WARMUP_TEXT = "Warming up."
+
+
+class TTSQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("TTS queue is full")
+        self.retry_after = retry_after
+
+
+def load_tts_model() -> Any:
+    """
+    Load a Coqui TTS model instance.
+    Returns:
+        TTS: Coqui TTS model instance
+    """
+    from TTS.api import TTS
+
+    return TTS(model_name=TTS_MODEL_NAME, progress_bar=False, gpu=os.environ.get("TTS_USE_GPU", "false").lower() == "true")
+
+
+class TTSWorkerPool:
+    """
+    Runs syntheses on dedicated worker threads, off the event loop.
+
+    Coqui models are not safe to share between threads, so each worker loads
+    its own model when it starts (optionally running a warm-up synthesis) and
+    keeps it for its lifetime. Requests wait in a bounded queue; when it is
+    full, ``synthesize`` and ``stream`` fail fast with ``TTSQueueFull`` instead
+    of letting work pile up. Requests whose caller timed out before a worker
+    picked them up are skipped.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = 8,
+        timeout: float = 120.0,
+        warmup: bool = False,
+        model_factory: Callable[[], Any] = load_tts_model,
+        synthesize_fn: Callable[[Any, str], bytes] = synthesize_wav,
+        stream_fn: Callable[[Any, str], Iterator[Tuple[int, bytes]]] = synthesize_sentences,
+    ):
+        """
+        Args:
+            workers: Worker threads, each holding one model
+            queue_size: Requests allowed to wait for a free worker
+            timeout: Default seconds a request may take, queueing included
+            warmup: Run a short synthesis on each worker after loading its model
+            model_factory: Loads one model
+            synthesize_fn: Synthesizes text with a model
+            stream_fn: Synthesizes text with a model piece by piece, yielding (sample rate, PCM)
+        """
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.warmup = warmup
+        self.model_factory = model_factory
+        self.synthesize_fn = synthesize_fn
+        self.stream_fn = stream_fn
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._threads: list = []
+        self._lock = threading.Lock()
+        self.ready_workers = 0
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.synthesis_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "TTSWorkerPool":
+        """
+        Create a pool configured from ``TTS_*`` environment variables.
+
+        Returns:
+            TTSWorkerPool: The configured pool
+        """
+        return cls(
+            workers=int(os.environ.get("TTS_WORKERS", "1")),
+            queue_size=int(os.environ.get("TTS_QUEUE_SIZE", "8")),
+            timeout=float(os.environ.get("TTS_TIMEOUT_SECONDS", "120")),
+            warmup=os.environ.get("TTS_WARMUP", "false").lower() == "true",
+        )
+
+    @property
+    def started(self) -> bool:
+        """True once the worker threads are running."""
+        return bool(self._threads)
+
+    def start(self) -> None:
+        """Start the workers; each loads its model in the background. Idempotent."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"tts-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Started {self.workers} TTS worker(s), queue size {self.queue_size}")
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Stop the workers after the jobs already queued.
+        Args:
+            wait: Block until the workers exit
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _load_model(self) -> Optional[Any]:
+        started = time.perf_counter()
+        try:
+            model = self.model_factory()
+            if self.warmup:
+                self.synthesize_fn(model, WARMUP_TEXT)
+        except Exception as e:
+            logger.error(f"TTS model load failed: {e}")
+            return None
+        logger.info(f"TTS model ready in {time.perf_counter() - started:.1f}s (warm-up: {self.warmup})")
+        return model
+
+    def _run(self) -> None:
+        model = self._load_model()
+        if model is not None:
+            with self._lock:
+                self.ready_workers += 1
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            work, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self.busy += 1
+            started = time.perf_counter()
+            try:
+                if model is None:
+                    # Retry a model that failed to load at startup
+                    model = self.model_factory()
+                    with self._lock:
+                        self.ready_workers += 1
+                result = work(model)
+            except Exception as e:
+                future.set_exception(e)
+                with self._lock:
+                    self.failed += 1
+            else:
+                future.set_result(result)
+                with self._lock:
+                    self.completed += 1
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    self.synthesis_seconds += time.perf_counter() - started
+
+    def retry_after(self) -> int:
+        """Seconds after which a rejected request is likely to find room in the queue."""
+        with self._lock:
+            done = self.completed + self.failed
+            mean = self.synthesis_seconds / done if done else 5.0
+        return max(1, math.ceil(mean * (self._queue.qsize() + 1) / self.workers))
+
+    def _submit(self, work: Callable[[Any], Any]) -> concurrent.futures.Future:
+        self.start()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        try:
+            self._queue.put_nowait((work, future))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise TTSQueueFull(self.retry_after())
+        return future
+
+    def _timed_out(self) -> None:
+        with self._lock:
+            self.timed_out += 1
+
+    async def synthesize(self, text: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Synthesize text on a worker without blocking the event loop.
+        Args:
+            text: Text to speak
+            timeout: Seconds before giving up, queueing included; defaults to the pool timeout
+        Returns:
+            bytes: The WAV file
+        Raises:
+            TTSQueueFull: The wait queue is full
+            asyncio.TimeoutError: The synthesis did not finish in time
+        """
+        future = self._submit(lambda model: self.synthesize_fn(model, text))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            # Cancelling a queued job makes the worker skip it; a running one finishes unobserved
+            future.cancel()
+            self._timed_out()
+            raise
+
+    def stream(self, text: str, timeout: Optional[float] = None) -> AsyncIterator[Tuple[int, bytes]]:
+        """
+        Synthesize text on a worker and receive the audio piece by piece as it is produced.
+
+        The job is queued immediately, so ``TTSQueueFull`` is raised by this
+        call rather than on iteration. Closing the iterator stops the worker
+        after the piece it is synthesizing.
+        Args:
+            text: Text to speak
+            timeout: Seconds the whole synthesis may take, queueing included; defaults to the pool timeout
+        Returns:
+            AsyncIterator[Tuple[int, bytes]]: Sample rate and PCM frames, e.g. one sentence each
+        Raises:
+            TTSQueueFull: The wait queue is full
+        """
+        loop = asyncio.get_running_loop()
+        pieces: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def work(model):
+            try:
+                for piece in self.stream_fn(model, text):
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(pieces.put_nowait, piece)
+            finally:
+                loop.call_soon_threadsafe(pieces.put_nowait, done)
+
+        future = self._submit(work)
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+
+        async def iterate():
+            try:
+                while True:
+                    if future.cancelled():
+                        return
+                    try:
+                        piece = await asyncio.wait_for(pieces.get(), timeout=max(deadline - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        self._timed_out()
+                        raise
+                    if piece is done:
+                        break
+                    yield piece
+                # Re-raise a synthesis failure
+                await asyncio.wrap_future(future)
+            finally:
+                stopped.set()
+                future.cancel()
+
+        return iterate()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool state and counters.
+        Returns:
+            Dict[str, Any]: Worker, queue and request counters
+        """
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "ready_workers": self.ready_workers,
+                "busy": self.busy,
+                "queued": self._queue.qsize(),
+                "queue_size": self.queue_size,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "mean_synthesis_seconds": self.synthesis_seconds / done if done else 0.0,
+            }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+Admission control for LLM generations: bounded concurrency with a bounded, deadline-aware wait queue.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    A generation was not admitted.
+
+    ``status_code`` is 429 when the wait queue was full on arrival and 503
+    when the request waited in the queue past its deadline.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Lets at most ``max_concurrent`` generations run at once; up to ``max_queue`` more wait in FIFO order.
+
+    A waiter that is cancelled (its client went away, or its request timed
+    out) leaves the queue immediately. A released slot is handed directly to
+    the next waiter, so late arrivals cannot overtake the queue.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_queue: int = 16, queue_timeout: float = 30.0):
+        """
+        Args:
+            max_concurrent: Generations allowed to run at the same time
+            max_queue: Generations allowed to wait for a slot; more are rejected with 429
+            queue_timeout: Seconds a generation may wait for a slot before it is rejected with 503
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self._wait_seconds = 0.0
+        self._hold_seconds = 0.0
+        self._released = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        Create a controller configured from ``LLM_*`` environment variables.
+
+        Returns:
+            AdmissionController: Limits from LLM_MAX_CONCURRENCY, LLM_QUEUE_SIZE and LLM_QUEUE_TIMEOUT
+        """
+        return cls(
+            max_concurrent=int(os.environ.get("LLM_MAX_CONCURRENCY", "2")),
+            max_queue=int(os.environ.get("LLM_QUEUE_SIZE", "16")),
+            queue_timeout=float(os.environ.get("LLM_QUEUE_TIMEOUT", "30")),
+        )
+
+    @property
+    def queued(self) -> int:
+        """Generations waiting for a slot."""
+        return len(self._waiters)
+
+    def is_full(self) -> bool:
+        """True if a generation arriving now would be rejected outright."""
+        return self.active >= self.max_concurrent and len(self._waiters) >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait: the time to work through the queue at the observed pace."""
+        mean_hold = self._hold_seconds / self._released if self._released else 5.0
+        rounds = (len(self._waiters) + 1) / self.max_concurrent
+        return max(1, math.ceil(mean_hold * rounds))
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a generation slot.
+
+        Args:
+            timeout: Seconds to wait at most, defaults to ``queue_timeout``
+
+        Raises:
+            AdmissionRejected: The queue is full (429) or the wait timed out (503)
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected("Too many questions are waiting for an answer.", 429, self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise AdmissionRejected("Waited too long for a free slot to generate an answer.", 503, self.retry_after())
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            self.cancelled += 1
+            raise
+        # The releasing generation handed its slot over; ``active`` already counts it
+        self._wait_seconds += time.perf_counter() - started
+        self.admitted += 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # A slot was handed over just as the wait ended; pass it on
+            self.release()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        """
+        Give a slot back, handing it to the longest-waiting generation if any.
+
+        Args:
+            held_seconds: How long the slot was held, to estimate Retry-After
+        """
+        if held_seconds:
+            self._hold_seconds += held_seconds
+            self._released += 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold a generation slot for the enclosed block.
+
+        Args:
+            timeout: Seconds to wait for the slot at most, defaults to ``queue_timeout``
+        """
+        await self.acquire(timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report limits, occupancy and outcomes.
+
+        Returns:
+            Dict[str, Any]: Slots in use, queue depth, counters and mean wait and hold times
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "mean_wait_ms": self._wait_seconds / self.admitted * 1000 if self.admitted else 0.0,
+            "mean_generation_seconds": self._hold_seconds / self._released if self._released else None,
+        }
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""
+Answer cache keyed by normalised questions and, optionally, query embeddings.
+
+A question asked again (ignoring case, whitespace and punctuation) reuses the
+cached answer instead of paying for retrieval and generation again. Matching
+by embedding distance is opt-in: llama3 is a generative model whose sentence
+embeddings sit close together, so "What Kubernetes experience does he have"
+and "What Terraform experience does he have" can be nearly identical and a
+loose threshold would serve the wrong answer. Entries are bounded by count, memory and age, and belong to
+one vector-store version: answers cached against an older index are dropped
+as soon as a lookup sees a different version, and answers generated from an
+older index that finish after a reload are not stored.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.single_flight import normalize_question
+
+
+@dataclass
+class CacheEntry:
+    """A cached answer together with the normalised embedding of its question."""
+
+    question: str
+    answer: str
+    embedding: np.ndarray
+    created_at: float
+    size_bytes: int
+
+
+class SemanticAnswerCache:
+    """
+    LRU/TTL cache of answers, looked up by normalised question and, if enabled, by cosine distance between query embeddings.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        max_distance: float = 0.0,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of cached answers
+            max_bytes: Maximum estimated memory used by entries
+            ttl_seconds: Age after which an entry is no longer served
+            max_distance: Largest cosine distance (1 - cosine similarity) counted as a hit; 0 only serves the same question
+            enabled: When False, lookups always miss and nothing is stored
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        # Normalised question -> entry ID
+        self._questions: Dict[str, int] = {}
+        self._next_id = 0
+        self._bytes = 0
+        self._version: Optional[str] = None
+        # False until the first lookup or store fixes the version
+        self._has_version = False
+        # Stacked embeddings of all entries, rebuilt lazily after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+
+    @classmethod
+    def from_env(cls) -> "SemanticAnswerCache":
+        """
+        Create a cache configured from ``RAG_ANSWER_CACHE_*`` environment variables.
+
+        Returns:
+            SemanticAnswerCache: The configured cache
+        """
+        return cls(
+            max_entries=int(os.environ.get("RAG_ANSWER_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(os.environ.get("RAG_ANSWER_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            ttl_seconds=float(os.environ.get("RAG_ANSWER_CACHE_TTL", "3600")),
+            max_distance=float(os.environ.get("RAG_ANSWER_CACHE_MAX_DISTANCE", "0")),
+            enabled=os.environ.get("RAG_ANSWER_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, version: Optional[str]) -> None:
+        # Called with the lock held from lookup(); a new index version invalidates everything
+        if version != self._version or not self._has_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._questions.clear()
+            self._bytes = 0
+            self._matrix = None
+            self._version = version
+            self._has_version = True
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._questions.pop(normalize_question(entry.question), None)
+        self._bytes -= entry.size_bytes
+        self._matrix = None
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [entry_id for entry_id, entry in self._entries.items() if now - entry.created_at > self.ttl_seconds]
+        for entry_id in expired:
+            self._remove(entry_id)
+        self.expirations += len(expired)
+
+    def lookup(self, question: str, embedding: Sequence[float], version: Optional[str]) -> Optional[str]:
+        """
+        Return the cached answer for the same question or, if enabled, the nearest cached question.
+
+        Args:
+            question: The incoming question
+            embedding: Embedding of the incoming question
+            version: Version of the vector store that would answer the question
+
+        Returns:
+            Optional[str]: The cached answer on a hit, None on a miss
+        """
+        if not self.enabled:
+            return None
+        query = self._normalize(embedding)
+        with self._lock:
+            self._check_version(version)
+            self._purge_expired(time.time())
+            entry_id = self._questions.get(normalize_question(question))
+            if entry_id is not None:
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return self._entries[entry_id].answer
+            if not self._entries or self.max_distance <= 0:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries.keys())
+                self._matrix = np.stack([self._entries[i].embedding for i in self._matrix_ids])
+            if self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+            distances = 1.0 - self._matrix @ query
+            best = int(np.argmin(distances))
+            if distances[best] > self.max_distance:
+                self.misses += 1
+                return None
+            entry_id = self._matrix_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return self._entries[entry_id].answer
+
+    def store(self, question: str, embedding: Sequence[float], answer: str, version: Optional[str]) -> None:
+        """
+        Cache an answer, evicting least recently used entries to stay within bounds.
+
+        Args:
+            question: The question that was answered
+            embedding: Embedding of the question
+            answer: The generated answer
+            version: Version of the vector store the answer was generated from
+        """
+        if not self.enabled:
+            return
+        vector = self._normalize(embedding)
+        size_bytes = vector.nbytes + len(question.encode("utf-8")) + len(answer.encode("utf-8"))
+        if size_bytes > self.max_bytes:
+            return
+        with self._lock:
+            if not self._has_version:
+                self._version = version
+                self._has_version = True
+            elif version != self._version:
+                # Generated from an index replaced while the answer was produced
+                self.stale_stores += 1
+                return
+            previous = self._questions.get(normalize_question(question))
+            if previous is not None:
+                self._remove(previous)
+            self._entries[self._next_id] = CacheEntry(question, answer, vector, time.time(), size_bytes)
+            self._questions[normalize_question(question)] = self._next_id
+            self._next_id += 1
+            self._bytes += size_bytes
+            self._matrix = None
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._questions.clear()
+            self._bytes = 0
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache size, configuration and hit/miss counters.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "max_distance": self.max_distance,
+            "version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_stores": self.stale_stores,
+        }
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+"""
+Compact, memory-mapped on-disk vector store.
+
+Layout of a compact index directory:
+
+- ``header.json``: format version, embedding model, dimension and chunk count
+- ``vectors.f32``: float32 matrix of shape (count, dimension), memory-mapped
+- ``norms.f32``: squared L2 norm of every vector, memory-mapped
+- ``chunks.bin``: one UTF-8 JSON record (id, page_content, metadata) per chunk
+- ``offsets.u64``: count + 1 byte offsets into ``chunks.bin``
+
+Opening the store reads only the header; vectors and chunk text are paged in
+by the OS as searches touch them, and no pickle is involved.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+COMPACT_FORMAT = "compact-v1"
+HEADER_FILE = "header.json"
+VECTORS_FILE = "vectors.f32"
+NORMS_FILE = "norms.f32"
+CHUNKS_FILE = "chunks.bin"
+OFFSETS_FILE = "offsets.u64"
+
+
+def is_compact_store(directory: Path) -> bool:
+    """Tell whether a directory holds a compact vector store."""
+    return (Path(directory) / HEADER_FILE).is_file()
+
+
+def embeddings_model_name(embeddings: Optional[Embeddings]) -> Optional[str]:
+    """Best-effort name of the model behind an embeddings object, for the header."""
+    while embeddings is not None:
+        model = getattr(embeddings, "model", None)
+        if isinstance(model, str):
+            return model
+        embeddings = getattr(embeddings, "embeddings", None)
+    return None
+
+
+def write_compact_store(
+    target_dir: Path,
+    vectors: np.ndarray,
+    documents: List[Document],
+    model: Optional[str] = None,
+) -> Path:
+    """
+    Write vectors and documents as a compact store, replacing any existing one atomically.
+
+    Args:
+        target_dir: Directory to write
+        vectors: Matrix of shape (len(documents), dimension)
+        documents: Chunks, in the same order as the vectors
+        model: Embedding model name recorded in the header
+
+    Returns:
+        Path: The written directory
+    """
+    target_dir = Path(target_dir)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2 or vectors.shape[0] != len(documents):
+        raise ValueError(f"Expected {len(documents)} vectors, got array of shape {vectors.shape}")
+    tmp_dir = target_dir.with_name(target_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    vectors.tofile(tmp_dir / VECTORS_FILE)
+    np.einsum("ij,ij->i", vectors, vectors).astype(np.float32).tofile(tmp_dir / NORMS_FILE)
+    offsets = np.zeros(len(documents) + 1, dtype=np.uint64)
+    with open(tmp_dir / CHUNKS_FILE, "wb") as f:
+        for i, doc in enumerate(documents):
+            record = json.dumps(
+                {"id": doc.id, "page_content": doc.page_content, "metadata": doc.metadata},
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=str,
+            ).encode("utf-8")
+            f.write(record)
+            offsets[i + 1] = offsets[i] + len(record)
+    offsets.tofile(tmp_dir / OFFSETS_FILE)
+    header = {
+        "format": COMPACT_FORMAT,
+        "model": model,
+        "dimension": int(vectors.shape[1]),
+        "count": len(documents),
+        "metric": "l2",
+        "created_at": time.time(),
+    }
+    with open(tmp_dir / HEADER_FILE, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=1)
+
+    # Swap the new directory into place
+    old_dir = target_dir.with_name(target_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if target_dir.exists():
+        os.replace(target_dir, old_dir)
+    os.replace(tmp_dir, target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return target_dir
+
+
+def faiss_store_contents(faiss_store: Any) -> Tuple[np.ndarray, List[Document]]:
+    """
+    Read every vector and chunk out of a loaded LangChain FAISS store (flat index).
+
+    Args:
+        faiss_store: The FAISS vector store
+
+    Returns:
+        Tuple[np.ndarray, List[Document]]: Vectors and chunks, in index order
+    """
+    count = faiss_store.index.ntotal
+    vectors = faiss_store.index.reconstruct_n(0, count) if count else np.zeros((0, faiss_store.index.d), np.float32)
+    documents = []
+    for position in range(count):
+        doc_id = faiss_store.index_to_docstore_id[position]
+        doc = faiss_store.docstore.search(doc_id)
+        documents.append(Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata))
+    return vectors, documents
+
+
+def convert_faiss_store(faiss_store: Any, target_dir: Path, model: Optional[str] = None) -> Path:
+    """
+    Convert a loaded LangChain FAISS store (flat index) to the compact format.
+
+    Args:
+        faiss_store: The FAISS vector store
+        target_dir: Directory to write
+        model: Embedding model name, detected from the store's embeddings if omitted
+
+    Returns:
+        Path: The written directory
+    """
+    vectors, documents = faiss_store_contents(faiss_store)
+    model = model or embeddings_model_name(faiss_store.embeddings)
+    return write_compact_store(target_dir, vectors, documents, model=model)
+
+
+class CompactVectorStore(VectorStore):
+    """
+    Read-only vector store over a compact index directory.
+
+    Searches are exact L2 (the same scores as a flat FAISS index) computed with
+    numpy over the memory-mapped vectors; only the top-k chunk records are
+    decoded.
+    """
+
+    def __init__(self, directory: Path, embeddings: Optional[Embeddings] = None):
+        """
+        Args:
+            directory: Compact index directory
+            embeddings: Embeddings used to embed queries
+        """
+        self.directory = Path(directory)
+        self._embeddings = embeddings
+        with open(self.directory / HEADER_FILE, "r", encoding="utf-8") as f:
+            self.header: Dict[str, Any] = json.load(f)
+        if self.header.get("format") != COMPACT_FORMAT:
+            raise ValueError(f"Unsupported vector store format: {self.header.get('format')}")
+        self.dimension = int(self.header["dimension"])
+        self.count = int(self.header["count"])
+        self._vectors = self._map(VECTORS_FILE, np.float32, (self.count, self.dimension))
+        self._norms = self._map(NORMS_FILE, np.float32, (self.count,))
+        self._offsets = self._map(OFFSETS_FILE, np.uint64, (self.count + 1,))
+        self._chunks = self._map(CHUNKS_FILE, np.uint8, None)
+
+    def _map(self, name: str, dtype: Any, shape: Optional[Tuple[int, ...]]) -> np.ndarray:
+        path = self.directory / name
+        if path.stat().st_size == 0:
+            return np.zeros(shape or (0,), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    @classmethod
+    def load(cls, directory: Path, embeddings: Optional[Embeddings] = None) -> "CompactVectorStore":
+        """
+        Open a compact store.
+
+        Args:
+            directory: Compact index directory
+            embeddings: Embeddings used to embed queries
+
+        Returns:
+            CompactVectorStore: The opened store
+        """
+        return cls(directory, embeddings)
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        """Embeddings used to embed queries."""
+        return self._embeddings
+
+    def __len__(self) -> int:
+        return self.count
+
+    def document(self, position: int) -> Document:
+        """
+        Decode the chunk stored at a position.
+
+        Args:
+            position: Row of the chunk in the vector matrix
+
+        Returns:
+            Document: The chunk
+        """
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        record = json.loads(self._chunks[start:end].tobytes().decode("utf-8"))
+        return Document(id=record["id"], page_content=record["page_content"], metadata=record["metadata"])
+
+    def vectors(self, positions: Iterable[int]) -> np.ndarray:
+        """Return the stored vectors at the given positions."""
+        return np.asarray(self._vectors[list(positions)])
+
+    @staticmethod
+    def _matches(doc: Document, filter: Union[Callable[[Dict[str, Any]], bool], Dict[str, Any]]) -> bool:
+        if callable(filter):
+            return filter(doc.metadata)
+        return all(doc.metadata.get(key) == value for key, value in filter.items())
+
+    def _nearest(
+        self,
+        embedding: List[float],
+        k: int,
+        filter: Optional[Union[Callable[[Dict[str, Any]], bool], Dict[str, Any]]],
+        fetch_k: int,
+    ) -> List[Tuple[int, Document, float]]:
+        # (position, chunk, squared L2 distance) of the k nearest chunks passing the filter
+        if self.count == 0 or k <= 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = self._norms - 2.0 * (self._vectors @ query) + float(query @ query)
+        candidates = min(self.count, max(k, fetch_k) if filter is not None else k)
+        top = np.argpartition(scores, candidates - 1)[:candidates]
+        top = top[np.argsort(scores[top], kind="stable")]
+        results = []
+        for position in top:
+            doc = self.document(int(position))
+            if filter is not None and not self._matches(doc, filter):
+                continue
+            results.append((int(position), doc, float(scores[position])))
+            if len(results) == k:
+                break
+        return results
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Union[Callable[[Dict[str, Any]], bool], Dict[str, Any]]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return the k nearest chunks with their squared L2 distances.
+
+        Args:
+            embedding: Query embedding
+            k: Number of chunks to return
+            filter: Metadata filter, as a dict of required values or a predicate
+            fetch_k: Candidates examined before filtering
+        """
+        return [(doc, score) for _, doc, score in self._nearest(embedding, k, filter, fetch_k)]
+
+    def similarity_search_with_vectors_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Union[Callable[[Dict[str, Any]], bool], Dict[str, Any]]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, np.ndarray]]:
+        """Return the k nearest chunks with their stored vectors, e.g. for diversity re-ranking."""
+        return [(doc, np.asarray(self._vectors[position])) for position, doc, _ in self._nearest(embedding, k, filter, fetch_k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return the k nearest chunks to an embedding."""
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Embed a query and return the k nearest chunks with their distances."""
+        if self._embeddings is None:
+            raise ValueError("CompactVectorStore needs embeddings to search by text")
+        return self.similarity_search_with_score_by_vector(self._embeddings.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """Embed a query and return the k nearest chunks."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        directory: Optional[Path] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "CompactVectorStore":
+        """
+        Embed texts and write them as a compact store.
+
+        Args:
+            texts: Chunk texts
+            embedding: Embeddings to use
+            metadatas: Optional metadata per text
+            directory: Directory to write (required)
+            ids: Optional chunk IDs
+        """
+        if directory is None:
+            raise ValueError("CompactVectorStore.from_texts requires a target directory")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [None] * len(texts)
+        documents = [Document(id=i, page_content=t, metadata=m) for t, m, i in zip(texts, metadatas, ids)]
+        vectors = np.asarray(embedding.embed_documents(list(texts)), dtype=np.float32)
+        write_compact_store(directory, vectors, documents, model=embeddings_model_name(embedding))
+        return cls(directory, embedding)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+"""
+Context assembly: pick a diverse, de-duplicated set of retrieved chunks that fits a token budget.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Rough characters per token for English prose with llama-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a text.
+
+    There is no llama3 tokenizer in this project, so this is the usual
+    characters / 4 approximation; it only has to be consistent, not exact.
+
+    Args:
+        text: The text
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _text_key(text: str) -> str:
+    # Identical content modulo case, whitespace and punctuation (e.g. cv.md vs. the PDF export)
+    normalized = re.sub(r"[\W_]+", " ", text.lower()).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def search_with_vectors(vector_store: Any, embedding: Sequence[float], k: int) -> List[Tuple[Document, np.ndarray]]:
+    """
+    Retrieve the k nearest chunks together with their stored vectors.
+
+    Args:
+        vector_store: A FAISS or compact vector store
+        embedding: Query embedding
+        k: Number of chunks
+
+    Returns:
+        List[Tuple[Document, np.ndarray]]: Chunks and vectors, nearest first
+    """
+    if hasattr(vector_store, "similarity_search_with_vectors_by_vector"):
+        return vector_store.similarity_search_with_vectors_by_vector(embedding, k=k)
+    index = getattr(vector_store, "index", None)
+    if index is not None and hasattr(vector_store, "index_to_docstore_id"):
+        # LangChain FAISS: search the raw index so vectors can be reconstructed by position
+        query = np.asarray([embedding], dtype=np.float32)
+        if getattr(vector_store, "_normalize_L2", False):
+            query = query / np.linalg.norm(query, axis=1, keepdims=True)
+        _, positions = index.search(query, min(k, index.ntotal))
+        results = []
+        for position in positions[0]:
+            if position == -1:
+                continue
+            doc = vector_store.docstore.search(vector_store.index_to_docstore_id[int(position)])
+            results.append((doc, index.reconstruct(int(position))))
+        return results
+    # Any other store: embed the chunks again (served from the embedding cache when possible)
+    docs = vector_store.similarity_search_by_vector(embedding, k=k)
+    vectors = vector_store.embeddings.embed_documents([doc.page_content for doc in docs]) if docs else []
+    return [(doc, np.asarray(vector, dtype=np.float32)) for doc, vector in zip(docs, vectors)]
+
+
+def store_size(vector_store: Any) -> Optional[int]:
+    """Number of chunks in a FAISS or compact vector store, None for other stores."""
+    if hasattr(vector_store, "similarity_search_with_vectors_by_vector"):
+        return len(vector_store)
+    index = getattr(vector_store, "index", None)
+    return index.ntotal if index is not None else None
+
+
+def store_ids(vector_store: Any) -> Optional[List[str]]:
+    """Chunk IDs of a FAISS or compact vector store in position order, None for other stores."""
+    if hasattr(vector_store, "similarity_search_with_vectors_by_vector"):
+        return [str(vector_store.document(position).id) for position in range(len(vector_store))]
+    mapping = getattr(vector_store, "index_to_docstore_id", None)
+    return [str(mapping[position]) for position in range(len(mapping))] if mapping is not None else None
+
+
+def fetch_with_vectors(vector_store: Any, positions: Sequence[int]) -> List[Tuple[Document, np.ndarray]]:
+    """
+    Fetch chunks and their vectors by position in a FAISS or compact vector store.
+
+    Args:
+        vector_store: The vector store
+        positions: Rows in the store's vector matrix
+
+    Returns:
+        List[Tuple[Document, np.ndarray]]: Chunks and vectors, in the order of the positions
+    """
+    if hasattr(vector_store, "similarity_search_with_vectors_by_vector"):
+        vectors = vector_store.vectors(positions)
+        return [(vector_store.document(int(p)), vector) for p, vector in zip(positions, vectors)]
+    return [
+        (
+            vector_store.docstore.search(vector_store.index_to_docstore_id[int(p)]),
+            vector_store.index.reconstruct(int(p)),
+        )
+        for p in positions
+    ]
+
+
+@dataclass
+class PackedContext:
+    """Outcome of packing one question's context."""
+
+    documents: List[Document]
+    candidates: int
+    duplicates: int
+    candidate_tokens: int
+    packed_tokens: int
+    dropped: int = 0
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens kept out of the prompt compared with sending every candidate."""
+        return self.candidate_tokens - self.packed_tokens
+
+
+class ContextPacker:
+    """
+    Selects the chunks that go into the prompt.
+
+    Candidates are ordered by maximal marginal relevance (relevance to the
+    question traded off against similarity to chunks already chosen), chunks
+    that duplicate a chosen one (same normalised text, or embedding cosine
+    similarity above ``duplicate_threshold``) are dropped, and the remaining
+    chunks are packed greedily until ``token_budget`` is reached.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        lambda_mult: float = 0.7,
+        duplicate_threshold: float = 0.97,
+        max_chunks: Optional[int] = None,
+    ):
+        """
+        Args:
+            token_budget: Maximum estimated tokens of context per question
+            lambda_mult: MMR trade-off, 1.0 is pure relevance and 0.0 pure diversity
+            duplicate_threshold: Cosine similarity above which a chunk counts as a duplicate
+            max_chunks: Optional cap on the number of chunks packed
+        """
+        self.token_budget = token_budget
+        self.lambda_mult = lambda_mult
+        self.duplicate_threshold = duplicate_threshold
+        self.max_chunks = max_chunks
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.candidate_tokens = 0
+        self.packed_tokens = 0
+        self.duplicates = 0
+
+    @classmethod
+    def from_env(cls) -> "ContextPacker":
+        """
+        Create a packer configured from ``RAG_CONTEXT_*`` environment variables.
+
+        Returns:
+            ContextPacker: The configured packer
+        """
+        max_chunks = os.environ.get("RAG_CONTEXT_MAX_CHUNKS")
+        return cls(
+            token_budget=int(os.environ.get("RAG_CONTEXT_TOKEN_BUDGET", "3000")),
+            lambda_mult=float(os.environ.get("RAG_CONTEXT_MMR_LAMBDA", "0.7")),
+            duplicate_threshold=float(os.environ.get("RAG_CONTEXT_DUPLICATE_THRESHOLD", "0.97")),
+            max_chunks=int(max_chunks) if max_chunks else None,
+        )
+
+    def pack(
+        self,
+        query_embedding: Sequence[float],
+        candidates: List[Tuple[Document, Any]],
+        relevance: Optional[Sequence[float]] = None,
+    ) -> PackedContext:
+        """
+        Choose the chunks for one question.
+
+        Args:
+            query_embedding: Embedding of the question
+            candidates: Retrieved chunks with their vectors, nearest first
+            relevance: Relevance of each candidate in [0, 1], e.g. fused hybrid
+                search scores; defaults to cosine similarity with the query
+
+        Returns:
+            PackedContext: The chosen chunks, in MMR order, and token accounting
+        """
+        candidate_tokens = sum(estimate_tokens(doc.page_content) for doc, _ in candidates)
+        if not candidates:
+            return self._record(PackedContext([], 0, 0, 0, 0))
+
+        vectors = np.asarray([vector for _, vector in candidates], dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if relevance is None:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+            relevance = vectors @ query
+        else:
+            relevance = np.asarray(relevance, dtype=np.float32)
+
+        remaining = list(range(len(candidates)))
+        # Highest similarity of each candidate to anything already selected
+        redundancy = np.full(len(candidates), -1.0, dtype=np.float32)
+        seen_texts = set()
+        chosen: List[int] = []
+        duplicates = 0
+        dropped = 0
+        packed_tokens = 0
+        while remaining:
+            scores = self.lambda_mult * relevance[remaining] - (1 - self.lambda_mult) * np.maximum(redundancy[remaining], 0)
+            best = remaining.pop(int(np.argmax(scores)))
+            doc = candidates[best][0]
+            key = _text_key(doc.page_content)
+            if key in seen_texts or redundancy[best] >= self.duplicate_threshold:
+                duplicates += 1
+                continue
+            tokens = estimate_tokens(doc.page_content)
+            if packed_tokens + tokens > self.token_budget:
+                # Does not fit; a shorter, less relevant chunk still might
+                dropped += 1
+                continue
+            seen_texts.add(key)
+            chosen.append(best)
+            packed_tokens += tokens
+            redundancy = np.maximum(redundancy, vectors @ vectors[best])
+            if self.max_chunks is not None and len(chosen) >= self.max_chunks:
+                dropped += len(remaining)
+                break
+
+        documents = [candidates[i][0] for i in chosen]
+        return self._record(PackedContext(
+            documents=documents,
+            candidates=len(candidates),
+            duplicates=duplicates,
+            candidate_tokens=candidate_tokens,
+            packed_tokens=packed_tokens,
+            dropped=dropped,
+            sources=list(dict.fromkeys(str(doc.metadata.get("source", "")) for doc in documents)),
+        ))
+
+    def _record(self, packed: PackedContext) -> PackedContext:
+        with self._lock:
+            self.requests += 1
+            self.candidate_tokens += packed.candidate_tokens
+            self.packed_tokens += packed.packed_tokens
+            self.duplicates += packed.duplicates
+        return packed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report how much context packing trimmed from prompts.
+
+        Returns:
+            Dict[str, Any]: Settings and cumulative token counters
+        """
+        saved = self.candidate_tokens - self.packed_tokens
+        return {
+            "token_budget": self.token_budget,
+            "lambda_mult": self.lambda_mult,
+            "duplicate_threshold": self.duplicate_threshold,
+            "requests": self.requests,
+            "candidate_tokens": self.candidate_tokens,
+            "packed_tokens": self.packed_tokens,
+            "tokens_saved": saved,
+            "tokens_saved_per_request": saved / self.requests if self.requests else 0.0,
+            "duplicates_removed": self.duplicates,
+        }
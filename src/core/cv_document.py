@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+In-memory model of the CV markdown, parsed once and reloaded only when the file changes.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CV_NOT_FOUND = "CV file not found."
+CV_READ_ERROR = "Error reading CV file."
+EXPERIENCE_SECTION = "Professional Experience"
+
+_SECTION_RE = re.compile(r"^## (.*)$", re.MULTILINE)
+_ENTRY_RE = re.compile(r"(### .+?)(?=\n### |\Z)", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class CVEntry:
+    """One role from the Professional Experience section."""
+
+    title: str
+    role: str
+    company: str
+    location: str
+    period: str
+    markdown: str
+
+
+@dataclass(frozen=True)
+class CVSection:
+    """One ``##`` section of the CV."""
+
+    header: str
+    body: str
+
+    def render(self, name: Optional[str] = None) -> str:
+        """
+        Render the section as it is served to users.
+
+        Args:
+            name: Name the section was asked for; any rest of the header (e.g.
+                ``*(Optional)*``) moves to the first line of the body
+
+        Returns:
+            str: ``## <name>`` followed by the section body
+        """
+        name = name or self.header
+        return f"## {name}\n{(self.header[len(name):] + self.body).strip()}"
+
+
+def parse_entry(markdown: str) -> CVEntry:
+    """
+    Parse a ``### Role | Company | Location | Period`` experience entry.
+
+    Args:
+        markdown: The entry, header line included
+
+    Returns:
+        CVEntry: The parsed entry; missing header fields are empty strings
+    """
+    title = markdown.splitlines()[0][4:].strip()
+    parts = [part.strip() for part in title.split("|")] + [""] * 4
+    return CVEntry(title, parts[0], parts[1], parts[2], parts[3], markdown)
+
+
+class CVDocument:
+    """
+    The CV (``data/cv/cv.md``) parsed into sections and experience entries.
+
+    Rendered Markdown is computed at parse time, so lookups are dictionary
+    reads. The file is stat-ed at most once per ``check_interval`` seconds and
+    re-read only when its mtime or size changed; it is re-parsed only if its
+    content hash changed too.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 2.0):
+        """
+        Args:
+            path: CV markdown file
+            check_interval: Minimum seconds between checks of the file on disk
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._stat_key = None
+        self._error: Optional[str] = None
+        self.digest: Optional[str] = None
+        self.loads = 0
+        self.markdown = ""
+        self.sections: Dict[str, CVSection] = {}
+        self.entries: List[CVEntry] = []
+        self._rendered: Dict[str, str] = {}
+        self._experience = ""
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload the CV if the file changed since the last check.
+
+        Args:
+            force: Check the file even if the check interval has not elapsed
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self._error = CV_NOT_FOUND
+                self._stat_key = None
+                return
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat_key and self._error is None:
+                return
+            try:
+                data = self.path.read_bytes()
+                text = data.decode("utf-8")
+            except Exception as e:
+                print(f"[ERROR] Failed to read CV file: {e}")
+                self._error = CV_READ_ERROR
+                return
+            self._stat_key = stat_key
+            self._error = None
+            digest = hashlib.sha256(data).hexdigest()
+            if digest != self.digest:
+                self._parse(text)
+                self.digest = digest
+                self.loads += 1
+
+    def _parse(self, text: str) -> None:
+        headers = list(_SECTION_RE.finditer(text))
+        sections = {}
+        for i, match in enumerate(headers):
+            end = headers[i + 1].start() - 1 if i + 1 < len(headers) else len(text)
+            sections.setdefault(match.group(1), CVSection(match.group(1), text[match.end():end]))
+        experience = self._find_section(sections, EXPERIENCE_SECTION)
+        entries = [parse_entry(entry.strip()) for entry in _ENTRY_RE.findall(experience.body)] if experience else []
+        if experience is None:
+            rendered_experience = "No professional experience section found in the CV."
+        elif not entries:
+            rendered_experience = f"## {EXPERIENCE_SECTION}\n{experience.body.strip()}"
+        else:
+            rendered_experience = f"## {EXPERIENCE_SECTION}\n\n" + "\n\n".join(entry.markdown for entry in entries)
+        self.markdown = text
+        self.sections = sections
+        self.entries = entries
+        self._rendered = {header: section.render() for header, section in sections.items()}
+        self._experience = rendered_experience
+
+    @staticmethod
+    def _find_section(sections: Dict[str, CVSection], name: str) -> Optional[CVSection]:
+        # Headers may carry a suffix, e.g. "Interests *(Optional)*" is found as "Interests"
+        if name in sections:
+            return sections[name]
+        return next((section for header, section in sections.items() if header.startswith(name)), None)
+
+    def full_markdown(self) -> str:
+        """The whole CV, or an error message if it cannot be read."""
+        self.refresh()
+        return self._error or self.markdown
+
+    def experience_markdown(self) -> str:
+        """All professional experience entries as one Markdown document."""
+        self.refresh()
+        return self._error or self._experience
+
+    def section_markdown(self, name: str) -> str:
+        """
+        Render one section by name.
+
+        Args:
+            name: Section header, or the start of it
+
+        Returns:
+            str: The rendered section, or a message saying it does not exist
+        """
+        self.refresh()
+        if self._error:
+            return self._error
+        rendered = self._rendered.get(name)
+        if rendered is not None:
+            return rendered
+        section = self._find_section(self.sections, name)
+        if section is None:
+            return f"No section '{name}' found in the CV."
+        rendered = section.render(name)
+        self._rendered[name] = rendered
+        return rendered
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Near-duplicate detection for chunks with MinHash signatures and locality-sensitive hashing.
+"""
+
+import hashlib
+import re
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# Mersenne prime 2^31 - 1: products of two values below it fit in 64 bits
+_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """
+    Word n-grams of a text, ignoring case, punctuation and Markdown markup.
+
+    Args:
+        text: The text
+        size: Words per shingle
+
+    Returns:
+        set: The shingles; a text shorter than ``size`` words is a single shingle
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    Finds texts whose shingle sets have a Jaccard similarity above a threshold.
+
+    Every text gets a MinHash signature of ``num_perm`` values. Signatures are
+    split into ``bands`` bands and bucketed per band, so only texts sharing a
+    bucket are compared, and candidates are confirmed on the estimated
+    Jaccard similarity (the fraction of equal signature values).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity of near duplicates
+            num_perm: Signature length
+            bands: LSH bands; ``num_perm`` must be a multiple of it
+            shingle_size: Words per shingle
+            seed: Seed of the hash permutations, fixed so signatures are reproducible
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text."""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") % _PRIME for gram in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def find(self, text: str) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the most similar indexed text above the threshold.
+
+        Args:
+            text: The text to look up
+
+        Returns:
+            Optional[Tuple[Hashable, float]]: Key of the match and its estimated Jaccard similarity, or None
+        """
+        return self._find(self.signature(text))
+
+    def _find(self, signature: np.ndarray) -> Optional[Tuple[Hashable, float]]:
+        candidates = []
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            candidates.extend(bucket.get(band, ()))
+        best = None
+        for key in dict.fromkeys(candidates):
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def add(self, key: Hashable, text: str) -> None:
+        """Index a text under a key."""
+        self._add(key, self.signature(text))
+
+    def _add(self, key: Hashable, signature: np.ndarray) -> None:
+        self._signatures[key] = signature
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            bucket.setdefault(band, []).append(key)
+
+    def add_unless_duplicate(self, key: Hashable, text: str) -> Optional[Tuple[Hashable, float]]:
+        """
+        Index a text unless it near-duplicates one already indexed.
+
+        Args:
+            key: Key of the text
+            text: The text
+
+        Returns:
+            Optional[Tuple[Hashable, float]]: The existing match if the text was a duplicate (and not indexed), else None
+        """
+        signature = self.signature(text)
+        match = self._find(signature)
+        if match is None:
+            self._add(key, signature)
+        return match
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""
+Concurrent, batched document embedding for ingestion.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from langchain_core.embeddings import Embeddings
+from ollama import ResponseError
+
+# HTTP statuses worth retrying: overload, timeouts and gateway errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Tell whether an embedding request failure is transient.
+
+    Args:
+        error: The exception raised by the embeddings client
+
+    Returns:
+        bool: True for connection problems, timeouts and retryable HTTP statuses
+    """
+    if isinstance(error, ResponseError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError))
+
+
+def print_progress(done: int, total: int, elapsed: float) -> None:
+    """Default progress callback: print chunks embedded and throughput."""
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"Embedded {done}/{total} chunks ({rate:.1f} chunks/s)")
+
+
+class BatchEmbeddingEngine(Embeddings):
+    """
+    Embeds documents in fixed-size batches with a bounded number of concurrent requests.
+
+    Each batch is one request to the wrapped embeddings (a single ``/api/embed``
+    call for Ollama). Transient failures are retried with exponential backoff,
+    results are reassembled in input order, and progress is reported as
+    chunks per second. Behind the shared Ollama pool (``create_embeddings``)
+    the pool retries each request instead, and the engine's retries are off.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        progress: Optional[Callable[[int, int, float], None]] = print_progress,
+        progress_interval: float = 2.0,
+    ):
+        """
+        Args:
+            embeddings: The embeddings implementation doing the requests
+            batch_size: Texts per request
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries per batch after the first attempt
+            backoff_seconds: Delay before the first retry, doubled for each further one
+            progress: Called with (chunks done, total chunks, seconds elapsed), or None
+            progress_interval: Minimum seconds between progress reports
+        """
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.retries = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def from_env(cls, embeddings: Embeddings, **overrides: Any) -> "BatchEmbeddingEngine":
+        """
+        Create an engine configured from ``INGEST_EMBED_*`` environment variables.
+
+        Args:
+            embeddings: The embeddings implementation doing the requests
+            overrides: Explicit settings taking precedence over the environment (None values are ignored)
+
+        Returns:
+            BatchEmbeddingEngine: The configured engine
+        """
+        settings = {
+            "batch_size": int(os.environ.get("INGEST_EMBED_BATCH_SIZE", "32")),
+            "max_concurrency": int(os.environ.get("INGEST_EMBED_CONCURRENCY", "4")),
+            "max_retries": int(os.environ.get("INGEST_EMBED_MAX_RETRIES", "3")),
+            "backoff_seconds": float(os.environ.get("INGEST_EMBED_BACKOFF", "0.5")),
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(embeddings, **settings)
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_seconds * (2 ** attempt)
+
+    def _call_with_retries(self, func: Callable[..., Any], *args: Any) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                with self._lock:
+                    self.retries += 1
+                delay = self._backoff(attempt)
+                print(f"Embedding request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    async def _acall_with_retries(self, func: Callable[..., Any], *args: Any) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await func(*args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                self.retries += 1
+                delay = self._backoff(attempt)
+                print(f"Embedding request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def _record(self, total: int, done: int, started: float, last_report: List[float]) -> None:
+        # Called as batches complete; rate-limits progress output
+        elapsed = time.perf_counter() - started
+        if self.progress is not None and (done == total or elapsed - last_report[0] >= self.progress_interval):
+            last_report[0] = elapsed
+            self.progress(done, total, elapsed)
+
+    def _finish(self, batches: int, chunks: int, started: float) -> None:
+        with self._lock:
+            self.batches += batches
+            self.chunks += chunks
+            self.seconds += time.perf_counter() - started
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents concurrently in batches, preserving input order.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List[List[float]]: One embedding per text, in the same order
+
+        Raises:
+            Exception: The last error of a batch that still failed after all retries
+        """
+        if not texts:
+            return []
+        batches = self._batches(texts)
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        started = time.perf_counter()
+        last_report = [0.0]
+        done = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+            futures = {
+                pool.submit(self._call_with_retries, self.embeddings.embed_documents, batch): index
+                for index, batch in enumerate(batches)
+            }
+            try:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    results[index] = future.result()
+                    done += len(batches[index])
+                    self._record(len(texts), done, started, last_report)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        self._finish(len(batches), len(texts), started)
+        return [vector for batch_result in results for vector in batch_result]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of ``embed_documents``, bounded by a semaphore."""
+        if not texts:
+            return []
+        batches = self._batches(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+        last_report = [0.0]
+        done = 0
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            nonlocal done
+            async with semaphore:
+                vectors = await self._acall_with_retries(self.embeddings.aembed_documents, batch)
+            done += len(batch)
+            self._record(len(texts), done, started, last_report)
+            return vectors
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        self._finish(len(batches), len(texts), started)
+        return [vector for batch_result in results for vector in batch_result]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query, with the same retry policy as batches."""
+        return self._call_with_retries(self.embeddings.embed_query, text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of ``embed_query``."""
+        return await self._acall_with_retries(self.embeddings.aembed_query, text)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report batches sent, retries and throughput.
+
+        Returns:
+            Dict[str, Any]: Engine statistics
+        """
+        return {
+            "batch_size": self.batch_size,
+            "max_concurrency": self.max_concurrency,
+            "batches": self.batches,
+            "chunks": self.chunks,
+            "retries": self.retries,
+            "seconds": self.seconds,
+            "chunks_per_second": self.chunks / self.seconds if self.seconds else 0.0,
+        }
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+"""
+Ollama embeddings shared by the API and the ingestion script, with memoization.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_ollama import OllamaEmbeddings
+
+from src.core import ollama_backends, ollama_http
+
+
+DEFAULT_EMBEDDING_MODEL = "llama3"
+
+
+class SafeOllamaEmbeddings(OllamaEmbeddings):
+    """
+    OllamaEmbeddings wrapper that coerces every input to a string before embedding.
+    """
+
+    def embed_documents(self, texts):
+        # Ensure texts are always strings
+        clean_texts = [str(text) if not isinstance(text, str) else text for text in texts]
+        return super().embed_documents(clean_texts)
+
+    def embed_query(self, text):
+        # Ensure query is always a string
+        clean_text = str(text) if not isinstance(text, str) else text
+        return super().embed_query(clean_text)
+
+
+# Cache keys of queries start with this, documents are keyed on their bare text
+QUERY_KEY_PREFIX = "query:"
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalise a query so trivially different phrasings share one cache entry.
+
+    Args:
+        text: The raw query
+
+    Returns:
+        The query lower-cased with runs of whitespace collapsed
+    """
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+class EmbeddingStore:
+    """
+    Persistent SQLite store of embeddings, keyed by namespace and text.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: SQLite database file, created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "namespace TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (namespace, text))"
+        )
+        self._conn.commit()
+
+    def get_many(self, namespace: str, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Fetch the stored embeddings of several texts.
+
+        Args:
+            namespace: Model/endpoint namespace
+            texts: Texts to look up
+
+        Returns:
+            Mapping of the texts found to their embeddings
+        """
+        found = {}
+        unique = list(dict.fromkeys(texts))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text, vector FROM embeddings WHERE namespace = ? AND text IN ({placeholders})",
+                    [namespace, *batch],
+                )
+                for text, blob in rows:
+                    found[text] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, namespace: str, items: Sequence[Tuple[str, np.ndarray]]) -> None:
+        """
+        Store several embeddings, replacing existing ones.
+
+        Args:
+            namespace: Model/endpoint namespace
+            items: (text, embedding) pairs
+        """
+        rows = [(namespace, text, np.asarray(vector, dtype=np.float32).tobytes()) for text, vector in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        """Number of stored embeddings, optionally within one namespace."""
+        with self._lock:
+            if namespace is None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class MemoizedEmbeddings(Embeddings):
+    """
+    Embeddings layer that memoizes another Embeddings implementation.
+
+    Results live in an in-memory LRU, optionally backed by an EmbeddingStore so
+    they survive restarts and are shared with ingestion. Keys combine a
+    namespace (model name and base URL) with the text. Queries are keyed on
+    their normalised text (case and whitespace) but embedded as written, so the
+    first spelling seen defines the cached vector; documents are keyed on their
+    exact text. Query keys carry a prefix of their own, so they never collide
+    with a document of the same text.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        namespace: str,
+        max_entries: int = 4096,
+        store: Optional[EmbeddingStore] = None,
+    ):
+        """
+        Args:
+            embeddings: The embeddings implementation doing the real work
+            namespace: Identifies the model and endpoint, e.g. ``llama3@http://localhost:11434``
+            max_entries: Size of the in-memory LRU
+            store: Optional persistent store
+        """
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.store = store
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.backend_calls = 0
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        # Memory first, then the persistent store for whatever is left
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        self.memory_hits += sum(1 for key in keys if key in found)
+        remaining = [key for key in keys if key not in found]
+        if remaining and self.store is not None:
+            stored = self.store.get_many(self.namespace, remaining)
+            for key, vector in stored.items():
+                self._remember(key, vector)
+            found.update(stored)
+            self.store_hits += sum(1 for key in remaining if key in stored)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def _save(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]) -> Dict[str, np.ndarray]:
+        computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(keys, vectors)}
+        for key, vector in computed.items():
+            self._remember(key, vector)
+        if self.store is not None and computed:
+            self.store.put_many(self.namespace, list(computed.items()))
+        return computed
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, calling the backend only for texts not seen before."""
+        keys = [str(text) for text in texts]
+        found = self._lookup(keys)
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            self.backend_calls += 1
+            found.update(self._save(missing, self.embeddings.embed_documents(missing)))
+        return [found[key].tolist() for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of ``embed_documents``."""
+        keys = [str(text) for text in texts]
+        found = self._lookup(keys)
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            self.backend_calls += 1
+            found.update(self._save(missing, await self.embeddings.aembed_documents(missing)))
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing earlier embeddings of the same normalised query."""
+        key = QUERY_KEY_PREFIX + normalize_query(text)
+        found = self._lookup([key])
+        if key not in found:
+            self.backend_calls += 1
+            found.update(self._save([key], [self.embeddings.embed_query(text)]))
+        return found[key].tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of ``embed_query``."""
+        key = QUERY_KEY_PREFIX + normalize_query(text)
+        found = self._lookup([key])
+        if key not in found:
+            self.backend_calls += 1
+            found.update(self._save([key], [await self.embeddings.aembed_query(text)]))
+        return found[key].tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report how many embedding computations the cache saved.
+
+        Returns:
+            Dict[str, Any]: Hit/miss counters, backend calls and cache sizes
+        """
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "store_path": str(self.store.path) if self.store is not None else None,
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "embeddings_saved": self.memory_hits + self.store_hits,
+            "hit_ratio": (self.memory_hits + self.store_hits) / lookups if lookups else 0.0,
+            "backend_calls": self.backend_calls,
+        }
+
+
+def create_embeddings(
+    model: Optional[str] = None,
+    base_url: Optional[str] = None,
+    store_path: Optional[Path] = None,
+    max_entries: Optional[int] = None,
+    engine_options: Optional[Dict[str, Any]] = None,
+) -> MemoizedEmbeddings:
+    """
+    Create memoized Ollama embeddings sending through the shared HTTP connection pool.
+
+    Args:
+        model: Embedding model, defaults to ``MODEL_NAME`` or llama3
+        base_url: Ollama URL, defaults to the first of ``OLLAMA_BASE_URLS`` or ``OLLAMA_BASE_URL``
+        store_path: Persistent cache file, defaults to ``RAG_EMBEDDING_CACHE_PATH`` (memory only if unset)
+        max_entries: In-memory LRU size, defaults to ``RAG_EMBEDDING_CACHE_MAX_ENTRIES`` or 4096
+        engine_options: If given, cache misses are embedded through a BatchEmbeddingEngine with these overrides.
+            The shared pool owns retries: unless ``max_retries`` is given, the engine does not retry
+            while ``OLLAMA_HTTP_RETRIES`` is above 0
+
+    Returns:
+        MemoizedEmbeddings: The embeddings
+    """
+    model = model or os.environ.get("MODEL_NAME", DEFAULT_EMBEDDING_MODEL)
+    base_url = base_url or ollama_backends.base_url()
+    if store_path is None and os.environ.get("RAG_EMBEDDING_CACHE_PATH"):
+        store_path = Path(os.environ["RAG_EMBEDDING_CACHE_PATH"])
+    if max_entries is None:
+        max_entries = int(os.environ.get("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+    embeddings: Embeddings = SafeOllamaEmbeddings(model=model, base_url=base_url, **ollama_http.pool.client_options())
+    if engine_options is not None:
+        # Imported here to keep the engine optional for query-time embeddings
+        from src.core.embedding_engine import BatchEmbeddingEngine
+
+        if engine_options.get("max_retries") is None and ollama_http.pool.retries > 0:
+            # The pool already retries each /api/embed call, retrying the batch too would multiply the attempts
+            engine_options = {**engine_options, "max_retries": 0}
+        embeddings = BatchEmbeddingEngine.from_env(embeddings, **engine_options)
+    return MemoizedEmbeddings(
+        embeddings,
+        namespace=f"{model}@{base_url}",
+        max_entries=max_entries,
+        store=EmbeddingStore(store_path) if store_path else None,
+    )
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Intent router: one precompiled regex that decides whether a question can be served straight from the CV.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.core import tracing
+
+FULL_CV = "full_cv"
+EXPERIENCE = "experience"
+SECTION = "section"
+RAG = "rag"
+
+# Phrases asking for the whole CV
+FULL_CV_PHRASES = ("cv", "curriculum vitae", "resume")
+
+# Phrases asking for the list of roles
+EXPERIENCE_PHRASES = (
+    "professional experience", "all roles", "all jobs", "all positions", "all experience",
+    "work history", "employment history", "job history", "career history",
+)
+
+# Phrases asking for one CV section, with the section header they map to
+SECTION_PHRASES = {
+    "core competencies": "Core Competencies & Technical Skills",
+    "technical skills": "Core Competencies & Technical Skills",
+    "professional summary": "Professional Summary",
+    "summary": "Professional Summary",
+    "volunteering": "Volunteering",
+    "languages": "Languages",
+    "interests": "Interests",
+    "hobbies": "Interests",
+}
+
+# Phrases that contain a section keyword but are ordinary questions; matching
+# them consumes the text, so e.g. "languages" in "programming languages" never routes
+RAG_PHRASES = ("programming languages", "scripting languages", "coding languages", "summary of")
+
+# Openers a bare request may start with: "show me your CV", "what are your hobbies?"
+REQUEST_OPENERS = (
+    "show me", "show", "list", "give me", "send me", "send", "download", "display", "share", "view", "see",
+    "what", "which", "what is", "what are", "what's", "can i see", "can i get", "can i have", "could i see", "may i see",
+    "can you show me", "could you show me", "can you send me", "could you send me", "tell me about", "any",
+)
+# Words that may come between the opener and the phrase: "the full", "a copy of your"
+DETERMINERS = ("your", "his", "her", "their", "the", "a", "copy", "of", "full", "whole", "complete", "entire", "all")
+# Endings that still ask for nothing more than the phrase: "what work history does he have?"
+REQUEST_ENDINGS = ("do you have", "does he have", "does she have", "do they have")
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where a question goes, and why."""
+
+    intent: str
+    section: Optional[str] = None
+    matched: Optional[str] = None
+
+    @property
+    def serves_cv(self) -> bool:
+        """True if the answer comes straight from the CV, without retrieval or the LLM."""
+        return self.intent != RAG
+
+
+_RAG_ROUTE = Route(RAG)
+
+
+class IntentRouter:
+    """
+    Routes questions that ask for nothing but a part of the CV.
+
+    A question is served from the CV only when it is a bare request for it:
+    an optional opener ("show me", "what are"), optional determiners ("your",
+    "the full"), one or more phrases joined by "and" or commas, an optional
+    ending ("does he have") and punctuation. Anything else, such as "what
+    professional experience does he have with Terraform?", goes to RAG. The
+    whole grammar is one precompiled regex. When several phrases are
+    requested, full-CV phrases win over experience phrases, which win over
+    sections. Decisions are counted per intent so the share of questions that
+    skip the LLM is visible.
+    """
+
+    def __init__(
+        self,
+        full_cv_phrases: Iterable[str] = FULL_CV_PHRASES,
+        experience_phrases: Iterable[str] = EXPERIENCE_PHRASES,
+        section_phrases: Dict[str, str] = SECTION_PHRASES,
+        rag_phrases: Iterable[str] = RAG_PHRASES,
+        openers: Iterable[str] = REQUEST_OPENERS,
+        determiners: Iterable[str] = DETERMINERS,
+        endings: Iterable[str] = REQUEST_ENDINGS,
+    ):
+        """
+        Args:
+            full_cv_phrases: Lowercase phrases routing to the full CV
+            experience_phrases: Lowercase phrases routing to the professional experience entries
+            section_phrases: Lowercase phrases routing to a section, mapped to its header
+            rag_phrases: Lowercase phrases that never route to the CV
+            openers: Lowercase words a bare request may start with
+            determiners: Lowercase words allowed between the opener and the phrases
+            endings: Lowercase words a bare request may end with
+        """
+        # phrase -> (priority, route); lower priority wins
+        self._routes: Dict[str, Tuple[int, Route]] = {}
+        for phrase in rag_phrases:
+            self._routes[phrase] = (3, Route(RAG))
+        for phrase, section in section_phrases.items():
+            self._routes.setdefault(phrase, (2, Route(SECTION, section, phrase)))
+        for phrase in experience_phrases:
+            self._routes.setdefault(phrase, (1, Route(EXPERIENCE, matched=phrase)))
+        for phrase in full_cv_phrases:
+            self._routes.setdefault(phrase, (0, Route(FULL_CV, matched=phrase)))
+
+        def alternation(words: Iterable[str]) -> str:
+            return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+        phrase = rf"(?:(?:{alternation(determiners)}) )*(?:{alternation(self._routes)})"
+        self._regex = re.compile(
+            rf"(?:please )?(?:(?:{alternation(openers)}) )?(?:please )?"
+            rf"(?P<phrases>{phrase}(?:(?: ?,| and| ?, and) {phrase})*)"
+            rf"(?: (?:{alternation(endings)}))?(?: please)?"
+        )
+        self._phrase_regex = re.compile(rf"\b(?:{alternation(self._routes)})\b")
+        self._lock = threading.Lock()
+        self.counts = {FULL_CV: 0, EXPERIENCE: 0, SECTION: 0, RAG: 0}
+        self.seconds = 0.0
+
+    def classify(self, question: str) -> Route:
+        """
+        Decide where a question goes, without recording the decision.
+
+        Args:
+            question: The user question
+
+        Returns:
+            Route: The CV route of the highest-priority requested phrase if the question is a bare request, else the RAG route
+        """
+        text = " ".join(question.lower().split()).strip(" ?.!")
+        request = self._regex.fullmatch(text)
+        if request is None:
+            return _RAG_ROUTE
+        return min(
+            (self._routes[match.group()] for match in self._phrase_regex.finditer(request.group("phrases"))),
+            key=lambda candidate: candidate[0],
+        )[1]
+
+    def route(self, question: str) -> Route:
+        """
+        Decide where a question goes and record the decision, in the counters and the current trace.
+
+        Args:
+            question: The user question
+
+        Returns:
+            Route: The chosen route
+        """
+        started = time.perf_counter()
+        route = self.classify(question)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.counts[route.intent] += 1
+            self.seconds += elapsed
+        tracing.annotate(route=route.intent, section=route.section, router_us=round(elapsed * 1e6, 1))
+        return route
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Report routing decisions.
+
+        Returns:
+            Dict[str, object]: Decisions per intent, the share served from the CV and the mean routing time
+        """
+        total = sum(self.counts.values())
+        return {
+            "decisions": dict(self.counts),
+            "served_from_cv": (total - self.counts[RAG]) / total if total else 0.0,
+            "mean_us": self.seconds / total * 1e6 if total else 0.0,
+        }
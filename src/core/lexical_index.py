@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+"""
+BM25 inverted index over the ingested chunks, and reciprocal-rank fusion with vector search.
+
+The index is built at ingestion time from the saved vector store, so a chunk's
+row in the index is its position in the vector store (FAISS and compact alike).
+It is persisted as a single ``.npz`` file of flat arrays:
+
+- ``terms``: sorted vocabulary
+- ``offsets``: len(terms) + 1 offsets into ``postings``/``freqs``
+- ``postings``: chunk positions containing each term
+- ``freqs``: term frequency of each posting
+- ``lengths``: token count of every chunk
+- ``ids``: docstore ID of every chunk, to detect an index that no longer matches the store
+"""
+
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.core.context_packing import fetch_with_vectors, search_with_vectors, store_size
+
+LEXICAL_INDEX_FILE = "bm25_index.npz"
+
+# Very common English words that carry no signal for technology lookups
+STOP_WORDS = frozenset(
+    "a an and are as at be by do does for from has have he his how i in is it its of on or that the "
+    "this to was what when where which who with you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-case alphanumeric terms, without stop words.
+
+    Args:
+        text: The text
+
+    Returns:
+        List[str]: The terms, in order
+    """
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks, stored as flat numpy arrays.
+
+    A query looks up each of its terms by binary search in the vocabulary and
+    scores only the postings of those terms, so lookups stay well under a
+    millisecond for corpora of this size.
+    """
+
+    def __init__(
+        self,
+        terms: np.ndarray,
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        freqs: np.ndarray,
+        lengths: np.ndarray,
+        ids: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Args:
+            terms: Sorted vocabulary
+            offsets: Start of each term's postings, plus the end of the last one
+            postings: Chunk positions per term
+            freqs: Term frequency per posting
+            lengths: Token count per chunk
+            ids: Docstore ID per chunk
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+        """
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.freqs = freqs
+        self.lengths = lengths
+        self.ids = ids
+        self.k1 = k1
+        self.b = b
+        count = len(lengths)
+        average = float(lengths.mean()) if count else 0.0
+        # Per-chunk part of the BM25 denominator, computed once
+        self._length_norm = k1 * (1 - b + b * lengths / average) if average else np.full(count, k1, dtype=np.float32)
+        df = np.diff(offsets).astype(np.float64)
+        self._idf = np.log(1 + (count - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    @classmethod
+    def from_documents(cls, documents: Sequence[Document], ids: Optional[Sequence[str]] = None) -> "BM25Index":
+        """
+        Build an index whose rows follow the order of the documents.
+
+        Args:
+            documents: Chunks, in vector store order
+            ids: Docstore ID of each chunk, defaults to ``doc.id``
+
+        Returns:
+            BM25Index: The index
+        """
+        ids = list(ids) if ids is not None else [doc.id or "" for doc in documents]
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for position, doc in enumerate(documents):
+            tokens = tokenize(doc.page_content)
+            lengths[position] = len(tokens)
+            for term, freq in Counter(tokens).items():
+                postings.setdefault(term, []).append((position, freq))
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term])
+        flat = [entry for term in terms for entry in postings[term]]
+        return cls(
+            terms=np.array(terms, dtype=str),
+            offsets=offsets,
+            postings=np.array([position for position, _ in flat], dtype=np.int32),
+            freqs=np.array([freq for _, freq in flat], dtype=np.float32),
+            lengths=lengths,
+            ids=np.array(ids, dtype=str),
+        )
+
+    def save(self, path: Path) -> None:
+        """Write the index to an ``.npz`` file, replacing it atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                terms=self.terms,
+                offsets=self.offsets,
+                postings=self.postings,
+                freqs=self.freqs,
+                lengths=self.lengths,
+                ids=self.ids,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Read an index written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in ("terms", "offsets", "postings", "freqs", "lengths", "ids")})
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Return the k best-matching chunk positions.
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            List[Tuple[int, float]]: (position, BM25 score) pairs, best first; chunks without any query term are left out
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = int(np.searchsorted(self.terms, term))
+            if i == len(self.terms) or self.terms[i] != term:
+                continue
+            start, end = self.offsets[i], self.offsets[i + 1]
+            docs, tf = self.postings[start:end], self.freqs[start:end]
+            scores[docs] += self._idf[i] * tf * (self.k1 + 1) / (tf + self._length_norm[docs])
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(scores[matched], -k)[-k:]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(position), float(scores[position])) for position in matched]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """
+    Merge several rankings with reciprocal-rank fusion.
+
+    Each item scores ``sum(1 / (k + rank))`` over the rankings it appears in.
+
+    Args:
+        rankings: Rankings of item keys, best first
+        k: RRF constant damping the weight of top ranks
+
+    Returns:
+        List[Tuple[Hashable, float]]: All items with their fused scores, best first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def load_lexical_index(path: Path) -> Optional[BM25Index]:
+    """
+    Load the BM25 index if ingestion has built one.
+
+    Args:
+        path: Index file
+
+    Returns:
+        Optional[BM25Index]: The index, or None if it is missing or unreadable
+    """
+    path = Path(path)
+    if not path.is_file():
+        return None
+    try:
+        return BM25Index.load(path)
+    except Exception as e:
+        print(f"Error loading lexical index {path}: {e}")
+        return None
+
+
+def lexical_index_matches(index: BM25Index, vector_store: Any) -> bool:
+    """
+    Tell whether an index was built from this vector store.
+
+    Compares the chunk count and the docstore IDs at a few positions, which is
+    enough to catch an index left over from an earlier ingestion.
+
+    Args:
+        index: The BM25 index
+        vector_store: A FAISS or compact vector store
+
+    Returns:
+        bool: True if index rows and vector store positions refer to the same chunks
+    """
+    count = store_size(vector_store)
+    if count is None or count != len(index):
+        return False
+    if count == 0:
+        return True
+    positions = sorted({0, count // 2, count - 1})
+    return [doc.id for doc, _ in fetch_with_vectors(vector_store, positions)] == [str(index.ids[p]) for p in positions]
+
+
+def hybrid_search(
+    vector_store: Any,
+    index: Optional[BM25Index],
+    question: str,
+    embedding: Sequence[float],
+    k: int,
+    lexical_k: int,
+    rrf_k: int = 60,
+    shards: Optional[Any] = None,
+) -> Tuple[List[Tuple[Document, np.ndarray]], Optional[List[float]]]:
+    """
+    Run vector and BM25 search and fuse the two rankings.
+
+    Args:
+        vector_store: A FAISS or compact vector store
+        index: BM25 index over the same chunks, or None for vector search only
+        question: Query text for BM25
+        embedding: Query embedding for vector search
+        k: Chunks from vector search
+        lexical_k: Chunks from BM25
+        rrf_k: Reciprocal-rank fusion constant
+        shards: Category shards (src.core.shards.ShardSet) to run vector search on instead of the whole store
+
+    Returns:
+        Tuple: Chunks with their vectors, best fused rank first, and their fused
+        scores scaled to [0, 1] (None when only vector search ran)
+    """
+    if shards is not None:
+        vector_hits = shards.search_with_vectors(question, embedding, k)
+    else:
+        vector_hits = search_with_vectors(vector_store, embedding, k)
+    lexical_hits = index.search(question, lexical_k) if index is not None else []
+    if not lexical_hits:
+        return vector_hits, None
+    by_id = {doc.id: (doc, vector) for doc, vector in vector_hits}
+    lexical_ids = [str(index.ids[position]) for position, _ in lexical_hits]
+    missing = [position for position, _ in lexical_hits if str(index.ids[position]) not in by_id]
+    for doc, vector in fetch_with_vectors(vector_store, missing):
+        by_id[doc.id] = (doc, vector)
+    fused = [(doc_id, score) for doc_id, score in reciprocal_rank_fusion(
+        [[doc.id for doc, _ in vector_hits], lexical_ids], k=rrf_k
+    ) if doc_id in by_id]
+    best = fused[0][1] if fused else 1.0
+    return [by_id[doc_id] for doc_id, _ in fused], [score / best for _, score in fused]
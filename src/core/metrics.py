@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are registered once in the shared ``registry``
+and rendered by the ``/metrics`` endpoint. Recording is a dictionary update
+under a lock, cheap enough for per-request hot paths.
+"""
+
+import bisect
+import math
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from starlette.routing import replace_params
+
+from src.core import tracing
+
+# Seconds; spans a cached embedding lookup up to a long generation
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Base class: a named metric with optional labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        """Sample lines of the metric, without the HELP and TYPE header."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """The metric in the text exposition format."""
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` to the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Current value, 0 if never incremented."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. requests in flight."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Subtract ``amount`` from the gauge."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: Any) -> Iterator[None]:
+        """Count the enclosed block as in progress while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class CallbackGauge(Metric):
+    """A gauge read at scrape time from a function, e.g. a cache's hit ratio."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], Union[None, float, Dict[LabelValues, float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        """
+        Args:
+            name: Metric name
+            documentation: Help text
+            read: Returns the value, a mapping of label values to values, or None to omit the metric
+            labelnames: Label names, when ``read`` returns a mapping
+        """
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+
+    def samples(self) -> List[str]:
+        try:
+            values = self.read()
+        except Exception:
+            # A broken source must not take down the whole scrape
+            return []
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(float(value))}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class _HistogramValues:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets, e.g. latencies."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, _HistogramValues] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = _HistogramValues(len(self.buckets) + 1)
+            values.counts[index] += 1
+            values.total += value
+            values.count += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the enclosed block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """Number of observations so far."""
+        values = self._values.get(self._key(labels))
+        return values.count if values else 0
+
+    def sum(self, **labels: Any) -> float:
+        """Sum of the observations so far."""
+        values = self._values.get(self._key(labels))
+        return values.total if values else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((key, list(v.counts), v.total, v.count) for key, v in self._values.items())
+        lines = []
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metrics of the process.
+
+    Registering a name twice returns the metric registered first, so modules
+    can declare their metrics at import time without coordinating.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} is already registered as a {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def callback_gauge(self, name: str, documentation: str, read: Callable, labelnames: Sequence[str] = ()) -> CallbackGauge:
+        """Register a gauge read from ``read`` at scrape time."""
+        return self._register(CallbackGauge(name, documentation, read, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        """A registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Every metric in the text exposition format, sorted by name."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "".join(metric.render() for metric in metrics)
+
+
+# Shared by every module in the process and served on /metrics
+registry = MetricsRegistry()
+
+# RAG pipeline stages
+QUERY_EMBEDDING_SECONDS = registry.histogram("rag_query_embedding_seconds", "Time to embed a question.")
+SEARCH_SECONDS = registry.histogram("rag_search_seconds", "Time of the hybrid vector + BM25 search for a question.")
+CONTEXT_PACKING_SECONDS = registry.histogram("rag_context_packing_seconds", "Time to select the chunks that go into the prompt.")
+CONTEXT_FORMAT_SECONDS = registry.histogram("rag_context_format_seconds", "Time to format the selected chunks into the prompt context.")
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = registry.histogram("rag_llm_time_to_first_token_seconds", "Time from the LLM call to its first token.")
+LLM_GENERATION_SECONDS = registry.histogram("rag_llm_generation_seconds", "Time from the LLM call to its last token.")
+LLM_IN_FLIGHT = registry.gauge("rag_llm_generations_in_flight", "LLM generations running now.")
+PROMPT_CHUNKS = registry.histogram("rag_prompt_chunks", "Context chunks per prompt.", buckets=COUNT_BUCKETS)
+PROMPT_CONTEXT_TOKENS = registry.histogram("rag_prompt_context_tokens", "Estimated context tokens per prompt.", buckets=TOKEN_BUCKETS)
+COMPLETION_TOKENS = registry.histogram("rag_completion_tokens", "Tokens generated per answer.", buckets=TOKEN_BUCKETS)
+ANSWERS = registry.counter("rag_answers_total", "Answers produced, by where they came from (shared generations count once).", ["source"])
+
+# Text to speech
+TTS_SYNTHESIS_SECONDS = registry.histogram("tts_synthesis_seconds", "Time to synthesize the audio for a request.", ["endpoint"])
+TTS_AUDIO_SECONDS = registry.counter("tts_audio_seconds_total", "Seconds of audio synthesized.")
+TTS_REQUESTS = registry.counter("tts_requests_total", "TTS requests, by endpoint and outcome.", ["endpoint", "outcome"])
+
+# HTTP
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being served.")
+HTTP_REQUEST_SECONDS = registry.histogram("http_request_duration_seconds", "Time to serve an HTTP request, by route.", ["route", "method"])
+HTTP_REQUESTS = registry.counter("http_requests_total", "HTTP requests served, by route and status.", ["route", "method", "status"])
+
+
+def wav_duration(data: bytes) -> float:
+    """
+    Duration of a WAV file.
+
+    Args:
+        data: WAV file contents
+
+    Returns:
+        float: Seconds of audio, 0 if the data is not a readable WAV file
+    """
+    try:
+        with wave.open(BytesIO(data), "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return 0.0
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    LangChain callback recording time to first token, generation time and token counts of LLM calls.
+
+    Works for ``invoke`` and ``stream`` alike, since the Ollama LLM reports
+    every token through ``on_llm_new_token`` in both cases. The same timings
+    are added to the request trace as the ``llm_ttft`` and ``llm`` stages.
+    """
+
+    def __init__(self):
+        self._runs: Dict[UUID, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        LLM_IN_FLIGHT.inc()
+        with self._lock:
+            # Start time, first token time, tokens seen, request trace
+            self._runs[run_id] = [time.perf_counter(), None, 0, tracing.current_trace()]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is None or not token:
+            return
+        if run[1] is None:
+            run[1] = time.perf_counter()
+            LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(run[1] - run[0])
+            if run[3] is not None:
+                run[3].add_stage("llm_ttft", run[1] - run[0])
+        run[2] += 1
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._finish(run_id)
+        if run is None:
+            return
+        seconds = time.perf_counter() - run[0]
+        LLM_GENERATION_SECONDS.observe(seconds)
+        tokens = run[2]
+        for generations in getattr(response, "generations", None) or []:
+            for generation in generations:
+                # Ollama's own count, when it reports one
+                tokens = (generation.generation_info or {}).get("eval_count") or tokens
+        COMPLETION_TOKENS.observe(tokens)
+        if run[3] is not None:
+            run[3].add_stage("llm", seconds, tokens=tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def _finish(self, run_id: UUID) -> Optional[List[Any]]:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is not None:
+            LLM_IN_FLIGHT.dec()
+        return run
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording requests in flight, and duration and status per route.
+
+    Requests are labelled with the route template (``/api/tts/audio/{key}``)
+    rather than the raw path, so the number of series stays bounded. The
+    duration of a streaming response covers the whole body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def route_of(scope) -> str:
+        """Template of the route a served request was dispatched to, ``unmatched`` if none."""
+        route = scope.get("route")
+        path_format = getattr(route, "path_format", None)
+        if path_format is None:
+            return "unmatched"
+        # Routes of included routers may report their template without the
+        # router's prefix; it is whatever precedes the route's own part of the path
+        rendered, _ = replace_params(path_format, getattr(route, "param_convertors", {}), dict(scope.get("path_params", {})))
+        path = scope["path"]
+        if path != rendered and path.endswith(rendered):
+            return path[: len(path) - len(rendered)] + path_format
+        return path_format
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router has filled in the endpoint and path parameters by now
+            route, method = self.route_of(scope), scope["method"]
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=method)
+            HTTP_REQUESTS.inc(route=route, method=method, status=status[0])
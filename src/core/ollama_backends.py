@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+"""
+Several Ollama hosts behind one base URL: least-outstanding-requests routing, health probes and failover.
+
+Clients keep being built for a single base URL (the first configured one);
+the shared HTTP transport in ``ollama_http`` sends each request addressed to
+any member of the pool to the member with the fewest requests in flight.
+Members failing to connect are ejected at once and readmitted by the
+background ``/api/tags`` probe, or tried again after ``probe_interval`` when
+no probe runs (e.g. during ingestion).
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
+
+
+def configured_urls() -> List[str]:
+    """
+    Ollama endpoints from the environment.
+
+    Returns:
+        List[str]: ``OLLAMA_BASE_URLS`` (comma separated) if set, else ``OLLAMA_BASE_URL`` or the local default
+    """
+    urls = [url.strip().rstrip("/") for url in os.environ.get("OLLAMA_BASE_URLS", "").split(",") if url.strip()]
+    return urls or [os.environ.get("OLLAMA_BASE_URL", DEFAULT_OLLAMA_BASE_URL).rstrip("/")]
+
+
+def base_url() -> str:
+    """The URL Ollama clients are built for: the first configured endpoint."""
+    return configured_urls()[0]
+
+
+class Backend:
+    """One Ollama host and its routing state."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        parsed = httpx.URL(self.url)
+        self.scheme = parsed.scheme
+        self.host = parsed.host
+        self.port = parsed.port
+        self.healthy = True
+        # While unhealthy, not routed to before this time unless a probe readmits it
+        self.retry_at = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def serves(self, url: httpx.URL) -> bool:
+        """True if ``url`` points at this backend."""
+        return (url.scheme, url.host, url.port) == (self.scheme, self.host, self.port)
+
+    def route(self, request: httpx.Request) -> None:
+        """Point ``request`` at this backend, keeping its path and query."""
+        request.url = request.url.copy_with(scheme=self.scheme, host=self.host, port=self.port)
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+
+    def stats(self) -> Dict[str, Any]:
+        """Health, load and failure counters."""
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class BackendPool:
+    """
+    Ollama hosts serving the same models, balanced by least outstanding requests.
+
+    Ties go to the backend that has served fewer requests, so an idle pool is
+    used round-robin. If every backend is unhealthy, requests are still tried
+    on them rather than failing without a connection attempt.
+    """
+
+    def __init__(self, urls: Sequence[str], probe_interval: float = 10.0, probe_timeout: float = 2.0):
+        """
+        Args:
+            urls: Base URLs of the Ollama hosts
+            probe_interval: Seconds between health probes, and before an ejected backend is tried again
+            probe_timeout: Seconds a probe may take before the backend counts as down
+        """
+        if not urls:
+            raise ValueError("At least one Ollama URL is required")
+        self.backends = [Backend(url) for url in dict.fromkeys(url.rstrip("/") for url in urls)]
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.failovers = 0
+        self.probes = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["BackendPool"]:
+        """
+        Create a pool from ``OLLAMA_BASE_URLS``.
+
+        Returns:
+            Optional[BackendPool]: The pool, or None if only ``OLLAMA_BASE_URL`` is configured
+        """
+        if not os.environ.get("OLLAMA_BASE_URLS", "").strip():
+            return None
+        return cls(
+            configured_urls(),
+            probe_interval=float(os.environ.get("OLLAMA_PROBE_INTERVAL", "10")),
+            probe_timeout=float(os.environ.get("OLLAMA_PROBE_TIMEOUT", "2")),
+        )
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    @property
+    def url(self) -> str:
+        """Base URL to build clients for; any member works, the first is used."""
+        return self.backends[0].url
+
+    def serves(self, url: httpx.URL) -> bool:
+        """True if ``url`` points at a member, i.e. a request to it may go to any member."""
+        return any(backend.serves(url) for backend in self.backends)
+
+    def healthy(self) -> List[Backend]:
+        """Backends currently taking requests."""
+        return [backend for backend in self.backends if backend.healthy]
+
+    def acquire(self, exclude: Sequence[Backend] = ()) -> Optional[Backend]:
+        """
+        Pick the backend for a request and count it as in flight.
+
+        Args:
+            exclude: Backends already tried for this request
+
+        Returns:
+            Optional[Backend]: The healthy (or due for a retry) backend with the fewest requests in flight,
+            None if every backend was tried
+        """
+        now = time.monotonic()
+        with self._lock:
+            untried = [backend for backend in self.backends if backend not in exclude]
+            candidates = [backend for backend in untried if backend.healthy or now >= backend.retry_at] or untried
+            if not candidates:
+                return None
+            backend = min(candidates, key=lambda b: (b.in_flight, b.requests))
+            backend.in_flight += 1
+            backend.requests += 1
+            if exclude:
+                self.failovers += 1
+            return backend
+
+    def release(self, backend: Backend) -> None:
+        """A request to ``backend`` finished, its response included."""
+        with self._lock:
+            backend.in_flight -= 1
+
+    def mark_failed(self, backend: Backend, error: Any) -> None:
+        """Eject ``backend`` until a probe succeeds or ``probe_interval`` has passed."""
+        with self._lock:
+            backend.healthy = False
+            backend.retry_at = time.monotonic() + self.probe_interval
+            backend.failures += 1
+            backend.last_error = str(error) or type(error).__name__
+
+    def mark_healthy(self, backend: Backend) -> None:
+        """Readmit ``backend``."""
+        with self._lock:
+            backend.healthy = True
+            backend.retry_at = 0.0
+
+    def probe(self) -> int:
+        """
+        Check every backend with ``GET /api/tags`` and eject or readmit it.
+
+        Returns:
+            int: Number of healthy backends
+        """
+        with httpx.Client(timeout=self.probe_timeout) as client:
+            for backend in self.backends:
+                try:
+                    client.get(f"{backend.url}/api/tags").raise_for_status()
+                except httpx.HTTPError as e:
+                    if backend.healthy:
+                        print(f"Ollama backend {backend.url} is down ({e}), ejecting it")
+                    self.mark_failed(backend, e)
+                else:
+                    if not backend.healthy:
+                        print(f"Ollama backend {backend.url} is back, readmitting it")
+                    self.mark_healthy(backend)
+        self.probes += 1
+        return len(self.healthy())
+
+    def _probe_loop(self) -> None:
+        while True:
+            try:
+                self.probe()
+            except Exception as e:
+                print(f"Ollama health probe failed: {e}")
+            if self._stop.wait(self.probe_interval):
+                return
+
+    def start(self) -> None:
+        """Probe the backends in a background thread, now and every ``probe_interval`` seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._probe_loop, name="ollama-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background probes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_timeout * len(self.backends) + 1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report every backend's health and load.
+
+        Returns:
+            Dict[str, Any]: Healthy count, failovers, probes run and per-backend counters
+        """
+        return {
+            "healthy": len(self.healthy()),
+            "total": len(self.backends),
+            "failovers": self.failovers,
+            "probes": self.probes,
+            "probe_interval": self.probe_interval,
+            "backends": [backend.stats() for backend in self.backends],
+        }
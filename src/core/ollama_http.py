@@ -0,0 +1,428 @@
+#!/usr/bin/env python
+"""
+Shared, pooled HTTP transport for all Ollama traffic.
+
+Every ``OllamaEmbeddings`` / ``OllamaLLM`` builds its own httpx clients. Given
+``OllamaHTTPPool.client_options()`` they all send through the same keep-alive
+connection pool instead, so rebuilding the chain or loading an index does not
+cost new TCP connections, and a request reuses a warm connection rather than
+paying a handshake. Idempotent calls (embeddings and GETs) are retried on
+connection failures and overload statuses; generations never are, except
+that with several backends (``ollama_backends``) a request that could not
+connect fails over to another one. The pool is the only layer retrying
+Ollama calls: the ingestion engine does not retry batches sent through it.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from src.core.embedding_engine import RETRYABLE_STATUS_CODES
+from src.core.ollama_backends import Backend, BackendPool
+
+# Requests safe to send twice
+IDEMPOTENT_PATHS = ("/api/embed", "/api/embeddings")
+# Failures after which a request certainly or probably never reached the model
+RETRYABLE_ERRORS = (httpx.NetworkError, httpx.RemoteProtocolError, httpx.ConnectTimeout)
+# Failures that certainly happened before the request was sent; they also eject a backend
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _connections(transport: Any) -> Optional[List[Any]]:
+    # httpx keeps its connection pool private; where it is not reachable, connections are not counted
+    connections = getattr(getattr(transport, "_pool", None), "connections", None)
+    return list(connections) if connections is not None else None
+
+
+def is_idempotent(request: httpx.Request) -> bool:
+    """True for requests that may be retried: embeddings and reads."""
+    return request.method == "GET" or request.url.path in IDEMPOTENT_PATHS
+
+
+class _SyncPoolTransport(httpx.BaseTransport):
+    # Handed to each httpx.Client; closing a client must not close the shared pool
+    def __init__(self, pool: "OllamaHTTPPool"):
+        self.pool = pool
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.pool._send(request)
+
+    def close(self) -> None:
+        pass
+
+
+class _AsyncPoolTransport(httpx.AsyncBaseTransport):
+    def __init__(self, pool: "OllamaHTTPPool"):
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.pool._asend(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _Once:
+    # Calls ``func(*args)`` the first time it is called
+    def __init__(self, func: Callable[..., Any], *args: Any):
+        self.func = func
+        self.args = args
+        self.called = False
+
+    def __call__(self) -> None:
+        if not self.called:
+            self.called = True
+            self.func(*self.args)
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    # Response body that frees its backend once closed
+    def __init__(self, stream: Any, release: _Once):
+        self.stream = stream
+        self.release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self.stream
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            self.release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, release: _Once):
+        self.stream = stream
+        self.release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            self.release()
+
+
+class OllamaHTTPPool:
+    """
+    Keep-alive connection pools (one sync, one per event loop) shared by every Ollama client.
+
+    The underlying transports are created on first use and re-created after
+    ``close``, so closing at shutdown never leaves a dead pool behind. Async
+    connections belong to the event loop that opened them, hence one async
+    pool per loop; a server runs a single loop and so has a single pool.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 120.0,
+        pool_timeout: float = 30.0,
+        retries: int = 2,
+        retry_backoff: float = 0.2,
+        backends: Optional[BackendPool] = None,
+    ):
+        """
+        Args:
+            max_connections: Connections open at once per pool; further requests wait for one
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for each chunk of a response, e.g. between streamed tokens
+            pool_timeout: Seconds to wait for a free connection when all are in use
+            retries: Retries of an idempotent request after the first attempt
+            retry_backoff: Delay before the first retry, doubled for each further one
+            backends: Ollama hosts to balance requests for any of them across, with failover
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_timeout = pool_timeout
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.backends = backends
+        self._lock = threading.Lock()
+        self._sync: Optional[httpx.HTTPTransport] = None
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+        self._seen: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.connections_opened = 0
+        # False once a transport did not expose its connections
+        self.connections_counted = True
+
+    @classmethod
+    def from_env(cls) -> "OllamaHTTPPool":
+        """
+        Create a pool configured from ``OLLAMA_HTTP_*`` environment variables.
+
+        Returns:
+            OllamaHTTPPool: Limits, timeouts and retries from the environment, defaults otherwise,
+            balancing across ``OLLAMA_BASE_URLS`` if set
+        """
+        return cls(
+            max_connections=int(os.environ.get("OLLAMA_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.environ.get("OLLAMA_HTTP_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.environ.get("OLLAMA_HTTP_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.environ.get("OLLAMA_HTTP_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.environ.get("OLLAMA_HTTP_READ_TIMEOUT", "120")),
+            pool_timeout=float(os.environ.get("OLLAMA_HTTP_POOL_TIMEOUT", "30")),
+            retries=int(os.environ.get("OLLAMA_HTTP_RETRIES", "2")),
+            retry_backoff=float(os.environ.get("OLLAMA_HTTP_RETRY_BACKOFF", "0.2")),
+            backends=BackendPool.from_env(),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """Connection limits of each pool."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """Timeouts of every request; writes share the read timeout."""
+        return httpx.Timeout(
+            connect=self.connect_timeout, read=self.read_timeout, write=self.read_timeout, pool=self.pool_timeout
+        )
+
+    def client_options(self) -> Dict[str, Any]:
+        """
+        Keyword arguments routing an ``OllamaEmbeddings`` or ``OllamaLLM`` through the shared pool.
+
+        Returns:
+            Dict[str, Any]: ``client_kwargs``, ``sync_client_kwargs`` and ``async_client_kwargs``
+        """
+        return {
+            "client_kwargs": {"timeout": self.timeout},
+            "sync_client_kwargs": {"transport": _SyncPoolTransport(self)},
+            "async_client_kwargs": {"transport": _AsyncPoolTransport(self)},
+        }
+
+    def _sync_transport(self) -> httpx.HTTPTransport:
+        with self._lock:
+            if self._sync is None:
+                self._sync = httpx.HTTPTransport(limits=self.limits)
+            return self._sync
+
+    def _async_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._async.get(loop)
+            if transport is None:
+                transport = self._async[loop] = httpx.AsyncHTTPTransport(limits=self.limits)
+            return transport
+
+    def _open_connections(self) -> Optional[List[Any]]:
+        with self._lock:
+            transports = ([self._sync] if self._sync is not None else []) + list(self._async.values())
+        connections = [_connections(transport) for transport in transports]
+        if any(pool is None for pool in connections):
+            return None
+        return [connection for pool in connections for connection in pool]
+
+    def _record(self, transport: Any) -> None:
+        # A connection not seen before was opened for this request
+        connections = _connections(transport)
+        with self._lock:
+            self.requests += 1
+            if connections is None:
+                self.connections_counted = False
+                return
+            for connection in connections:
+                if connection not in self._seen:
+                    self._seen.add(connection)
+                    self.connections_opened += 1
+
+    def _route(self, request: httpx.Request, tried: List[Backend]) -> Optional[Backend]:
+        # Requests for the backend pool go to its least busy member not tried yet
+        if self.backends is None or not self.backends.serves(request.url):
+            return None
+        backend = self.backends.acquire(tried) or self.backends.acquire()
+        backend.route(request)
+        tried.append(backend)
+        return backend
+
+    def _release(self, backend: Optional[Backend], error: Optional[BaseException] = None) -> None:
+        # Free the backend of an attempt; ejects it if the attempt could not connect
+        if backend is None:
+            return
+        self.backends.release(backend)
+        if isinstance(error, CONNECT_ERRORS):
+            self.backends.mark_failed(backend, error)
+
+    def _can_fail_over(self, tried: List[Backend]) -> bool:
+        return self.backends is not None and 0 < len(tried) < len(self.backends)
+
+    def _should_retry(
+        self,
+        request: httpx.Request,
+        attempt: int,
+        tried: List[Backend],
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> bool:
+        if isinstance(error, CONNECT_ERRORS) and self._can_fail_over(tried):
+            # The request never reached a model, so even a generation may go elsewhere
+            return True
+        if attempt >= self.retries or not is_idempotent(request):
+            return False
+        return response is None or response.status_code in RETRYABLE_STATUS_CODES
+
+    def _delay(self, attempt: int, tried: List[Backend]) -> float:
+        # Failing over to another backend needs no back-off
+        return 0.0 if self._can_fail_over(tried) else self.retry_backoff * 2 ** attempt
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        transport = self._sync_transport()
+        tried: List[Backend] = []
+        attempt = 0
+        while True:
+            backend = self._route(request, tried)
+            try:
+                response = transport.handle_request(request)
+            except RETRYABLE_ERRORS as e:
+                self._release(backend, e)
+                if not self._should_retry(request, attempt, tried, error=e):
+                    self.failures += 1
+                    raise
+            except BaseException as e:
+                self._release(backend, e)
+                raise
+            else:
+                self._record(transport)
+                if not self._should_retry(request, attempt, tried, response=response):
+                    if backend is None:
+                        return response
+                    # The backend stays busy until the (possibly streamed) body is closed
+                    release = _Once(self.backends.release, backend)
+                    return httpx.Response(
+                        response.status_code,
+                        headers=response.headers,
+                        stream=_ReleasingStream(response.stream, release),
+                        extensions=response.extensions,
+                    )
+                response.close()
+                self._release(backend)
+            self.retried += 1
+            time.sleep(self._delay(attempt, tried))
+            attempt += 1
+
+    async def _asend(self, request: httpx.Request) -> httpx.Response:
+        transport = self._async_transport()
+        tried: List[Backend] = []
+        attempt = 0
+        while True:
+            backend = self._route(request, tried)
+            try:
+                response = await transport.handle_async_request(request)
+            except RETRYABLE_ERRORS as e:
+                self._release(backend, e)
+                if not self._should_retry(request, attempt, tried, error=e):
+                    self.failures += 1
+                    raise
+            except BaseException as e:
+                self._release(backend, e)
+                raise
+            else:
+                self._record(transport)
+                if not self._should_retry(request, attempt, tried, response=response):
+                    if backend is None:
+                        return response
+                    release = _Once(self.backends.release, backend)
+                    return httpx.Response(
+                        response.status_code,
+                        headers=response.headers,
+                        stream=_AsyncReleasingStream(response.stream, release),
+                        extensions=response.extensions,
+                    )
+                await response.aclose()
+                self._release(backend)
+            self.retried += 1
+            await asyncio.sleep(self._delay(attempt, tried))
+            attempt += 1
+
+    def close(self) -> None:
+        """
+        Close the pools; they reopen on next use.
+
+        Async connections can only be closed on the event loop that opened
+        them: those of loops running in other threads are closed there, those
+        of the calling thread's loop (or of a stopped one) are kept until
+        ``aclose`` is awaited on that loop. Pools of closed loops are dropped.
+        """
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        with self._lock:
+            sync, self._sync = self._sync, None
+            kept: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+            for loop, transport in list(self._async.items()):
+                if loop.is_running() and loop is not current:
+                    asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
+                elif not loop.is_closed():
+                    kept[loop] = transport
+            self._async = kept
+        if sync is not None:
+            sync.close()
+
+    async def aclose(self) -> None:
+        """Close the pools, including the current event loop's async connections."""
+        with self._lock:
+            current = self._async.pop(asyncio.get_running_loop(), None)
+        self.close()
+        if current is not None:
+            await current.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool limits, open connections and reuse.
+
+        Returns:
+            Dict[str, Any]: Requests, connections opened, open and idle connections, retries, failures
+            and the backends' health and load; connection counts are None if httpx does not expose them
+        """
+        connections = self._open_connections()
+        counted = self.connections_counted
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened if counted else None,
+            "connections_open": len(connections) if connections is not None else None,
+            "connections_idle": (
+                sum(1 for connection in connections if getattr(connection, "is_idle", lambda: False)())
+                if connections is not None else None
+            ),
+            "connection_reuse_ratio": (
+                (1 - self.connections_opened / self.requests if self.requests else 0.0) if counted else None
+            ),
+            "retries": self.retried,
+            "failures": self.failures,
+            "backends": self.backends.stats() if self.backends is not None else None,
+        }
+
+
+# Shared by every Ollama client of the process
+pool = OllamaHTTPPool.from_env()
@@ -3,23 +3,56 @@
 RAG pipeline implementation for retrieving context and generating answers.
 """
 
+import asyncio
+import hashlib
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, List
-import re
-import aiofiles
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 
-from langchain_ollama import OllamaEmbeddings
 from langchain_ollama import OllamaLLM
 from langchain_community.vectorstores.faiss import FAISS
 from langchain.prompts.chat import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
-from langchain.schema.runnable import Runnable
+from langchain.schema.runnable import Runnable, RunnableLambda
+
+from src.core.admission import AdmissionController, AdmissionRejected
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.compact_store import CompactVectorStore, is_compact_store
+from src.core.context_packing import ContextPacker
+from src.core.cv_document import CVDocument
+from src.core.embeddings import create_embeddings
+from src.core.intent_router import EXPERIENCE, FULL_CV, IntentRouter, Route
+from src.core.lexical_index import LEXICAL_INDEX_FILE, BM25Index, hybrid_search, lexical_index_matches, load_lexical_index
+from src.core import metrics, ollama_backends, ollama_http, tracing
+from src.core.shards import ShardSet
+from src.core.single_flight import SingleFlight, StreamFlight, normalize_question
 
 
 # Base directories
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "faiss_index"
+COMPACT_VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "compact_index"
+
+# "faiss", "compact", or "auto" (compact if it has been built, FAISS otherwise)
+VECTORSTORE_FORMAT = os.environ.get("RAG_VECTORSTORE_FORMAT", "auto")
+
+LEXICAL_INDEX_PATH = BASE_DIR / "data" / "vectorstore" / LEXICAL_INDEX_FILE
+SHARDS_DIR = BASE_DIR / "data" / "vectorstore" / "shards"
+CV_PATH = BASE_DIR / "data" / "cv" / "cv.md"
+
+# Candidate chunks retrieved per question by vector and by BM25 search, fused
+# with reciprocal-rank fusion before context packing trims them
+RETRIEVAL_K = 20
+LEXICAL_K = 20
+RRF_K = 60
+
+# How often (seconds) a loaded chain checks whether the index on disk was replaced
+INDEX_CHECK_INTERVAL_SECONDS = float(os.environ.get("RAG_INDEX_CHECK_INTERVAL", "5"))
+
+# Upper bound for a single question (retrieval + generation) on the async path
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("RAG_REQUEST_TIMEOUT", "120"))
 
 RAG_PROMPT_TEMPLATE = """
 You are an expert assistant helping answer questions about Olaf Krasicki Freund's CV and professional experience. Always present Olaf as a DevOps and SRE professional. Use ONLY the provided context sections from the CV and the skills documentation (from the skills_md folder) to answer the user's question. Do not make up, summarize, or infer any information that is not explicitly present in the context.
@@ -71,71 +104,148 @@ Answer:
 """
 
 
-def load_vector_store():
+def default_vectorstore_dir() -> Path:
+    """
+    Pick the index directory to serve from, according to RAG_VECTORSTORE_FORMAT.
+    
+    Returns:
+        Path: COMPACT_VECTORSTORE_DIR or VECTORSTORE_DIR
+    """
+    if VECTORSTORE_FORMAT == "compact":
+        return COMPACT_VECTORSTORE_DIR
+    if VECTORSTORE_FORMAT == "auto" and is_compact_store(COMPACT_VECTORSTORE_DIR):
+        return COMPACT_VECTORSTORE_DIR
+    return VECTORSTORE_DIR
+
+
+def load_vector_store(vectorstore_dir: Optional[Path] = None):
     """
-    Load the vector store from disk with dangerous deserialization enabled.
+    Load the vector store from disk.
+    
+    A compact index (see src.core.compact_store) is memory-mapped without
+    unpickling anything; a FAISS index is loaded with dangerous deserialization
+    enabled (safe for trusted local files).
+    
+    Args:
+        vectorstore_dir (Optional[Path]): Index directory, defaults to default_vectorstore_dir()
     
     Returns:
-        FAISS: The loaded vector store
+        VectorStore: The loaded FAISS or compact vector store
     """
+    vectorstore_dir = Path(vectorstore_dir) if vectorstore_dir else default_vectorstore_dir()
     print("Loading embeddings model...")
-    ollama_base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+    # Requests to it are balanced across all OLLAMA_BASE_URLS
+    ollama_base_url = ollama_backends.base_url()
     
     # Debug the connection to Ollama
-    print(f"Using Ollama base URL: {ollama_base_url}")
-    
-    # Use a custom embeddings class to handle the input correctly
-    class SafeOllamaEmbeddings(OllamaEmbeddings):
-        def embed_documents(self, texts):
-            # Ensure texts are always strings
-            clean_texts = [str(text) if not isinstance(text, str) else text for text in texts]
-            return super().embed_documents(clean_texts)
-            
-        def embed_query(self, text):
-            # Ensure query is always a string
-            clean_text = str(text) if not isinstance(text, str) else text
-            return super().embed_query(clean_text)
+    print(f"Using Ollama base URL: {', '.join(ollama_backends.configured_urls())}")
     
-    # Create embeddings with our safer wrapper
-    embeddings = SafeOllamaEmbeddings(
-        model="llama3",
-        base_url=ollama_base_url,
-    )
+    # Memoized so repeated questions do not pay an embedding round trip
+    embeddings = create_embeddings(base_url=ollama_base_url)
     
-    print(f"Loading vector store from: {VECTORSTORE_DIR}")
+    print(f"Loading vector store from: {vectorstore_dir}")
     
-    if not VECTORSTORE_DIR.exists():
+    if not vectorstore_dir.exists():
         raise FileNotFoundError(
-            f"Vector store not found at {VECTORSTORE_DIR}. "
+            f"Vector store not found at {vectorstore_dir}. "
             "Please run the ingestion script first: python -m src.scripts.ingest_data"
         )
     
-    return FAISS.load_local(str(VECTORSTORE_DIR), embeddings, allow_dangerous_deserialization=True)
+    if is_compact_store(vectorstore_dir):
+        return CompactVectorStore.load(vectorstore_dir, embeddings)
+    return FAISS.load_local(str(vectorstore_dir), embeddings, allow_dangerous_deserialization=True)
 
 
-def create_rag_chain() -> Runnable:
+def create_rag_chain(
+    vector_store: Optional[FAISS] = None,
+    packer: Optional[ContextPacker] = None,
+    lexical_index: Optional[BM25Index] = None,
+    shards: Optional[ShardSet] = None
+) -> Runnable:
     """
     Create the RAG chain for retrieving context and generating answers.
     
+    Args:
+        vector_store (Optional[FAISS]): An already loaded vector store; loaded from disk if omitted
+        packer (Optional[ContextPacker]): Context packer, defaults to the shared context_packer
+        lexical_index (Optional[BM25Index]): BM25 index over the same chunks, loaded from LEXICAL_INDEX_PATH if omitted
+        shards (Optional[ShardSet]): Category shards of the same chunks, loaded from SHARDS_DIR if omitted
+    
     Returns:
         Runnable: The RAG chain
     """
     try:
         # Load vector store and create retriever
-        vector_store = load_vector_store()
-        retriever = vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 50}  # Retrieve top 7 most relevant chunks for broader context
-        )
+        if vector_store is None:
+            vector_store = load_vector_store()
+        
+        packer = packer or context_packer
+        if lexical_index is None:
+            lexical_index = load_lexical_index(LEXICAL_INDEX_PATH)
+        if lexical_index is not None and not lexical_index_matches(lexical_index, vector_store):
+            print("Lexical index does not match the vector store, using vector search only. Re-run ingestion to rebuild it.")
+            lexical_index = None
+        if shards is None:
+            shards = ShardSet.load(SHARDS_DIR, vector_store.embeddings)
+        if shards is not None and not shards.matches(vector_store):
+            print("Shards do not match the vector store, searching the whole index. Re-run ingestion to rebuild them.")
+            shards = None
+        
+        # Retrieval accepts a precomputed query embedding so the embedding used
+        # for the answer cache lookup is not computed twice. Vector and BM25
+        # candidates are fused and the packer keeps a diverse subset that fits
+        # the context token budget.
+        def search(question, embedding):
+            with tracing.stage("search", metrics.SEARCH_SECONDS) as details:
+                candidates, relevance = hybrid_search(
+                    vector_store, lexical_index, question, embedding, RETRIEVAL_K, LEXICAL_K, RRF_K, shards=shards
+                )
+                details["candidates"] = len(candidates)
+            return candidates, relevance
+        
+        def pack_candidates(embedding, candidates, relevance):
+            with tracing.stage("pack", metrics.CONTEXT_PACKING_SECONDS) as details:
+                packed = packer.pack(embedding, candidates, relevance)
+                # Chunk IDs rather than their text keep traces small
+                details.update(
+                    chunk_ids=[doc.id for doc in packed.documents],
+                    tokens=packed.packed_tokens,
+                    candidate_tokens=packed.candidate_tokens,
+                    duplicates=packed.duplicates,
+                )
+            metrics.PROMPT_CHUNKS.observe(len(packed.documents))
+            metrics.PROMPT_CONTEXT_TOKENS.observe(packed.packed_tokens)
+            return packed.documents
+        
+        def retrieve_docs(inputs):
+            embedding = inputs.get("embedding")
+            if embedding is None:
+                with tracing.stage("embed", metrics.QUERY_EMBEDDING_SECONDS):
+                    embedding = vector_store.embeddings.embed_query(inputs["question"])
+            return pack_candidates(embedding, *search(inputs["question"], embedding))
+        
+        async def aretrieve_docs(inputs):
+            embedding = inputs.get("embedding")
+            if embedding is None:
+                with tracing.stage("embed", metrics.QUERY_EMBEDDING_SECONDS):
+                    embedding = await vector_store.embeddings.aembed_query(inputs["question"])
+            candidates, relevance = await asyncio.to_thread(search, inputs["question"], embedding)
+            return pack_candidates(embedding, candidates, relevance)
+        
+        retriever = RunnableLambda(retrieve_docs, afunc=aretrieve_docs)
         
         # Initialize Ollama model
-        ollama_base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
-        print(f"Using Ollama LLM base URL: {ollama_base_url}")
+        ollama_base_url = ollama_backends.base_url()
+        print(f"Using Ollama LLM base URL: {', '.join(ollama_backends.configured_urls())}")
         
         llm = OllamaLLM(
             model="llama3",
             temperature=0.0,  # Set to 0.0 for maximum factuality
             base_url=ollama_base_url,
+            # Same keep-alive connections as the embeddings; generations are never retried
+            **ollama_http.pool.client_options(),
+            # Time to first token, generation time and token counts for /metrics
+            callbacks=[metrics.LLMMetricsCallback()],
         )
         
         # Create prompt template
@@ -145,18 +255,19 @@ def create_rag_chain() -> Runnable:
         ])
         
         def format_context_docs(docs):
+            with tracing.stage("format", metrics.CONTEXT_FORMAT_SECONDS) as details:
+                context = _format_context_docs(docs)
+                details["chars"] = len(context)
+            return context
+        
+        def _format_context_docs(docs):
+            # The chunks that went into the prompt are in the request trace (by ID)
             if not docs:
                 return "No relevant context found."
             try:
                 if isinstance(docs, list) and all(hasattr(doc, 'page_content') for doc in docs):
-                    # Log the retrieved context for debugging
-                    print("\n--- Retrieved context for query ---")
-                    for doc in docs:
-                        print(doc.page_content)
-                    print("--- End of context ---\n")
                     return "\n\n".join(doc.page_content for doc in docs)
                 elif isinstance(docs, str):
-                    print(f"\n--- Retrieved context (str) ---\n{docs}\n--- End of context ---\n")
                     return docs
                 else:
                     return str(docs)
@@ -177,75 +288,542 @@ def create_rag_chain() -> Runnable:
         raise
 
 
+def index_version(vectorstore_dir: Path) -> Optional[str]:
+    """
+    Fingerprint the index files on disk so that re-ingestion changes the version.
+    
+    Args:
+        vectorstore_dir (Path): Index directory
+    
+    Returns:
+        Optional[str]: A short hash of file names, sizes and mtimes, or None if there is no index
+    """
+    vectorstore_dir = Path(vectorstore_dir)
+    if not vectorstore_dir.is_dir():
+        return None
+    digest = hashlib.sha1()
+    for path in sorted(vectorstore_dir.iterdir()):
+        if path.is_file():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class RAGChainManager:
+    """
+    Process-wide owner of the vector store and the RAG chain built on top of it.
+
+    Building the chain means constructing the embeddings client, unpickling the
+    FAISS index and creating the LLM client, so it is done once (normally at API
+    startup) and the result is shared by every request. The index on disk is
+    re-checked every INDEX_CHECK_INTERVAL_SECONDS and the chain is rebuilt when
+    re-ingestion replaced it; ``reset`` drops the chain explicitly.
+    """
+
+    NOT_LOADED = "not_loaded"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, vectorstore_dir: Optional[Path] = None, check_interval: Optional[float] = None):
+        self.vectorstore_dir = Path(vectorstore_dir) if vectorstore_dir else default_vectorstore_dir()
+        self.check_interval = INDEX_CHECK_INTERVAL_SECONDS if check_interval is None else check_interval
+        self._lock = threading.Lock()
+        self._state = self.NOT_LOADED
+        self._chain: Optional[Runnable] = None
+        self._vector_store: Optional[FAISS] = None
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._error: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self._load_seconds: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Current lifecycle state of the manager."""
+        return self._state
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the chain has been built successfully."""
+        return self._chain is not None
+
+    @property
+    def vector_store(self) -> Optional[FAISS]:
+        """The shared vector store, or None if the chain is not loaded."""
+        return self._vector_store
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of the index the current chain was built from."""
+        return self._version
+
+    def load(self, force: bool = False) -> Runnable:
+        """
+        Build the vector store and RAG chain if they are not built yet.
+
+        Args:
+            force (bool): Rebuild even if a chain is loaded, e.g. after re-ingestion
+
+        Returns:
+            Runnable: The shared RAG chain
+
+        Raises:
+            Exception: Whatever loading the vector store or building the chain raised
+        """
+        if self._chain is not None and not force:
+            return self._chain
+        with self._lock:
+            version = index_version(self.vectorstore_dir)
+            if self._chain is not None and (not force or version == self._version):
+                return self._chain
+            self._state = self.LOADING
+            started = time.perf_counter()
+            try:
+                vector_store = load_vector_store(self.vectorstore_dir)
+                chain = create_rag_chain(vector_store)
+            except Exception as e:
+                # Keep serving the previous chain if there is one
+                self._state = self.READY if self._chain is not None else self.FAILED
+                self._error = str(e)
+                raise
+            self._vector_store = vector_store
+            self._chain = chain
+            self._version = version
+            self._checked_at = time.monotonic()
+            self._error = None
+            self._load_seconds = time.perf_counter() - started
+            self._loaded_at = time.time()
+            self._state = self.READY
+            print(f"RAG chain ready in {self._load_seconds:.2f}s (index version {version})")
+            return chain
+
+    def needs_reload(self) -> bool:
+        """
+        Tell whether ``get_chain`` would have to (re)build the chain.
+
+        The index on disk is stat-ed at most once per check interval.
+
+        Returns:
+            bool: True if no chain is loaded or the index on disk changed
+        """
+        if self._chain is None:
+            return True
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return index_version(self.vectorstore_dir) != self._version
+
+    def get_chain(self) -> Runnable:
+        """
+        Return the shared RAG chain, building it on first use or after re-ingestion.
+
+        Returns:
+            Runnable: The shared RAG chain
+        """
+        if self._chain is not None and self.needs_reload():
+            print("Vector store changed on disk, reloading RAG chain...")
+            try:
+                return self.load(force=True)
+            except Exception as e:
+                print(f"Reloading RAG chain failed, keeping the previous one: {e}")
+        return self.load()
+
+    async def aget_chain(self) -> Runnable:
+        """
+        Return the shared RAG chain without blocking the event loop on a (re)build.
+
+        Returns:
+            Runnable: The shared RAG chain
+        """
+        if not self.needs_reload():
+            return self._chain
+        return await asyncio.to_thread(self.get_chain)
+
+    def reset(self) -> None:
+        """Drop the cached chain and vector store so the next request rebuilds them."""
+        with self._lock:
+            self._chain = None
+            self._vector_store = None
+            self._version = None
+            self._error = None
+            self._loaded_at = None
+            self._load_seconds = None
+            self._state = self.NOT_LOADED
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe the manager state for health checks.
+
+        Returns:
+            Dict[str, Any]: State, readiness, index version, load timing and the last error if any
+        """
+        return {
+            "state": self._state,
+            "ready": self.is_ready,
+            "version": self._version,
+            "loaded_at": self._loaded_at,
+            "load_seconds": self._load_seconds,
+            "error": self._error,
+        }
+
+
+# Shared by every request in the process
+chain_manager = RAGChainManager()
+answer_cache = SemanticAnswerCache.from_env()
+context_packer = ContextPacker.from_env()
+# Parsed once; re-read only when cv.md changes on disk
+cv_document = CVDocument(CV_PATH, check_interval=INDEX_CHECK_INTERVAL_SECONDS)
+# Decides, before any retrieval, which questions are answered straight from the CV
+intent_router = IntentRouter()
+# Concurrent requests for the same question share one retrieval + generation
+answer_flights = SingleFlight()
+stream_flights = StreamFlight()
+# Bounds the generations running on Ollama at once; CV and cached answers skip it
+admission = AdmissionController.from_env()
+
+metrics.registry.callback_gauge(
+    "rag_answer_cache_hit_ratio", "Share of answer cache lookups that were hits.",
+    lambda: answer_cache.stats()["hit_ratio"]
+)
+metrics.registry.callback_gauge(
+    "rag_embedding_cache_hit_ratio", "Share of query embeddings served from the embedding cache.",
+    lambda: (embedding_cache_stats() or {}).get("hit_ratio")
+)
+metrics.registry.callback_gauge(
+    "rag_coalesced_in_flight", "Shared generations running now, by kind.",
+    lambda: {("answer",): answer_flights.stats()["in_flight"], ("stream",): stream_flights.stats()["in_flight"]},
+    ["kind"]
+)
+metrics.registry.callback_gauge(
+    "rag_generation_slots_active", "Generations holding an admission slot.", lambda: admission.active
+)
+metrics.registry.callback_gauge(
+    "rag_generation_queue_depth", "Generations waiting for an admission slot.", lambda: admission.queued
+)
+def _ollama_connections() -> Optional[Dict[Tuple[str], int]]:
+    # Omitted when httpx does not expose the pool's connections
+    stats = ollama_http.pool.stats()
+    if stats["connections_open"] is None:
+        return None
+    return {("open",): stats["connections_open"], ("idle",): stats["connections_idle"]}
+
+
+metrics.registry.callback_gauge(
+    "ollama_http_connections", "Connections to Ollama in the shared pool, by state.", _ollama_connections, ["state"]
+)
+metrics.registry.callback_gauge(
+    "ollama_http_connection_reuse_ratio", "Share of Ollama requests served on an already open connection.",
+    lambda: ollama_http.pool.stats()["connection_reuse_ratio"]
+)
+metrics.registry.callback_gauge(
+    "ollama_backend_healthy", "1 if the Ollama backend takes requests, 0 if it is ejected.",
+    lambda: {(b.url,): int(b.healthy) for b in ollama_http.pool.backends.backends} if ollama_http.pool.backends else None,
+    ["backend"]
+)
+metrics.registry.callback_gauge(
+    "ollama_backend_requests_in_flight", "Requests in flight per Ollama backend.",
+    lambda: {(b.url,): b.in_flight for b in ollama_http.pool.backends.backends} if ollama_http.pool.backends else None,
+    ["backend"]
+)
+
+
+def embedding_cache_stats() -> Optional[Dict[str, Any]]:
+    """
+    Report the query-embedding cache statistics of the loaded vector store.
+    
+    Returns:
+        Optional[Dict[str, Any]]: The statistics, or None if no memoized embeddings are loaded
+    """
+    embeddings = getattr(chain_manager.vector_store, "embeddings", None)
+    stats = getattr(embeddings, "stats", None)
+    return stats() if callable(stats) else None
+
+
 def is_cv_query(question: str) -> bool:
     """
-    Detect if the user query is a request to show the CV or resume.
+    Detect if the user query is a request for the CV, its experience entries or one of its sections.
     Args:
         question (str): The user query
     Returns:
-        bool: True if the query is about the CV, False otherwise
+        bool: True if the query is answered from the CV, False otherwise
     """
-    cv_keywords = [
-        r"\bcv\b", r"curriculum vitae", r"resume", r"show.*cv", r"show.*resume", r"see.*cv", r"see.*resume",
-        r"your cv", r"your resume", r"full cv", r"full resume", r"download.*cv", r"download.*resume"
-    ]
-    q = question.lower()
-    return any(re.search(pattern, q) for pattern in cv_keywords)
+    return intent_router.classify(question).serves_cv
 
 
 def get_full_cv_markdown() -> str:
     """
     Return the full CV markdown as a string.
     """
-    base_dir = Path(__file__).resolve().parent.parent.parent
-    cv_path = base_dir / "data" / "cv" / "cv.md"
-    if not cv_path.exists():
-        return "CV file not found."
+    return cv_document.full_markdown()
+
+
+def cv_answer(route: Route) -> str:
+    """
+    Serve a routed question straight from the parsed CV.
+    Args:
+        route (Route): A route for which ``serves_cv`` is True
+    Returns:
+        str: The full CV, the experience entries or the requested section as Markdown
+    """
+    if route.intent == FULL_CV:
+        return cv_document.full_markdown()
+    if route.intent == EXPERIENCE:
+        return cv_document.experience_markdown()
+    return cv_document.section_markdown(route.section)
+
+
+def _answer_result(question: str, answer: str, cached: bool = False, source: str = "rag") -> Dict[str, Any]:
+    """Build the result dictionary for a successfully answered question."""
+    metrics.ANSWERS.inc(source="cache" if cached else source)
+    tracing.annotate(source="cache" if cached else source, answer_chars=len(answer))
+    return {
+        "question": question,
+        "answer": answer,
+        "success": True,
+        "cached": cached
+    }
+
+
+def _embed_question(question: str) -> Optional[List[float]]:
+    """
+    Embed a question once, for both the answer cache lookup and retrieval.
+    
+    Returns None when the cache is disabled, leaving retrieval to embed the question itself.
+    """
+    embeddings = getattr(chain_manager.vector_store, "embeddings", None)
+    if embeddings is None or not answer_cache.enabled:
+        return None
+    with tracing.stage("embed", metrics.QUERY_EMBEDDING_SECONDS):
+        return embeddings.embed_query(question)
+
+
+async def _aembed_question(question: str) -> Optional[List[float]]:
+    """Async variant of ``_embed_question``."""
+    embeddings = getattr(chain_manager.vector_store, "embeddings", None)
+    if embeddings is None or not answer_cache.enabled:
+        return None
+    with tracing.stage("embed", metrics.QUERY_EMBEDDING_SECONDS):
+        return await embeddings.aembed_query(question)
+
+
+def _error_result(question: str, e: Exception) -> Dict[str, Any]:
+    """Build the result dictionary for a question that could not be answered."""
+    if isinstance(e, AdmissionRejected):
+        # Expected under load; reported through metrics, not printed per request
+        metrics.ANSWERS.inc(source="rejected")
+        tracing.annotate(source="rejected", status_code=e.status_code)
+        return {
+            "question": question,
+            "answer": f"{e} Please try again in {e.retry_after} seconds.",
+            "success": False,
+            "error_details": str(e),
+            "status_code": e.status_code,
+            "retry_after": e.retry_after,
+        }
+    print(f"Error answering question: {str(e)}")
+    metrics.ANSWERS.inc(source="error")
+    tracing.annotate(source="error", error_details=str(e) or type(e).__name__)
+    error_message = "I encountered an issue processing your question. This could be due to a temporary problem with the language model or the retrieval system."
+    if isinstance(e, asyncio.TimeoutError):
+        error_message = "Generating the answer took too long. Please try again or ask a more specific question."
+    elif "validation error" in str(e).lower():
+        print("Validation error detected, likely an issue with the embeddings API")
+        error_message = "There was an issue with the underlying embeddings model. The system administrators have been notified."
+    
+    return {
+        "question": question,
+        "answer": error_message,
+        "success": False,
+        "error_details": str(e) or type(e).__name__  # Include the technical details for debugging
+    }
+
+
+def answer_question(question: str) -> Dict[str, Any]:
+    """
+    Answer a question using the RAG pipeline, or straight from the CV if the intent router matches it.
+    Args:
+        question (str): The question to answer
+    Returns:
+        Dict[str, Any]: A dictionary containing the question and answer
+    """
     try:
-        with open(cv_path, mode="r", encoding="utf-8") as f:
-            return f.read()
+        route = intent_router.route(question)
+        tracing.annotate(question_chars=len(question), intent=route.intent)
+        if route.serves_cv:
+            return _answer_result(question, cv_answer(route), source="cv")
+        rag_chain = chain_manager.get_chain()
+        version = chain_manager.version
+        embedding = _embed_question(question)
+        if embedding is not None:
+            cached = answer_cache.lookup(question, embedding, version)
+            if cached is not None:
+                return _answer_result(question, cached, cached=True)
+        answer = rag_chain.invoke({"question": question, "embedding": embedding})
+        if embedding is not None:
+            answer_cache.store(question, embedding, answer, version)
+        return _answer_result(question, answer)
     except Exception as e:
-        print(f"[ERROR] Failed to read CV file: {e}")
-        return "Error reading CV file."
+        return _error_result(question, e)
 
 
-def answer_question(question: str) -> Dict[str, Any]:
+async def answer_question_async(question: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     """
-    Answer a question using the RAG pipeline, or return the full CV if the query is about the CV.
+    Answer a question without blocking the event loop.
+
+    Retrieval and generation run through the chain's ``ainvoke``; building the
+    chain, if it is not loaded yet, happens in a worker thread. Concurrent
+    calls with the same normalized question share one generation.
     Args:
         question (str): The question to answer
+        timeout (Optional[float]): Seconds before giving up, defaults to REQUEST_TIMEOUT_SECONDS
     Returns:
         Dict[str, Any]: A dictionary containing the question and answer
     """
+    timeout = REQUEST_TIMEOUT_SECONDS if timeout is None else timeout
     try:
-        print(f"Processing question: {question}")
-        if is_cv_query(question):
-            cv_md = get_full_cv_markdown()
-            return {
-                "question": question,
-                "answer": cv_md,
-                "success": True
-            }
-        rag_chain = create_rag_chain()
-        answer = rag_chain.invoke({"question": question})
-        return {
-            "question": question,
-            "answer": answer,
-            "success": True
-        }
+        route = intent_router.route(question)
+        tracing.annotate(question_chars=len(question), intent=route.intent)
+        if route.serves_cv:
+            return _answer_result(question, cv_answer(route), source="cv")
+        result = await asyncio.wait_for(
+            answer_flights.run(normalize_question(question), lambda: _agenerate_answer(question)),
+            timeout=timeout,
+        )
+        return {**result, "question": question}
     except Exception as e:
-        print(f"Error answering question: {str(e)}")
-        error_message = "I encountered an issue processing your question. This could be due to a temporary problem with the language model or the retrieval system."
-        if "validation error" in str(e).lower():
-            print("Validation error detected, likely an issue with the embeddings API")
-            error_message = "There was an issue with the underlying embeddings model. The system administrators have been notified."
-        
-        return {
-            "question": question,
-            "answer": error_message,
-            "success": False,
-            "error_details": str(e)  # Include the technical details for debugging
-        }
+        return _error_result(question, e)
+
+
+async def _agenerate_answer(question: str) -> Dict[str, Any]:
+    """Run the RAG chain for a question, serving and filling the answer cache."""
+    rag_chain = await chain_manager.aget_chain()
+    version = chain_manager.version
+    embedding = await _aembed_question(question)
+    if embedding is not None:
+        cached = answer_cache.lookup(question, embedding, version)
+        if cached is not None:
+            return _answer_result(question, cached, cached=True)
+    async with admission.slot():
+        answer = await rag_chain.ainvoke({"question": question, "embedding": embedding})
+    if embedding is not None:
+        answer_cache.store(question, embedding, answer, version)
+    return _answer_result(question, answer)
+
+
+async def astream_answer(question: str, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the answer to a question as it is generated.
+
+    Concurrent streams of the same normalized question subscribe to one
+    generation; a late subscriber first receives the tokens produced so far.
+    See ``_astream_answer`` for the events.
+    Args:
+        question (str): The question to answer
+        timeout (Optional[float]): Seconds before giving up, defaults to REQUEST_TIMEOUT_SECONDS
+    Yields:
+        Dict[str, Any]: Token, done or error events
+    """
+    events = stream_flights.subscribe(normalize_question(question), lambda: _astream_answer(question, timeout))
+    try:
+        async for event in events:
+            yield {**event, "question": question} if event["type"] == "done" else event
+    finally:
+        await events.aclose()
+
+
+async def _astream_answer(question: str, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the answer to a question as it is generated, without coalescing.
+
+    Yields ``{"type": "token", "text": ...}`` events while the LLM produces
+    output, then a single ``done`` event carrying metadata (timings, sizes), or
+    an ``error`` event if the question could not be answered. Closing the
+    generator early closes the underlying chain stream, which drops the
+    connection to Ollama and stops the generation.
+    Args:
+        question (str): The question to answer
+        timeout (Optional[float]): Seconds before giving up, defaults to REQUEST_TIMEOUT_SECONDS
+    Yields:
+        Dict[str, Any]: Token, done or error events
+    """
+    timeout = REQUEST_TIMEOUT_SECONDS if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    first_token_at = None
+    answer_length = 0
+    chunks = 0
+    source = "rag"
+    stream = None
+    admitted_at = None
+    try:
+        route = intent_router.route(question)
+        tracing.annotate(question_chars=len(question), intent=route.intent)
+        if route.serves_cv:
+            source = "cv"
+            cv_md = cv_answer(route)
+            first_token_at = loop.time()
+            answer_length, chunks = len(cv_md), 1
+            yield {"type": "token", "text": cv_md}
+        else:
+            rag_chain = await chain_manager.aget_chain()
+            version = chain_manager.version
+            embedding = await asyncio.wait_for(_aembed_question(question), timeout=timeout)
+            cached = answer_cache.lookup(question, embedding, version) if embedding is not None else None
+            if cached is not None:
+                source = "cache"
+                first_token_at = loop.time()
+                answer_length, chunks = len(cached), 1
+                yield {"type": "token", "text": cached}
+            else:
+                await admission.acquire(min(admission.queue_timeout, max(deadline - loop.time(), 0)))
+                admitted_at = loop.time()
+                stream = rag_chain.astream({"question": question, "embedding": embedding})
+            answer_parts = []
+            while stream is not None:
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=max(deadline - loop.time(), 0))
+                except StopAsyncIteration:
+                    break
+                if not chunk:
+                    continue
+                if first_token_at is None:
+                    first_token_at = loop.time()
+                answer_length += len(chunk)
+                chunks += 1
+                answer_parts.append(chunk)
+                yield {"type": "token", "text": chunk}
+            if stream is not None and embedding is not None:
+                answer_cache.store(question, embedding, "".join(answer_parts), version)
+    except Exception as e:
+        result = _error_result(question, e)
+        event = {"type": "error", "message": result["answer"], "error_details": result["error_details"]}
+        if "retry_after" in result:
+            event["status_code"] = result["status_code"]
+            event["retry_after"] = result["retry_after"]
+        yield event
+        return
+    finally:
+        if stream is not None:
+            await stream.aclose()
+        if admitted_at is not None:
+            admission.release(loop.time() - admitted_at)
+    total = loop.time() - started
+    ttft_ms = round((first_token_at - started) * 1000, 1) if first_token_at is not None else None
+    metrics.ANSWERS.inc(source=source)
+    tracing.annotate(source=source, chunks=chunks, answer_chars=answer_length, time_to_first_token_ms=ttft_ms)
+    yield {
+        "type": "done",
+        "question": question,
+        "success": True,
+        "source": source,
+        "chunks": chunks,
+        "answer_length": answer_length,
+        "time_to_first_token_ms": ttft_ms,
+        "total_ms": round(total * 1000, 1),
+    }
 
 
 async def list_all_cv_entries() -> str:
@@ -254,34 +832,7 @@ async def list_all_cv_entries() -> str:
     Returns:
         A Markdown-formatted string listing all professional experience entries.
     """
-    base_dir = Path(__file__).resolve().parent.parent.parent
-    cv_path = base_dir / "data" / "cv" / "cv.md"
-    if not cv_path.exists():
-        return "CV file not found."
-    try:
-        async with aiofiles.open(cv_path, mode="r", encoding="utf-8") as f:
-            cv_markdown = await f.read()
-    except Exception as e:
-        print(f"[ERROR] Failed to read CV file: {e}")
-        return "Error reading CV file."
-    # Debug: print the first 500 characters of the CV markdown
-    print("[DEBUG] Loaded CV markdown (first 500 chars):", cv_markdown[:500])
-    # Extract the Professional Experience section
-    match = re.search(r"## Professional Experience(.+?)(\n## |\Z)", cv_markdown, re.DOTALL)
-    if not match:
-        print("[DEBUG] No professional experience section found in the CV.")
-        return "No professional experience section found in the CV."
-    section = match.group(1)
-    # Debug: print the section
-    print("[DEBUG] Professional Experience section (first 500 chars):", section[:500])
-    # Ensure all entries start with '###'
-    entries = re.findall(r"(### .+?)(?=\n### |\Z)", section, re.DOTALL)
-    if not entries:
-        print("[DEBUG] No '###' entries found, returning whole section.")
-        return f"## Professional Experience\n{section.strip()}"
-    formatted = "\n\n".join(entry.strip() for entry in entries)
-    print(f"[DEBUG] Found {len(entries)} entries.")
-    return f"## Professional Experience\n\n{formatted}"
+    return cv_document.experience_markdown()
 
 async def list_cv_section(section_name: str) -> str:
     """
@@ -291,24 +842,7 @@ async def list_cv_section(section_name: str) -> str:
     Returns:
         A Markdown-formatted string of the section, or an error message.
     """
-    base_dir = Path(__file__).resolve().parent.parent.parent
-    cv_path = base_dir / "data" / "cv" / "cv.md"
-    if not cv_path.exists():
-        return f"CV file not found."
-    try:
-        async with aiofiles.open(cv_path, mode="r", encoding="utf-8") as f:
-            cv_markdown = await f.read()
-    except Exception as e:
-        print(f"[ERROR] Failed to read CV file: {e}")
-        return "Error reading CV file."
-    # Extract the requested section
-    pattern = rf"## {re.escape(section_name)}(.+?)(\n## |\Z)"
-    match = re.search(pattern, cv_markdown, re.DOTALL)
-    if not match:
-        print(f"[DEBUG] No section '{section_name}' found in the CV.")
-        return f"No section '{section_name}' found in the CV."
-    section = match.group(1)
-    return f"## {section_name}\n{section.strip()}"
+    return cv_document.section_markdown(section_name)
 
 async def list_cv_full() -> str:
     """
@@ -316,17 +850,7 @@ async def list_cv_full() -> str:
     Returns:
         The full CV as a Markdown-formatted string, or an error message.
     """
-    base_dir = Path(__file__).resolve().parent.parent.parent
-    cv_path = base_dir / "data" / "cv" / "cv.md"
-    if not cv_path.exists():
-        return "CV file not found."
-    try:
-        async with aiofiles.open(cv_path, mode="r", encoding="utf-8") as f:
-            cv_markdown = await f.read()
-    except Exception as e:
-        print(f"[ERROR] Failed to read CV file: {e}")
-        return "Error reading CV file."
-    return cv_markdown
+    return cv_document.full_markdown()
 
 async def generate_response(query: str, context: List[Dict[str, Any]] = None) -> str:
     """
@@ -337,21 +861,5 @@ async def generate_response(query: str, context: List[Dict[str, Any]] = None) ->
     Returns:
         Generated response
     """
-    cv_keywords = [
-        "show me your cv", "list all professional experience", "show all cv entries", "full cv", "all roles", "all jobs", "all experience", "cv entries", "cv", "professional experience"
-    ]
-    section_keywords = [
-        "core competencies", "technical skills", "summary", "volunteering", "languages", "interests"
-    ]
-    q_lower = query.lower()
-    if any(k in q_lower for k in cv_keywords):
-        # If user asks for the full CV, return all professional experience entries
-        return await list_all_cv_entries()
-    for section in section_keywords:
-        if section in q_lower:
-            # Return the requested section
-            pretty_section = section.title() if section != "core competencies" else "Core Competencies & Technical Skills"
-            return await list_cv_section(pretty_section)
-    if "full cv" in q_lower or "entire cv" in q_lower or "complete cv" in q_lower:
-        return await list_cv_full()
-    # ...existing RAG pipeline code...
\ No newline at end of file
+    result = await answer_question_async(query)
+    return result["answer"]
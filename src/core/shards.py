@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+"""
+Category shards: the vector store split into one compact index per topic group.
+
+Ingestion writes ``shards/<group>/`` compact indexes plus ``shards/shards.json``
+(chunk counts and a normalised centroid per shard). At query time a routing
+step picks the shards worth searching: those nearest to the question by centroid
+similarity, plus any named by an unambiguous keyword in the question; the chosen
+shards are searched concurrently and their hits merged by distance.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.core.compact_store import CompactVectorStore, embeddings_model_name, faiss_store_contents, write_compact_store
+from src.core.context_packing import store_ids
+
+SHARDS_MANIFEST = "shards.json"
+DEFAULT_SHARD = "general"
+
+# Top-level folders (or files) of data/skills_md/pages per shard; everything
+# else goes to DEFAULT_SHARD. CV documents always go to the "cv" shard.
+SHARD_DIRECTORIES = {
+    "cv": ("cv", "about-me"),
+    "cloud": (
+        "azure", "az-cli", "azure-powershell", "azure-devops", "bicep", "public-clouds",
+        "cloud-migration", "finops", "private-cloud",
+    ),
+    "containers": ("containers", "gitops", "nixos"),
+    "iac": ("terraform",),
+    "devops": (
+        "devops", "devops-tools", "sre", "platform-engineering", "agile-development",
+        "quick-starts", "development", "testing", "best-practises",
+    ),
+    "security": ("dev-secops", "secops", "security"),
+    "ai": ("llm", "aiops"),
+}
+
+# Question keywords that add a shard to the nearest ones; only words unlikely
+# to appear in questions about other shards ("zero", "ai", "platform" are not)
+SHARD_KEYWORDS = {
+    "cv": (
+        "cv", "resume", "worked", "job", "jobs", "role", "roles", "company", "companies",
+        "employer", "employers", "career", "education", "certification", "certifications", "contract",
+    ),
+    "cloud": ("azure", "aws", "gcp", "cloud", "bicep", "finops", "migration"),
+    "containers": (
+        "container", "containers", "docker", "kubernetes", "k8s", "aks", "eks", "podman",
+        "openshift", "flux", "gitops", "argocd", "helm", "nix", "nixos",
+    ),
+    "iac": ("terraform", "terragrunt", "iac", "infrastructure"),
+    "devops": ("devops", "sre", "pipeline", "pipelines", "testing", "agile"),
+    "security": ("security", "secops", "devsecops", "vulnerability", "vulnerabilities", "scanning", "secrets"),
+    "ai": ("llm", "llms", "aiops", "copilot", "claude", "gemini", "ollama", "mlops"),
+}
+
+_DIRECTORY_TO_SHARD = {directory: shard for shard, dirs in SHARD_DIRECTORIES.items() for directory in dirs}
+
+
+def shard_for(metadata: Dict[str, Any]) -> str:
+    """
+    Name the shard a chunk belongs to.
+
+    Args:
+        metadata: Chunk metadata with ``category`` and ``source``
+
+    Returns:
+        str: Shard name
+    """
+    if metadata.get("category") == "cv":
+        return "cv"
+    parts = Path(str(metadata.get("source", ""))).parts
+    if "pages" in parts and parts.index("pages") + 1 < len(parts):
+        top = Path(parts[parts.index("pages") + 1]).stem.lower()
+        return _DIRECTORY_TO_SHARD.get(top, DEFAULT_SHARD)
+    return DEFAULT_SHARD
+
+
+def chunk_ids_digest(ids: Iterable[Any]) -> str:
+    """SHA-256 of a set of chunk IDs, in any order."""
+    return hashlib.sha256("\n".join(sorted(str(chunk_id) for chunk_id in ids)).encode("utf-8")).hexdigest()
+
+
+def write_shards(vectors: np.ndarray, documents: List[Document], target_dir: Path, model: Optional[str] = None) -> Dict[str, int]:
+    """
+    Split chunks into shards and write them, replacing any existing shards atomically.
+
+    Args:
+        vectors: Matrix of shape (len(documents), dimension)
+        documents: Chunks, in the same order as the vectors
+        target_dir: Shards directory
+        model: Embedding model name recorded in each shard header
+
+    Returns:
+        Dict[str, int]: Chunks per shard
+    """
+    target_dir = Path(target_dir)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    groups: Dict[str, List[int]] = {}
+    for position, doc in enumerate(documents):
+        groups.setdefault(shard_for(doc.metadata), []).append(position)
+
+    tmp_dir = target_dir.with_name(target_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    manifest = {"count": len(documents), "ids_digest": chunk_ids_digest(doc.id for doc in documents), "shards": {}}
+    for name, positions in sorted(groups.items()):
+        shard_vectors = vectors[positions]
+        write_compact_store(tmp_dir / name, shard_vectors, [documents[p] for p in positions], model=model)
+        centroid = shard_vectors.mean(axis=0)
+        centroid = centroid / max(float(np.linalg.norm(centroid)), 1e-12)
+        manifest["shards"][name] = {"count": len(positions), "centroid": centroid.tolist()}
+    with open(tmp_dir / SHARDS_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    old_dir = target_dir.with_name(target_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if target_dir.exists():
+        os.replace(target_dir, old_dir)
+    os.replace(tmp_dir, target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return {name: len(positions) for name, positions in groups.items()}
+
+
+def convert_faiss_to_shards(faiss_store: Any, target_dir: Path, model: Optional[str] = None) -> Dict[str, int]:
+    """
+    Write the shards of a loaded LangChain FAISS store (flat index).
+
+    Args:
+        faiss_store: The FAISS vector store
+        target_dir: Shards directory
+        model: Embedding model name, detected from the store's embeddings if omitted
+
+    Returns:
+        Dict[str, int]: Chunks per shard
+    """
+    vectors, documents = faiss_store_contents(faiss_store)
+    model = model or embeddings_model_name(faiss_store.embeddings)
+    return write_shards(vectors, documents, target_dir, model=model)
+
+
+class ShardSet:
+    """
+    The category shards of one index, with routing and concurrent search.
+    """
+
+    def __init__(self, directory: Path, embeddings: Optional[Embeddings] = None, fanout: int = 3):
+        """
+        Args:
+            directory: Shards directory written by ``write_shards``
+            embeddings: Embeddings used to embed queries
+            fanout: Nearest-centroid shards searched for every question, besides keyword matches
+        """
+        self.directory = Path(directory)
+        self.fanout = fanout
+        with open(self.directory / SHARDS_MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.count = int(manifest["count"])
+        self.ids_digest: Optional[str] = manifest.get("ids_digest")
+        self.names = sorted(manifest["shards"])
+        self.shards = {name: CompactVectorStore.load(self.directory / name, embeddings) for name in self.names}
+        self._centroids = np.asarray([manifest["shards"][name]["centroid"] for name in self.names], dtype=np.float32)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.names)), thread_name_prefix="shard-search")
+
+    @classmethod
+    def load(cls, directory: Path, embeddings: Optional[Embeddings] = None, fanout: Optional[int] = None) -> Optional["ShardSet"]:
+        """
+        Open the shards if ingestion has written them.
+
+        Args:
+            directory: Shards directory
+            embeddings: Embeddings used to embed queries
+            fanout: Nearest-centroid shards searched for every question, defaults to ``RAG_SHARD_FANOUT`` or 3
+
+        Returns:
+            Optional[ShardSet]: The shards, or None if they are missing or unreadable
+        """
+        if not (Path(directory) / SHARDS_MANIFEST).is_file():
+            return None
+        fanout = fanout if fanout is not None else int(os.environ.get("RAG_SHARD_FANOUT", "3"))
+        try:
+            return cls(directory, embeddings, fanout=fanout)
+        except Exception as e:
+            print(f"Error loading shards from {directory}: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def matches(self, vector_store: Any) -> bool:
+        """
+        Tell whether the shards were split from this vector store.
+
+        Compares a digest of every chunk ID, so shards left over from an
+        interrupted ingestion or an edit that kept the chunk count are caught;
+        shards written before the digest was recorded never match.
+
+        Args:
+            vector_store: A FAISS or compact vector store
+
+        Returns:
+            bool: True if the shards hold exactly the store's chunks
+        """
+        ids = store_ids(vector_store)
+        if ids is None or self.ids_digest is None or len(ids) != self.count:
+            return False
+        return chunk_ids_digest(ids) == self.ids_digest
+
+    def route(self, question: str, embedding: Sequence[float]) -> List[str]:
+        """
+        Choose the shards to search for a question.
+
+        Args:
+            question: Query text
+            embedding: Query embedding
+
+        Returns:
+            List[str]: Shard names, keyword matches first, then the ``fanout`` nearest centroids not matched already
+        """
+        words = set(re.findall(r"[a-z0-9]+", question.lower()))
+        matched = [name for name in self.names if words & set(SHARD_KEYWORDS.get(name, ()))]
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        nearest = np.argsort(-(self._centroids @ query), kind="stable")[:self.fanout]
+        return matched + [self.names[i] for i in nearest if self.names[i] not in matched]
+
+    def search_with_vectors(self, question: str, embedding: Sequence[float], k: int) -> List[Tuple[Document, np.ndarray]]:
+        """
+        Search the routed shards concurrently and merge their hits by distance.
+
+        Args:
+            question: Query text, for routing
+            embedding: Query embedding
+            k: Number of chunks
+
+        Returns:
+            List[Tuple[Document, np.ndarray]]: Chunks and vectors, nearest first
+        """
+        names = self.route(question, embedding)
+        query = np.asarray(embedding, dtype=np.float32)
+        futures = [
+            self._executor.submit(self.shards[name].similarity_search_with_vectors_by_vector, query, k)
+            for name in names
+        ]
+        hits = [hit for future in futures for hit in future.result()]
+        hits.sort(key=lambda hit: float(np.sum((hit[1] - query) ** 2)))
+        return hits[:k]
+
+    def stats(self) -> Dict[str, int]:
+        """Chunks per shard."""
+        return {name: len(shard) for name, shard in self.shards.items()}
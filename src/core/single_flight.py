@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Request coalescing: concurrent identical requests share one in-flight computation.
+"""
+
+import asyncio
+import re
+import unicodedata
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from src.core import tracing
+
+T = TypeVar("T")
+
+
+def _current_trace_id() -> Optional[str]:
+    trace = tracing.current_trace()
+    return trace.trace_id if trace is not None else None
+
+
+def _join_trace(leader_trace_id: Optional[str]) -> None:
+    # A follower's own trace has no pipeline stages; they are on the leader's
+    tracing.annotate(coalesced=True, leader_trace_id=leader_trace_id)
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Key of a question for coalescing: case, spacing and surrounding punctuation do not matter.
+    Args:
+        question: The user question
+    Returns:
+        str: The normalized question
+    """
+    text = unicodedata.normalize("NFKC", question).casefold()
+    return _SPACE_RE.sub(" ", text).strip(" \t\n?!.,;:")
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time and hands its result to every concurrent caller.
+
+    The computation runs as its own task. A caller that is cancelled (e.g. by
+    its timeout) stops waiting without affecting the others; the computation
+    is cancelled only when no caller is left waiting for it. Callers joining
+    a flight are marked on their trace with the leader's trace ID.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._leader_traces: Dict[str, Optional[str]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[T]]) -> T:
+        """
+        Get the result of ``compute`` for a key, joining a call already in flight.
+        Args:
+            key: Identity of the request, e.g. a normalized question
+            compute: Coroutine function producing the result
+        Returns:
+            The result shared by every caller of the same flight
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            self._leader_traces[key] = _current_trace_id()
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            _join_trace(self._leader_traces[key])
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0 and not task.done():
+                    task.cancel()
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+            del self._leader_traces[key]
+        if not task.cancelled():
+            # Retrieved by the waiters; avoids "exception was never retrieved" when all left
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Flights started, callers that joined one, and flights running now."""
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class _Broadcast:
+    """Events of one shared stream, replayed to late subscribers."""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.subscribers: List[asyncio.Queue] = []
+        self.task: Optional[asyncio.Task] = None
+        self.leader_trace_id: Optional[str] = None
+
+
+_END = object()
+
+
+class StreamFlight:
+    """
+    Single-flight for async streams: concurrent subscribers to the same key share one stream.
+
+    A subscriber that joins late first receives every event emitted so far,
+    then the live ones. The underlying stream is closed when it ends or when
+    its last subscriber goes away. Subscribers joining a stream are marked on
+    their trace with the leader's trace ID.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Broadcast] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def subscribe(self, key: str, open_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Receive the events of the stream for a key, starting it if none is in flight.
+        Args:
+            key: Identity of the request, e.g. a normalized question
+            open_stream: Function returning the async iterator to share
+        Yields:
+            The shared stream's events, from the first one
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Broadcast()
+            flight.leader_trace_id = _current_trace_id()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(self._pump(key, flight, open_stream))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            _join_trace(flight.leader_trace_id)
+        events: asyncio.Queue = asyncio.Queue()
+        for event in flight.events:
+            events.put_nowait(event)
+        if flight.finished:
+            events.put_nowait(_END)
+        flight.subscribers.append(events)
+        try:
+            while True:
+                event = await events.get()
+                if event is _END:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                yield event
+        finally:
+            flight.subscribers.remove(events)
+            if not flight.subscribers and not flight.finished:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                # Return only once the underlying stream is closed
+                await asyncio.gather(flight.task, return_exceptions=True)
+
+    async def _pump(self, key: str, flight: _Broadcast, open_stream: Callable[[], AsyncIterator[Any]]) -> None:
+        stream = open_stream()
+        try:
+            async for event in stream:
+                flight.events.append(event)
+                for subscriber in flight.subscribers:
+                    subscriber.put_nowait(event)
+        except Exception as e:
+            # Raised to every subscriber instead
+            flight.error = e
+        finally:
+            flight.finished = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            for subscriber in flight.subscribers:
+                subscriber.put_nowait(_END)
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """Streams started, subscribers that joined one, and streams running now."""
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._flights)}
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""
+Per-request traces: timing and size of each pipeline stage, logged off the request path.
+
+A ``RequestTrace`` is opened for each API request by ``TracingMiddleware``
+and found by the pipeline through a context variable, so stages record
+themselves with ``stage(...)`` without the trace being passed around. Traces
+are logged as one JSON line each, sampled, through a queue drained by a
+background thread, so a request never waits on terminal or container log I/O.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Share of traces logged; slow and failed requests are always logged
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.environ.get("TRACE_SLOW_MS", "2000"))
+# Add a Server-Timing header with the stage durations to API responses
+SERVER_TIMING = os.environ.get("TRACE_SERVER_TIMING", "true").lower() == "true"
+
+trace_logger = logging.getLogger("rag.trace")
+
+_current: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """Stages and attributes of one request."""
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.stages: List[Dict[str, Any]] = []
+        self.attributes: Dict[str, Any] = {}
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.total_ms: Optional[float] = None
+
+    def add_stage(self, name: str, seconds: float, **attributes: Any) -> Dict[str, Any]:
+        """
+        Record a finished stage.
+
+        Args:
+            name: Stage name, e.g. ``search``
+            seconds: Duration of the stage
+            attributes: Sizes, counts or IDs describing the stage
+
+        Returns:
+            Dict[str, Any]: The recorded stage, which can still be annotated
+        """
+        entry = {"name": name, "ms": round(seconds * 1000, 2), **attributes}
+        # list.append is atomic, stages may finish in worker threads
+        self.stages.append(entry)
+        return entry
+
+    def finish(self, status: Optional[int] = None) -> None:
+        """Close the trace with the response status."""
+        self.status = status
+        self.total_ms = round((time.perf_counter() - self.started) * 1000, 2)
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the trace was opened, or its total once finished."""
+        if self.total_ms is not None:
+            return self.total_ms
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """
+        Stage durations as a ``Server-Timing`` header value.
+
+        Returns:
+            str: E.g. ``embed;dur=12.1, search;dur=3.4, total;dur=58.0``
+        """
+        parts = [f"{stage['name']};dur={stage['ms']:.1f}" for stage in self.stages]
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The trace as a JSON-serialisable dictionary."""
+        return {
+            "trace_id": self.trace_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "total_ms": self.total_ms,
+            "error": self.error,
+            **self.attributes,
+            "stages": self.stages,
+        }
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being served, or None outside a traced request."""
+    return _current.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Attach attributes to the current trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+
+@contextmanager
+def stage(name: str, histogram: Optional[Any] = None, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a pipeline stage into the current trace and, optionally, a histogram.
+
+    Args:
+        name: Stage name
+        histogram: Metric observing the duration in seconds, e.g. a ``metrics.Histogram``
+        attributes: Initial attributes of the stage
+
+    Yields:
+        Dict[str, Any]: Attributes of the stage, to add sizes or IDs known only once it ran
+    """
+    details: Dict[str, Any] = dict(attributes)
+    started = time.perf_counter()
+    try:
+        yield details
+    finally:
+        seconds = time.perf_counter() - started
+        if histogram is not None:
+            histogram.observe(seconds)
+        trace = _current.get()
+        if trace is not None:
+            trace.add_stage(name, seconds, **details)
+
+
+@contextmanager
+def traced(trace: RequestTrace) -> Iterator[RequestTrace]:
+    """Make ``trace`` the current trace for the enclosed block."""
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def should_log(trace: RequestTrace, sample_rate: Optional[float] = None, slow_ms: Optional[float] = None) -> bool:
+    """Sampling decision: every failed or slow request, and a random share of the others."""
+    sample_rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    slow_ms = TRACE_SLOW_MS if slow_ms is None else slow_ms
+    if trace.error is not None or (trace.status or 0) >= 500:
+        return True
+    if trace.total_ms is not None and trace.total_ms >= slow_ms:
+        return True
+    return random.random() < sample_rate
+
+
+def emit(trace: RequestTrace) -> None:
+    """Log a finished trace as one JSON line if it is sampled."""
+    if trace_logger.isEnabledFor(logging.INFO) and should_log(trace):
+        trace_logger.info(json.dumps(trace.to_dict(), default=str))
+
+
+class TraceLogging:
+    """
+    Queue-backed handler for the trace logger.
+
+    The request path only puts records on an in-memory queue; a listener
+    thread formats and writes them.
+    """
+
+    def __init__(self, handler: Optional[logging.Handler] = None):
+        self.handler = handler or logging.StreamHandler(sys.stderr)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, self.handler)
+
+    def start(self) -> None:
+        """Attach the queue to the trace logger and start writing in the background."""
+        trace_logger.addHandler(self.queue_handler)
+        trace_logger.setLevel(logging.INFO)
+        trace_logger.propagate = False
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Detach from the trace logger and flush what is queued."""
+        trace_logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a trace per request under ``prefix``.
+
+    Adds ``X-Trace-Id`` and, unless disabled, ``Server-Timing`` headers with
+    the stages finished before the response started; for streamed answers
+    that is the setup only, the full breakdown is in the logged trace.
+    """
+
+    def __init__(self, app, prefix: str = "/api/", server_timing: Optional[bool] = None):
+        """
+        Args:
+            app: The wrapped ASGI app
+            prefix: Only requests whose path starts with this are traced
+            server_timing: Add the Server-Timing header, defaults to TRACE_SERVER_TIMING
+        """
+        self.app = app
+        self.prefix = prefix
+        self.server_timing = SERVER_TIMING if server_timing is None else server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace(scope["method"], scope["path"])
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                if self.server_timing:
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with traced(trace):
+            try:
+                await self.app(scope, receive, send_with_headers)
+            except BaseException as e:
+                trace.error = type(e).__name__
+                raise
+            finally:
+                trace.finish(trace.status)
+                emit(trace)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark the cost of getting a RAG chain per request: rebuilt (cold) vs. shared (warm).
+
+Usage:
+    python -m src.scripts.benchmark_chain [--iterations 20] [--vectorstore PATH]
+
+Without --vectorstore a synthetic FAISS index is built in a temporary directory
+with deterministic fake embeddings, so no Ollama instance is needed.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+
+from src.core.rag_pipeline import RAGChainManager, create_rag_chain, load_vector_store
+
+# llama3 embeddings are 4096-dimensional
+EMBEDDING_SIZE = 4096
+
+
+def build_synthetic_index(target_dir: Path, num_chunks: int) -> Path:
+    """
+    Build and save a FAISS index of synthetic chunks.
+
+    Args:
+        target_dir: Directory to save the index into
+        num_chunks: Number of chunks to index
+
+    Returns:
+        Path to the saved index
+    """
+    texts = [f"Synthetic skills chunk {i} about Kubernetes, Terraform and NixOS." for i in range(num_chunks)]
+    metadatas = [{"source": f"synthetic/{i % 50}.md", "category": "synthetic"} for i in range(num_chunks)]
+    embeddings = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    vector_store = FAISS.from_texts(texts, embeddings, metadatas=metadatas)
+    index_dir = target_dir / "faiss_index"
+    vector_store.save_local(str(index_dir))
+    return index_dir
+
+
+def time_calls(func: Callable[[], object], iterations: int) -> List[float]:
+    """
+    Time repeated calls of a function.
+
+    Args:
+        func: Function to call
+        iterations: Number of calls
+
+    Returns:
+        Per-call durations in milliseconds
+    """
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Return mean, p50 and max of a list of durations."""
+    return {
+        "mean_ms": statistics.mean(durations),
+        "p50_ms": statistics.median(durations),
+        "max_ms": max(durations),
+    }
+
+
+def run(index_dir: Path, iterations: int) -> Dict[str, Dict[str, float]]:
+    """
+    Compare rebuilding the chain per request with reusing the shared chain.
+
+    Args:
+        index_dir: FAISS index directory
+        iterations: Number of simulated requests
+
+    Returns:
+        Timing summary for the cold and warm paths
+    """
+    cold = time_calls(lambda: create_rag_chain(load_vector_store(index_dir)), iterations)
+
+    manager = RAGChainManager(index_dir)
+    manager.load()
+    warm = time_calls(manager.get_chain, iterations)
+
+    return {"cold": summarize(cold), "warm": summarize(warm)}
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="Simulated requests per path")
+    parser.add_argument("--chunks", type=int, default=5000, help="Chunks in the synthetic index")
+    parser.add_argument("--vectorstore", type=Path, default=None, help="Existing FAISS index directory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = args.vectorstore
+        if index_dir is None:
+            print(f"Building synthetic index with {args.chunks} chunks...")
+            index_dir = build_synthetic_index(Path(tmp), args.chunks)
+        results = run(index_dir, args.iterations)
+
+    print(f"\n{'path':<6} {'mean ms':>10} {'p50 ms':>10} {'max ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<6} {stats['mean_ms']:>10.3f} {stats['p50_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+    speedup = results["cold"]["mean_ms"] / max(results["warm"]["mean_ms"], 1e-9)
+    print(f"\nShared chain is {speedup:,.0f}x faster per request")
+
+
+if __name__ == "__main__":
+    main()
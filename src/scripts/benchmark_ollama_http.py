@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+Benchmark the per-request connection overhead of Ollama calls, with and without the shared pool.
+
+Usage:
+    python -m src.scripts.benchmark_ollama_http [--requests 200] [--concurrency 8] [--url http://localhost:11434]
+
+Three ways of sending the same query embeddings are compared:
+
+    rebuilt       a new OllamaEmbeddings per request, as when each index load or
+                  chain build made its own clients: new clients and a new connection
+    no_keepalive  one client that closes its connection after each request:
+                  the TCP setup alone
+    pooled        the shared keep-alive pool: clients may be rebuilt, connections are reused
+
+Without --url a local stand-in Ollama server is started in a child process
+(so it does not compete with the client for the GIL), which also reports how
+many TCP connections it accepted; against a real Ollama that column is empty.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from src.core.embeddings import SafeOllamaEmbeddings
+from src.core.ollama_http import OllamaHTTPPool
+from src.scripts.benchmark_suite import QUERIES, percentiles
+from src.scripts.fake_ollama import FakeOllamaServer
+
+SCENARIOS = ("rebuilt", "no_keepalive", "pooled")
+
+
+def _serve(conn) -> None:
+    # Child process: run the stand-in server, answering stats requests until told to stop
+    with FakeOllamaServer() as server:
+        conn.send(server.url)
+        while conn.recv() == "stats":
+            conn.send(server.stats())
+
+
+class StandInServer:
+    """A ``FakeOllamaServer`` running in a child process."""
+
+    def __enter__(self) -> "StandInServer":
+        self._conn, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+        self._process.start()
+        self.url = self._conn.recv()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._conn.send("stop")
+        self._process.join()
+
+    @property
+    def connections(self) -> int:
+        """TCP connections the server has accepted so far."""
+        self._conn.send("stats")
+        return self._conn.recv()["connections"]
+
+
+def embeddings_factory(scenario: str, base_url: str, model: str) -> Callable[[], SafeOllamaEmbeddings]:
+    """
+    Build the function returning the embeddings a request of a scenario uses.
+
+    Args:
+        scenario: One of ``SCENARIOS``
+        base_url: Ollama URL
+        model: Embedding model
+
+    Returns:
+        Callable[[], SafeOllamaEmbeddings]: Called once per request
+    """
+    if scenario == "rebuilt":
+        return lambda: SafeOllamaEmbeddings(model=model, base_url=base_url)
+    if scenario == "no_keepalive":
+        limits = httpx.Limits(max_keepalive_connections=0)
+        shared = SafeOllamaEmbeddings(
+            model=model,
+            base_url=base_url,
+            sync_client_kwargs={"transport": httpx.HTTPTransport(limits=limits)},
+            async_client_kwargs={"transport": httpx.AsyncHTTPTransport(limits=limits)},
+        )
+        return lambda: shared
+    pool = OllamaHTTPPool()
+    return lambda: SafeOllamaEmbeddings(model=model, base_url=base_url, **pool.client_options())
+
+
+def run_sequential(make: Callable[[], SafeOllamaEmbeddings], requests: int) -> List[float]:
+    """Send requests one after the other; returns per-request durations in ms."""
+    durations = []
+    for i in range(requests):
+        started = time.perf_counter()
+        make().embed_query(QUERIES[i % len(QUERIES)])
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+async def run_concurrent(make: Callable[[], SafeOllamaEmbeddings], requests: int, concurrency: int) -> List[float]:
+    """Send requests from ``concurrency`` async workers; returns per-request durations in ms."""
+    durations: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            await make().aembed_query(QUERIES[i % len(QUERIES)])
+            durations.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return durations
+
+
+def run(base_url: str, model: str, requests: int, concurrency: int, server: Optional[StandInServer] = None) -> Dict[str, Any]:
+    """
+    Run every scenario sequentially and concurrently.
+
+    Args:
+        base_url: Ollama URL
+        model: Embedding model
+        requests: Requests per scenario and mode
+        concurrency: Async workers of the concurrent mode
+        server: Local stand-in server, to count the connections it accepted
+
+    Returns:
+        Dict[str, Any]: Per scenario and mode, latency percentiles and connections opened
+    """
+    results: Dict[str, Any] = {}
+    for mode in ("sequential", "concurrent"):
+        for scenario in SCENARIOS:
+            make = embeddings_factory(scenario, base_url, model)
+            # Warm-up, so one-off costs (model load, imports) are not counted
+            make().embed_query("warm up")
+            before = server.connections if server is not None else None
+            if mode == "sequential":
+                durations = run_sequential(make, requests)
+            else:
+                durations = asyncio.run(run_concurrent(make, requests, concurrency))
+            stats = percentiles(durations)
+            stats["connections"] = server.connections - before if server is not None else None
+            results[f"{mode}/{scenario}"] = stats
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Async workers in the concurrent mode")
+    parser.add_argument("--url", default=None, help="Real Ollama URL; a local stand-in server is used if omitted")
+    parser.add_argument("--model", default="llama3", help="Embedding model")
+    args = parser.parse_args()
+
+    if args.url:
+        results = run(args.url, args.model, args.requests, args.concurrency)
+    else:
+        with StandInServer() as server:
+            results = run(server.url, args.model, args.requests, args.concurrency, server)
+
+    print(f"\n{'mode/scenario':<26} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'connections':>12}")
+    for name, stats in results.items():
+        connections = "" if stats["connections"] is None else stats["connections"]
+        print(f"{name:<26} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {connections:>12}")
+    for mode in ("sequential", "concurrent"):
+        pooled = results[f"{mode}/pooled"]["mean_ms"]
+        saved = {scenario: results[f"{mode}/{scenario}"]["mean_ms"] - pooled for scenario in ("rebuilt", "no_keepalive")}
+        print(f"{mode}: pooling saves {saved['no_keepalive']:.3f} ms of connection setup and {saved['rebuilt']:.3f} ms vs. rebuilt clients per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of the intent router against the keyword checks it replaced.
+
+Usage:
+    python -m src.scripts.benchmark_router [--iterations 20000]
+
+The legacy router ran the dozen ``re.search`` calls of the old ``is_cv_query``
+and then the substring loops of ``generate_response``; the intent router matches
+each question against a single compiled regex. Both are timed on the same
+mix of CV, section and ordinary RAG questions, in microseconds per question.
+"""
+
+import argparse
+import re
+import timeit
+from typing import Callable, Dict, List
+
+from src.core.intent_router import IntentRouter
+
+QUESTIONS = [
+    "Can I see your CV?",
+    "Please download the full resume",
+    "List all professional experience",
+    "Show me your languages",
+    "What are your core competencies?",
+    "What Kubernetes experience do you have?",
+    "What Terraform work has he done on Azure landing zones?",
+    "How would you design a GitOps workflow with Flux for a multi-tenant AKS platform?",
+]
+
+LEGACY_CV_PATTERNS = [
+    r"\bcv\b", r"curriculum vitae", r"resume", r"show.*cv", r"show.*resume", r"see.*cv", r"see.*resume",
+    r"your cv", r"your resume", r"full cv", r"full resume", r"download.*cv", r"download.*resume"
+]
+LEGACY_CV_KEYWORDS = [
+    "show me your cv", "list all professional experience", "show all cv entries", "full cv", "all roles",
+    "all jobs", "all experience", "cv entries", "cv", "professional experience"
+]
+LEGACY_SECTION_KEYWORDS = ["core competencies", "technical skills", "summary", "volunteering", "languages", "interests"]
+
+
+def legacy_route(question: str) -> str:
+    """Route a question the way ``is_cv_query`` and ``generate_response`` used to."""
+    q = question.lower()
+    if any(re.search(pattern, q) for pattern in LEGACY_CV_PATTERNS):
+        return "full_cv"
+    if any(k in q for k in LEGACY_CV_KEYWORDS):
+        return "experience"
+    for section in LEGACY_SECTION_KEYWORDS:
+        if section in q:
+            return "section"
+    return "rag"
+
+
+def time_per_question(route: Callable[[str], object], questions: List[str], iterations: int) -> Dict[str, float]:
+    """
+    Time a router on every question.
+
+    Args:
+        route: Function routing one question
+        questions: Questions to route
+        iterations: Calls per question
+
+    Returns:
+        Dict[str, float]: Microseconds per call, per question
+    """
+    return {
+        question: min(timeit.repeat(lambda: route(question), number=iterations, repeat=3)) / iterations * 1e6
+        for question in questions
+    }
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="Calls per question and repeat")
+    args = parser.parse_args()
+
+    router = IntentRouter()
+    legacy = time_per_question(legacy_route, QUESTIONS, args.iterations)
+    current = time_per_question(router.classify, QUESTIONS, args.iterations)
+
+    print(f"{'question':<60} {'route':<12} {'legacy µs':>10} {'router µs':>10}")
+    for question in QUESTIONS:
+        route = router.classify(question)
+        name = f"{route.intent}:{route.section}" if route.section else route.intent
+        print(f"{question[:58]:<60} {name[:12]:<12} {legacy[question]:>10.2f} {current[question]:>10.2f}")
+    legacy_mean = sum(legacy.values()) / len(legacy)
+    current_mean = sum(current.values()) / len(current)
+    print(f"\nMean: legacy {legacy_mean:.2f} µs, router {current_mean:.2f} µs per question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+"""
+Offline performance benchmark suite for ingestion, indexing, retrieval and answering.
+
+Usage:
+    python -m src.scripts.benchmark_suite [--output FILE] [--compare PREVIOUS.json]
+                                          [--iterations 50] [--embedding-size 4096]
+
+Embeddings and the LLM are replaced by deterministic, instant fakes, so no
+network or Ollama instance is needed and the numbers measure this project's
+own code. Stages:
+
+- ingest: ``load_documents`` + ``split_documents`` over data/cv and data/skills_md
+- index_build: FAISS, BM25 and shard construction over the resulting chunks
+- load: ``load_vector_store`` for the FAISS and compact formats
+- retrieval: dense, hybrid and hybrid + packing latency at several k
+- answer: ``answer_question`` end to end, i.e. everything but model time
+
+Results are written as JSON (by default to benchmarks/results/<commit>.json)
+so runs on different commits can be compared with --compare.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.language_models.fake import FakeListLLM
+
+from src.core import rag_pipeline
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.compact_store import convert_faiss_store
+from src.core.context_packing import ContextPacker, search_with_vectors
+from src.core.lexical_index import BM25Index, hybrid_search
+from src.core.shards import ShardSet, convert_faiss_to_shards
+from src.scripts import ingest_data
+from src.scripts.benchmark_chain import EMBEDDING_SIZE
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+
+QUERIES = [
+    "What Kubernetes experience do you have?",
+    "How have you used Terraform on Azure?",
+    "Describe your GitOps workflow with Flux",
+    "Which CI/CD pipelines have you built with Azure DevOps?",
+    "What do you know about NixOS?",
+    "How do you approach DevSecOps and secret scanning?",
+    "Tell me about platform engineering",
+    "Have you worked with AKS and Helm?",
+    "What is your experience with FinOps and cloud cost optimisation?",
+    "How do you use LLMs in operations?",
+    "Explain your approach to site reliability engineering",
+    "Which container runtimes have you used besides Docker?",
+]
+RETRIEVAL_KS = (5, 10, 20, 50)
+
+
+def percentiles(durations: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize durations in milliseconds.
+
+    Args:
+        durations: Durations in milliseconds
+
+    Returns:
+        Dict[str, float]: Sample count, mean, p50, p95 and max
+    """
+    values = np.asarray(durations, dtype=np.float64)
+    return {
+        "n": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "max_ms": float(values.max()),
+    }
+
+
+def time_each(func: Callable[[Any], object], inputs: Sequence[Any], iterations: int) -> List[float]:
+    """
+    Time ``func`` on inputs taken round-robin.
+
+    Args:
+        func: Function of one input
+        inputs: Inputs to cycle through
+        iterations: Number of calls
+
+    Returns:
+        List[float]: Per-call durations in milliseconds
+    """
+    durations = []
+    for i in range(iterations):
+        value = inputs[i % len(inputs)]
+        started = time.perf_counter()
+        func(value)
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """Swallow the pipeline's progress prints so they do not dominate the timings' terminal I/O."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def offline_backend(embedding_size: int, vectorstore_dir: Path) -> Iterator[None]:
+    """
+    Point the RAG pipeline at fake embeddings, an instant fake LLM and a given index.
+
+    Args:
+        embedding_size: Dimension of the fake embeddings
+        vectorstore_dir: Index served by the shared chain manager
+    """
+    saved = {
+        name: getattr(rag_pipeline, name)
+        for name in ("create_embeddings", "OllamaLLM", "chain_manager", "answer_cache")
+    }
+    rag_pipeline.create_embeddings = lambda **kwargs: DeterministicFakeEmbedding(size=embedding_size)
+    rag_pipeline.OllamaLLM = lambda **kwargs: FakeListLLM(responses=["A benchmark answer."])
+    rag_pipeline.chain_manager = rag_pipeline.RAGChainManager(vectorstore_dir)
+    # Every question must run the chain rather than hit the cache
+    rag_pipeline.answer_cache = SemanticAnswerCache(enabled=False)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(rag_pipeline, name, value)
+
+
+def bench_ingest() -> Dict[str, Any]:
+    """Time loading and splitting the source documents."""
+    with quiet():
+        started = time.perf_counter()
+        documents = ingest_data.load_documents()
+        loaded = time.perf_counter()
+        chunks = ingest_data.split_documents(documents)
+        split = time.perf_counter()
+    total_bytes = sum(len(doc.page_content.encode("utf-8")) for doc in documents)
+    return {
+        "documents": len(documents),
+        "chunks": len(chunks),
+        "megabytes": total_bytes / 1e6,
+        "load_s": loaded - started,
+        "split_s": split - loaded,
+        "megabytes_per_s": total_bytes / 1e6 / max(split - started, 1e-9),
+        "chunks_per_s": len(chunks) / max(split - started, 1e-9),
+    }, chunks
+
+
+def bench_index_build(chunks, embeddings, work_dir: Path) -> Dict[str, Any]:
+    """Time building and saving the FAISS index, its compact copy, the BM25 index and the shards."""
+    timings = {}
+    started = time.perf_counter()
+    vector_store = FAISS.from_documents(chunks, embeddings)
+    timings["faiss_build_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vector_store.save_local(str(work_dir / "faiss_index"))
+    timings["faiss_save_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    convert_faiss_store(vector_store, work_dir / "compact_index")
+    timings["compact_write_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ids = [vector_store.index_to_docstore_id[i] for i in range(vector_store.index.ntotal)]
+    lexical_index = BM25Index.from_documents([vector_store.docstore.search(i) for i in ids], ids)
+    timings["bm25_build_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    convert_faiss_to_shards(vector_store, work_dir / "shards", model="benchmark")
+    timings["shards_write_s"] = time.perf_counter() - started
+    return timings, vector_store, lexical_index
+
+
+def bench_load(work_dir: Path, runs: int) -> Dict[str, Any]:
+    """Time ``load_vector_store`` for each on-disk format."""
+    results = {}
+    for fmt in ("faiss_index", "compact_index"):
+        durations = []
+        for _ in range(runs):
+            with quiet():
+                started = time.perf_counter()
+                rag_pipeline.load_vector_store(work_dir / fmt)
+                durations.append((time.perf_counter() - started) * 1000)
+        results[fmt.replace("_index", "")] = percentiles(durations)
+    return results
+
+
+def bench_retrieval(vector_store, lexical_index, shards, embeddings, iterations: int) -> Dict[str, Any]:
+    """Time dense search, hybrid search and hybrid search + context packing at several k."""
+    query_embeddings = [(q, embeddings.embed_query(q)) for q in QUERIES]
+    packer = ContextPacker()
+    results = {}
+    for k in RETRIEVAL_KS:
+        dense = time_each(lambda item: search_with_vectors(vector_store, item[1], k), query_embeddings, iterations)
+        hybrid = time_each(
+            lambda item: hybrid_search(vector_store, lexical_index, item[0], item[1], k, k), query_embeddings, iterations
+        )
+        sharded = time_each(
+            lambda item: hybrid_search(vector_store, lexical_index, item[0], item[1], k, k, shards=shards),
+            query_embeddings,
+            iterations,
+        )
+        packed = time_each(
+            lambda item: packer.pack(item[1], *hybrid_search(vector_store, lexical_index, item[0], item[1], k, k)),
+            query_embeddings,
+            iterations,
+        )
+        results[f"k={k}"] = {
+            "dense": percentiles(dense),
+            "hybrid": percentiles(hybrid),
+            "hybrid_sharded": percentiles(sharded),
+            "hybrid_packed": percentiles(packed),
+        }
+    return results
+
+
+def bench_answer(iterations: int) -> Dict[str, Any]:
+    """Time ``answer_question`` with the fake backend, after the chain is loaded."""
+    with quiet():
+        rag_pipeline.chain_manager.load()
+        results = [rag_pipeline.answer_question(q) for q in QUERIES[:2]]
+        if not all(result["success"] for result in results):
+            raise RuntimeError(f"answer_question failed: {results}")
+        durations = time_each(rag_pipeline.answer_question, QUERIES, iterations)
+    return percentiles(durations)
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(iterations: int = 50, embedding_size: int = EMBEDDING_SIZE, load_runs: int = 5) -> Dict[str, Any]:
+    """
+    Run every stage of the suite.
+
+    Args:
+        iterations: Timed calls per retrieval and answer measurement
+        embedding_size: Dimension of the fake embeddings
+        load_runs: Loads per index format
+
+    Returns:
+        Dict[str, Any]: Results per stage, plus metadata about the run
+    """
+    embeddings = DeterministicFakeEmbedding(size=embedding_size)
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "embedding_size": embedding_size,
+            "iterations": iterations,
+        }
+    }
+    print("Benchmarking document loading and splitting...")
+    results["ingest"], chunks = bench_ingest()
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        print(f"Benchmarking index build over {len(chunks)} chunks...")
+        with quiet():
+            results["index_build"], vector_store, lexical_index = bench_index_build(chunks, embeddings, work_dir)
+        with offline_backend(embedding_size, work_dir / "faiss_index"):
+            print("Benchmarking vector store loading...")
+            results["load"] = bench_load(work_dir, load_runs)
+            print("Benchmarking retrieval...")
+            shards = ShardSet(work_dir / "shards", embeddings)
+            results["retrieval"] = bench_retrieval(vector_store, lexical_index, shards, embeddings, iterations)
+            print("Benchmarking answer_question overhead...")
+            results["answer"] = bench_answer(iterations)
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested numeric results into ``stage.metric`` keys."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[str]:
+    """
+    List timings that changed by more than ``threshold`` between two runs.
+
+    Args:
+        previous: Results of an earlier run
+        current: Results of this run
+        threshold: Relative change worth reporting
+
+    Returns:
+        List[str]: One line per changed timing, slowest regression first
+    """
+    old, new = flatten(previous), flatten(current)
+    changes = []
+    for key in sorted(old.keys() & new.keys()):
+        if not key.endswith(("_ms", "_s")) or key.startswith("meta.") or old[key] <= 0:
+            continue
+        change = (new[key] - old[key]) / old[key]
+        if abs(change) >= threshold:
+            changes.append((change, f"{key}: {old[key]:.3f} -> {new[key]:.3f} ({change:+.0%})"))
+    return [line for _, line in sorted(changes, reverse=True)]
+
+
+def main():
+    """Run the suite and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per retrieval/answer measurement")
+    parser.add_argument("--embedding-size", type=int, default=EMBEDDING_SIZE, help="Dimension of the fake embeddings")
+    parser.add_argument("--load-runs", type=int, default=5, help="Loads per index format")
+    parser.add_argument("--output", type=Path, default=None, help="Results file, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results file to compare with")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.embedding_size, args.load_runs)
+    output = args.output or RESULTS_DIR / f"{results['meta']['commit'] or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    ingest = results["ingest"]
+    print(f"Ingest: {ingest['documents']} documents -> {ingest['chunks']} chunks at {ingest['megabytes_per_s']:.1f} MB/s")
+    print("Index build: " + ", ".join(f"{key} {value:.2f}" for key, value in results["index_build"].items()))
+    for fmt, stats in results["load"].items():
+        print(f"Load {fmt}: p50 {stats['p50_ms']:.1f} ms")
+    for k, stages in results["retrieval"].items():
+        print(f"Retrieval {k}: " + ", ".join(f"{name} p50 {s['p50_ms']:.2f} / p95 {s['p95_ms']:.2f} ms" for name, s in stages.items()))
+    print(f"answer_question overhead: p50 {results['answer']['p50_ms']:.2f} ms, p95 {results['answer']['p95_ms']:.2f} ms")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            changes = compare(json.load(f), results)
+        print(f"\nChanges vs. {args.compare}:" if changes else f"\nNo timing changed by 10% or more vs. {args.compare}")
+        for line in changes:
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Benchmark cold start of the FAISS index against the compact memory-mapped format.
+
+Usage:
+    python -m src.scripts.benchmark_vectorstore [--chunks 5000] [--runs 3] [--vectorstore PATH]
+
+Every measurement runs in a fresh Python process, so load time and resident
+memory (RSS) reflect a real cold start. Without --vectorstore a synthetic FAISS
+index is built with deterministic fake embeddings, so no Ollama instance is
+needed.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+
+from src.core.compact_store import convert_faiss_store
+from src.scripts.benchmark_chain import EMBEDDING_SIZE, build_synthetic_index
+
+# Executed in a child process: load one format, then run one query
+PROBE = """
+import json, sys, time
+from pathlib import Path
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+
+from src.core.compact_store import CompactVectorStore
+
+fmt, directory, size = sys.argv[1], Path(sys.argv[2]), int(sys.argv[3])
+embeddings = DeterministicFakeEmbedding(size=size)
+query = embeddings.embed_query("Kubernetes and Terraform experience")
+baseline = rss_mb()
+started = time.perf_counter()
+if fmt == "faiss":
+    store = FAISS.load_local(str(directory), embeddings, allow_dangerous_deserialization=True)
+else:
+    store = CompactVectorStore.load(directory, embeddings)
+load_ms = (time.perf_counter() - started) * 1000
+load_rss = rss_mb() - baseline
+started = time.perf_counter()
+store.similarity_search_by_vector(query, k=50)
+query_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"load_ms": load_ms, "load_rss_mb": load_rss, "first_query_ms": query_ms,
+                  "query_rss_mb": rss_mb() - baseline}))
+"""
+
+
+def probe(fmt: str, directory: Path, embedding_size: int) -> Dict[str, float]:
+    """
+    Measure one cold load and first query in a fresh interpreter.
+
+    Args:
+        fmt: "faiss" or "compact"
+        directory: Index directory
+        embedding_size: Dimension of the index
+
+    Returns:
+        Load time, first query time and RSS growth
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, fmt, str(directory), str(embedding_size)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(faiss_dir: Path, compact_dir: Path, runs: int, embedding_size: int) -> Dict[str, Dict[str, float]]:
+    """
+    Probe both formats several times and keep the median of each metric.
+
+    Args:
+        faiss_dir: FAISS index directory
+        compact_dir: Compact index directory
+        runs: Fresh processes per format
+        embedding_size: Dimension of the index
+
+    Returns:
+        Median metrics per format
+    """
+    results = {}
+    for fmt, directory in (("faiss", faiss_dir), ("compact", compact_dir)):
+        samples: List[Dict[str, float]] = [probe(fmt, directory, embedding_size) for _ in range(runs)]
+        results[fmt] = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000, help="Chunks in the synthetic index")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per format")
+    parser.add_argument("--vectorstore", type=Path, default=None, help="Existing FAISS index directory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        faiss_dir = args.vectorstore
+        if faiss_dir is None:
+            print(f"Building synthetic index with {args.chunks} chunks...")
+            faiss_dir = build_synthetic_index(Path(tmp), args.chunks)
+        # Reading the index back needs no embedding calls
+        faiss_store = FAISS.load_local(
+            str(faiss_dir), DeterministicFakeEmbedding(size=EMBEDDING_SIZE), allow_dangerous_deserialization=True
+        )
+        compact_dir = convert_faiss_store(faiss_store, Path(tmp) / "compact_index")
+        embedding_size = faiss_store.index.d
+        del faiss_store
+        results = run(faiss_dir, compact_dir, args.runs, embedding_size)
+
+    print(f"\n{'format':<8} {'load ms':>10} {'load RSS MB':>12} {'1st query ms':>13} {'RSS after query MB':>19}")
+    for name, stats in results.items():
+        print(
+            f"{name:<8} {stats['load_ms']:>10.1f} {stats['load_rss_mb']:>12.1f} "
+            f"{stats['first_query_ms']:>13.1f} {stats['query_rss_mb']:>19.1f}"
+        )
+    speedup = results["faiss"]["load_ms"] / max(results["compact"]["load_ms"], 1e-9)
+    print(f"\nCompact index loads {speedup:,.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
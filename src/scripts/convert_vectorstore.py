@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Convert the FAISS index to the compact, memory-mapped format.
+
+Usage:
+    python -m src.scripts.convert_vectorstore [--source PATH] [--target PATH]
+
+The API serves the compact index automatically once it exists
+(RAG_VECTORSTORE_FORMAT=auto); set RAG_VECTORSTORE_FORMAT=faiss to keep
+serving the FAISS index.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from langchain_community.vectorstores.faiss import FAISS
+
+from src.core.compact_store import CompactVectorStore, convert_faiss_store
+from src.core.embeddings import create_embeddings
+from src.core.rag_pipeline import COMPACT_VECTORSTORE_DIR, VECTORSTORE_DIR
+
+
+def convert(source: Path, target: Path) -> CompactVectorStore:
+    """
+    Convert a saved FAISS index to a compact index.
+    
+    Args:
+        source: FAISS index directory
+        target: Compact index directory, replaced if it exists
+    
+    Returns:
+        CompactVectorStore: The converted store, opened
+    """
+    if not source.exists():
+        raise FileNotFoundError(
+            f"Vector store not found at {source}. "
+            "Please run the ingestion script first: python -m src.scripts.ingest_data"
+        )
+    # Embeddings are only needed for the model name recorded in the header
+    embeddings = create_embeddings()
+    faiss_store = FAISS.load_local(str(source), embeddings, allow_dangerous_deserialization=True)
+    convert_faiss_store(faiss_store, target)
+    return CompactVectorStore.load(target, embeddings)
+
+
+def main():
+    """Run the conversion and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", type=Path, default=VECTORSTORE_DIR, help="FAISS index directory")
+    parser.add_argument("--target", type=Path, default=COMPACT_VECTORSTORE_DIR, help="Compact index directory")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = convert(args.source, args.target)
+    size = sum(path.stat().st_size for path in args.target.iterdir())
+    print(
+        f"Wrote {store.count} chunks ({store.dimension} dimensions, {size / 1e6:.1f} MB) "
+        f"to {args.target} in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the Ollama HTTP API, for tests and benchmarks without a real model.
+
+Embeddings are deterministic (derived from a hash of the text), so results can
+be compared across runs. ``/api/generate`` answers with a fixed text, streamed
+token by token at a configurable rate. Latency and error injection are
+configurable.
+
+Usage:
+    python -m src.scripts.fake_ollama [--port 11435] [--latency 0.05] [--error-rate 0.1]
+                                      [--first-token-latency 0.2] [--tokens-per-second 30]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+ANSWER_WORDS = (
+    "I have hands-on experience with this from several platform engineering roles, "
+    "where I built and operated it in production alongside Kubernetes, Terraform and GitOps tooling."
+).split()
+
+
+def fake_embedding(text: str, dimension: int) -> List[float]:
+    """
+    Deterministic unit-length embedding of a text.
+
+    Args:
+        text: Text to embed
+        dimension: Embedding size
+
+    Returns:
+        List[float]: The embedding
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def fake_tokens(count: int) -> List[str]:
+    """
+    Tokens of the fake answer, cycling through a fixed text.
+
+    Args:
+        count: Number of tokens
+
+    Returns:
+        List[str]: Word tokens, each but the first with a leading space
+    """
+    return [("" if i == 0 else " ") + ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(count)]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server implementing the subset of the Ollama API this project uses.
+
+    Can be used as a context manager; ``url`` is the base URL to point clients at.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dimension: int = 64,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        fail_first: int = 0,
+        error_status: int = 503,
+        first_token_latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        response_tokens: int = 32,
+    ):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free one
+            dimension: Size of the returned embeddings
+            latency: Seconds added to every embedding request
+            error_rate: Probability of answering a request with ``error_status``
+            fail_first: Number of initial requests answered with ``error_status``
+            error_status: HTTP status used for injected errors
+            first_token_latency: Seconds before the first generated token (prompt evaluation)
+            tokens_per_second: Generation speed, 0 for instant
+            response_tokens: Number of tokens in every generated answer
+        """
+        self.dimension = dimension
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.error_status = error_status
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.texts_embedded = 0
+        self.generations = 0
+        self.tokens_generated = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Serve requests in a background thread."""
+        # Short poll interval so stop() returns quickly
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, error and concurrency counters."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "texts_embedded": self.texts_embedded,
+            "generations": self.generations,
+            "tokens_generated": self.tokens_generated,
+            "max_in_flight": self.max_in_flight,
+            "connections": self.connections,
+        }
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            fail = self.requests <= self.fail_first or random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        self._enter()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                self.texts_embedded += len(texts)
+            return [fake_embedding(text, self.dimension) for text in texts]
+        finally:
+            self._leave()
+
+    def _generate(self, model: str) -> Iterator[Dict[str, Any]]:
+        # Yields Ollama generate chunks, sleeping to honour the configured speed
+        self._enter()
+        try:
+            started = time.perf_counter()
+            if self.first_token_latency:
+                time.sleep(self.first_token_latency)
+            evaluated = time.perf_counter()
+            tokens = fake_tokens(self.response_tokens)
+            for token in tokens:
+                if self.tokens_per_second:
+                    time.sleep(1 / self.tokens_per_second)
+                with self._lock:
+                    self.tokens_generated += 1
+                yield {"model": model, "created_at": _now(), "response": token, "done": False}
+            with self._lock:
+                self.generations += 1
+            finished = time.perf_counter()
+            yield {
+                "model": model,
+                "created_at": _now(),
+                "response": "",
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((finished - started) * 1e9),
+                "prompt_eval_duration": int((evaluated - started) * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int((finished - evaluated) * 1e9),
+            }
+        finally:
+            self._leave()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; like Ollama, do not let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                # One handler per accepted TCP connection, however many requests it carries
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, chunks: Iterator[Dict[str, Any]]) -> None:
+                # Newline-delimited JSON with chunked transfer encoding, as Ollama streams
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        line = json.dumps(chunk).encode("utf-8") + b"\n"
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client went away mid-answer
+                    chunks.close()
+                    self.close_connection = True
+
+            def _read_json(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "llama3:latest", "model": "llama3:latest"}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                payload = self._read_json()
+                if self.path not in ("/api/embed", "/api/embeddings", "/api/generate"):
+                    self._send_json(404, {"error": "not found"})
+                    return
+                if server._should_fail():
+                    self._send_json(server.error_status, {"error": "injected failure"})
+                    return
+                model = payload.get("model", "llama3")
+                if self.path == "/api/generate":
+                    chunks = server._generate(model)
+                    if payload.get("stream", True):
+                        self._send_stream(chunks)
+                    else:
+                        *tokens, final = chunks
+                        final["response"] = "".join(chunk["response"] for chunk in tokens)
+                        self._send_json(200, final)
+                elif self.path == "/api/embed":
+                    texts = payload.get("input", [])
+                    texts = [texts] if isinstance(texts, str) else texts
+                    self._send_json(200, {"model": model, "embeddings": server._embed(texts)})
+                else:
+                    self._send_json(200, {"embedding": server._embed([payload.get("prompt", "")])[0]})
+
+        return Handler
+
+
+def main():
+    """Run the stand-in server until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Ollama HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--dimension", type=int, default=4096, help="Embedding size (llama3 uses 4096)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every embedding request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected 503")
+    parser.add_argument("--first-token-latency", type=float, default=0.0, help="Seconds before the first generated token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Generation speed, 0 for instant")
+    parser.add_argument("--response-tokens", type=int, default=32, help="Tokens in every generated answer")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host,
+        port=args.port,
+        dimension=args.dimension,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+    )
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
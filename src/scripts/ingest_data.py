@@ -3,10 +3,14 @@
 Script to ingest data from CV and markdown files and create a vector store.
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader, TextLoader, UnstructuredMarkdownLoader
 from langchain_ollama import OllamaEmbeddings
@@ -14,12 +18,31 @@ from langchain_community.vectorstores.faiss import FAISS
 from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 
+from src.core.compact_store import convert_faiss_store, is_compact_store
+from src.core.context_packing import estimate_tokens
+from src.core.dedup import NearDuplicateIndex
+from src.core import ollama_backends, ollama_http
+from src.core.embeddings import create_embeddings
+from src.core.lexical_index import LEXICAL_INDEX_FILE, BM25Index
+from src.core.shards import SHARDS_MANIFEST, convert_faiss_to_shards
+
 
 # Base directories
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 CV_DIR = BASE_DIR / "data" / "cv"
 SKILLS_DIR = BASE_DIR / "data" / "skills_md"
 VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore"
+EMBEDDING_CACHE_PATH = VECTORSTORE_DIR / "embedding_cache.sqlite"
+MANIFEST_PATH = VECTORSTORE_DIR / "ingest_manifest.json"
+MANIFEST_FORMAT_VERSION = 3
+
+# Estimated Jaccard similarity (word 3-shingles) above which a new chunk counts
+# as a near duplicate of one already in the index and is not embedded
+DEDUP_THRESHOLD = float(os.environ.get("INGEST_DEDUP_THRESHOLD", "0.8"))
+
+# Project standard chunking parameters
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
 
 def get_relative_path(file_path: Path, base_dir: Path) -> str:
     """Get the relative path from base_dir to file_path."""
@@ -88,6 +111,45 @@ def chunk_markdown_by_section(md_text: str) -> List[Dict[str, Any]]:
         chunks.append({'content': f'{header}\n{content}', 'metadata': {'section': header}})
     return chunks
 
+def list_source_files() -> List[Path]:
+    """
+    List the CV and skills files to ingest, in ingestion order.
+    
+    Returns:
+        List[Path]: CV PDFs, CV markdown, then skills markdown files
+    """
+    files = []
+    if CV_DIR.exists():
+        files.extend(sorted(CV_DIR.glob("*.pdf")))
+        files.extend(sorted(CV_DIR.glob("*.md")))
+    if SKILLS_DIR.exists():
+        files.extend(sorted(SKILLS_DIR.rglob("*.md")))
+    return files
+
+def load_file_documents(file_path: Path) -> List[Document]:
+    """
+    Load one source file with metadata.
+    
+    Args:
+        file_path (Path): A CV PDF or a markdown file
+        
+    Returns:
+        List[Document]: The documents loaded from the file
+    """
+    if file_path.suffix.lower() == ".pdf":
+        loader = PyPDFLoader(str(file_path))
+        pdf_docs = loader.load()
+        
+        # Add metadata
+        for doc in pdf_docs:
+            doc.metadata.update({
+                "source": get_relative_path(file_path, BASE_DIR),
+                "category": "cv",
+                "file_type": "pdf"
+            })
+        return pdf_docs
+    return load_markdown_with_metadata(file_path, BASE_DIR)
+
 def load_documents() -> List[Document]:
     """
     Load documents from CV and skills markdown directories.
@@ -96,33 +158,8 @@ def load_documents() -> List[Document]:
         List[Document]: A list of loaded documents
     """
     documents = []
-
-    # Load CV documents
-    if CV_DIR.exists():
-        # Load PDFs
-        for pdf_file in CV_DIR.glob("*.pdf"):
-            loader = PyPDFLoader(str(pdf_file))
-            pdf_docs = loader.load()
-            
-            # Add metadata
-            for doc in pdf_docs:
-                doc.metadata.update({
-                    "source": get_relative_path(pdf_file, BASE_DIR),
-                    "category": "cv",
-                    "file_type": "pdf"
-                })
-            documents.extend(pdf_docs)
-
-        # Load CV markdown
-        for md_file in CV_DIR.glob("*.md"):
-            docs = load_markdown_with_metadata(md_file, BASE_DIR)
-            documents.extend(docs)
-
-    # Load skills markdown documents recursively
-    if SKILLS_DIR.exists():
-        for md_file in SKILLS_DIR.rglob("*.md"):
-            docs = load_markdown_with_metadata(md_file, BASE_DIR)
-            documents.extend(docs)
+    for file_path in list_source_files():
+        documents.extend(load_file_documents(file_path))
 
     if not documents:
         print("No documents found in CV or skills directories.")
@@ -149,8 +186,8 @@ def split_documents(documents: List[Document]) -> List[Document]:
         List[Document]: The split documents
     """
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,  # Project standard
-        chunk_overlap=50,  # Project standard
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
         length_function=len,
         separators=["\n# ", "\n## ", "\n### ", "\n\n", "\n", " ", ""]
     )
@@ -159,50 +196,129 @@ def split_documents(documents: List[Document]) -> List[Document]:
     print(f"Split {len(documents)} documents into {len(split_docs)} chunks")
     return split_docs
 
-def create_vector_store(documents: List[Document]) -> FAISS:
+def get_embeddings(batch_size: Optional[int] = None, concurrency: Optional[int] = None):
     """
-    Create a vector store from the documents.
+    Create the memoized, batched Ollama embeddings used for ingestion.
+    
+    With several ``OLLAMA_BASE_URLS`` the batches are spread over the healthy
+    backends, each taking INGEST_EMBED_CONCURRENCY requests at a time.
     
     Args:
-        documents (List[Document]): The documents to add to the vector store
-        
+        batch_size (Optional[int]): Chunks per embedding request, defaults to INGEST_EMBED_BATCH_SIZE
+        concurrency (Optional[int]): Requests in flight, defaults to INGEST_EMBED_CONCURRENCY per healthy backend
+    
     Returns:
-        FAISS: The vector store
+        MemoizedEmbeddings: Embeddings persisted to the embedding cache so re-runs skip unchanged chunks
     """
     print("Initializing Ollama embeddings...")
-    ollama_base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
-    model_name = os.environ.get("MODEL_NAME", "llama3")
-    
-    # Create a safer wrapper for OllamaEmbeddings that ensures proper input format
-    class SafeOllamaEmbeddings(OllamaEmbeddings):
-        def embed_documents(self, texts):
-            # Ensure texts are always strings
-            clean_texts = [str(text) if not isinstance(text, str) else text for text in texts]
-            return super().embed_documents(clean_texts)
-            
-        def embed_query(self, text):
-            # Ensure query is always a string
-            clean_text = str(text) if not isinstance(text, str) else text
-            return super().embed_query(clean_text)
-    
-    # Use the safer wrapper
-    embeddings = SafeOllamaEmbeddings(
-        model=model_name,
-        base_url=ollama_base_url
+    print(f"Using Ollama base URL: {', '.join(ollama_backends.configured_urls())}")
+    backends = ollama_http.pool.backends
+    if backends is not None:
+        healthy = backends.probe()
+        print(f"{healthy} of {len(backends)} Ollama backends healthy")
+        if concurrency is None:
+            concurrency = int(os.environ.get("INGEST_EMBED_CONCURRENCY", "4")) * max(1, healthy)
+    return create_embeddings(
+        model=os.environ.get("MODEL_NAME", "llama3"),
+        base_url=ollama_backends.base_url(),
+        store_path=Path(os.environ.get("RAG_EMBEDDING_CACHE_PATH", EMBEDDING_CACHE_PATH)),
+        engine_options={"batch_size": batch_size, "max_concurrency": concurrency}
     )
+
+def report_embedding_stats(embeddings, total: int) -> None:
+    """Print how many chunk embeddings were reused and the embedding throughput."""
+    stats = embeddings.stats() if hasattr(embeddings, "stats") else None
+    if stats is None:
+        return
+    print(f"Embedding cache: {stats['embeddings_saved']} of {total} chunk embeddings reused, "
+          f"{stats['backend_calls']} embedding calls")
+    engine_stats = getattr(getattr(embeddings, "embeddings", None), "stats", None)
+    if callable(engine_stats):
+        engine = engine_stats()
+        print(f"Embedding engine: {engine['chunks']} chunks in {engine['batches']} batches, "
+              f"{engine['retries']} retries, {engine['chunks_per_second']:.1f} chunks/s")
+
+def save_lexical_index(vector_store: FAISS) -> None:
+    """
+    Build the BM25 index over the vector store's chunks and save it next to the index.
     
-    print(f"Using Ollama base URL: {ollama_base_url}")
-    print(f"Creating vector store with {len(documents)} document chunks...")
-    vector_store = FAISS.from_documents(documents, embeddings)
+    Rows follow the vector store's positions, so BM25 hits map straight to
+    stored vectors at query time.
+    
+    Args:
+        vector_store (FAISS): The vector store to index
+    """
+    ids = [vector_store.index_to_docstore_id[position] for position in range(vector_store.index.ntotal)]
+    documents = [vector_store.docstore.search(doc_id) for doc_id in ids]
+    lexical_index = BM25Index.from_documents(documents, ids=ids)
+    lexical_path = VECTORSTORE_DIR / LEXICAL_INDEX_FILE
+    print(f"Saving lexical index ({len(lexical_index.terms)} terms) to: {lexical_path}")
+    lexical_index.save(lexical_path)
+
+def save_shards(vector_store: FAISS) -> None:
+    """
+    Write the category shards of the vector store to VECTORSTORE_DIR/shards.
+    
+    Args:
+        vector_store (FAISS): The vector store to shard
+    """
+    shards_path = VECTORSTORE_DIR / "shards"
+    counts = convert_faiss_to_shards(vector_store, shards_path)
+    print(f"Saved {len(counts)} shards to {shards_path}: " + ", ".join(f"{name}={count}" for name, count in sorted(counts.items())))
+
+def save_vector_store(vector_store: FAISS, compact: bool = False) -> None:
+    """
+    Save the vector store to VECTORSTORE_DIR/faiss_index.
+    
+    The BM25 lexical index and the category shards are rebuilt first, so a
+    server reloading on the new index files already finds matching ones. The compact memory-mapped copy in VECTORSTORE_DIR/compact_index is
+    rewritten as well when requested or when it already exists, so it never
+    goes stale.
     
+    Args:
+        vector_store (FAISS): The vector store to save
+        compact (bool): Also write the compact copy even if it does not exist yet
+    """
     # Create the vectorstore directory if it doesn't exist
     os.makedirs(VECTORSTORE_DIR, exist_ok=True)
     
-    # Save the vector store
+    save_lexical_index(vector_store)
+    save_shards(vector_store)
+    
     vector_store_path = str(VECTORSTORE_DIR / "faiss_index")
     print(f"Saving vector store to: {vector_store_path}")
     vector_store.save_local(vector_store_path)
     
+    compact_path = VECTORSTORE_DIR / "compact_index"
+    if compact or is_compact_store(compact_path):
+        print(f"Writing compact vector store to: {compact_path}")
+        convert_faiss_store(vector_store, compact_path)
+
+def create_vector_store(
+    documents: List[Document],
+    ids: Optional[List[str]] = None,
+    embeddings=None,
+    compact: bool = False
+) -> FAISS:
+    """
+    Create a vector store from the documents.
+    
+    Args:
+        documents (List[Document]): The documents to add to the vector store
+        ids (Optional[List[str]]): Docstore IDs for the documents, generated if omitted
+        embeddings: Embeddings to use, defaults to get_embeddings()
+        compact (bool): Also write the compact memory-mapped copy
+        
+    Returns:
+        FAISS: The vector store
+    """
+    embeddings = embeddings or get_embeddings()
+    
+    print(f"Creating vector store with {len(documents)} document chunks...")
+    vector_store = FAISS.from_documents(documents, embeddings, ids=ids)
+    report_embedding_stats(embeddings, len(documents))
+    
+    save_vector_store(vector_store, compact=compact)
     return vector_store
 
 
@@ -214,26 +330,287 @@ def load_vector_store(embeddings: OllamaEmbeddings) -> FAISS:
     return FAISS.load_local(vector_store_path, embeddings, allow_dangerous_deserialization=True)
 
 
-def main():
-    """Main function to run the ingestion process."""
-    print("Starting document ingestion process...")
+def file_hash(file_path: Path) -> str:
+    """Return the SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_hash(doc: Document) -> str:
+    """Return the SHA-256 of a chunk's content and metadata, except its absolute path so a moved checkout matches."""
+    metadata = {key: value for key, value in doc.metadata.items() if key != "full_path"}
+    payload = json.dumps({"content": doc.page_content, "metadata": metadata}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def ingest_settings() -> Dict[str, Any]:
+    """Settings that, when changed, invalidate every chunk in the manifest."""
+    return {
+        "format": MANIFEST_FORMAT_VERSION,
+        "model": os.environ.get("MODEL_NAME", "llama3"),
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "dedup_threshold": DEDUP_THRESHOLD,
+    }
+
+def load_manifest() -> Optional[Dict[str, Any]]:
+    """
+    Load the ingestion manifest written next to the FAISS index.
+    
+    Returns:
+        Optional[Dict[str, Any]]: The manifest, or None if missing or unreadable
+    """
+    if not MANIFEST_PATH.exists():
+        return None
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {MANIFEST_PATH}: {e}")
+        return None
+
+def save_manifest(files: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Write the ingestion manifest atomically.
+    
+    Args:
+        files (Dict[str, Dict[str, Any]]): Per-file hash and chunk entries keyed by relative path
+    """
+    os.makedirs(VECTORSTORE_DIR, exist_ok=True)
+    manifest = {"settings": ingest_settings(), "files": files}
+    tmp_path = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def duplicate_sources(files: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Map each kept chunk ID to the sources whose near-duplicate chunks it stands in for.
+    
+    Args:
+        files (Dict[str, Dict[str, Any]]): Manifest file entries
+        
+    Returns:
+        Dict[str, List[str]]: Sorted duplicate sources per kept chunk ID
+    """
+    duplicates: Dict[str, set] = {}
+    for source, entry in files.items():
+        for chunk in entry["chunks"]:
+            if chunk.get("duplicate_of"):
+                duplicates.setdefault(chunk["duplicate_of"], set()).add(source)
+    return {chunk_id: sorted(sources) for chunk_id, sources in duplicates.items()}
+
+def apply_duplicate_sources(documents: Dict[str, Document], duplicates: Dict[str, List[str]]) -> None:
+    """Record in each kept chunk's metadata the sources of the duplicates it replaced."""
+    for chunk_id, doc in documents.items():
+        if chunk_id in duplicates:
+            doc.metadata["duplicate_sources"] = duplicates[chunk_id]
+        else:
+            doc.metadata.pop("duplicate_sources", None)
+
+def ingest(
+    full: bool = False,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    compact: bool = False
+) -> Dict[str, int]:
+    """
+    Bring the vector store in line with the source files, re-embedding only what changed.
+    
+    Unchanged files are not even re-read. Changed files are re-split, and their
+    chunks whose content hash is already in the manifest keep their existing
+    vectors. Chunks of removed files and stale chunks of changed files are
+    deleted from the FAISS index and docstore.
+    
+    New chunks that near-duplicate a chunk already kept (the CV PDF vs. cv.md,
+    repeated README blocks) are not embedded: the manifest points them at the
+    kept chunk, whose ``duplicate_sources`` metadata lists their sources. Files
+    with such pointers into a changed or removed file are re-checked.
+    
+    Args:
+        full (bool): Ignore the manifest and rebuild the index from scratch
+        batch_size (Optional[int]): Chunks per embedding request
+        concurrency (Optional[int]): Embedding requests in flight
+        compact (bool): Also write the compact memory-mapped copy of the index
+        
+    Returns:
+        Dict[str, int]: Counts of files and chunks unchanged, added, deleted and deduplicated
+    """
+    manifest = None if full else load_manifest()
+    index_dir = VECTORSTORE_DIR / "faiss_index"
+    if manifest is not None and manifest.get("settings") != ingest_settings():
+        print("Ingestion settings changed since the last run, rebuilding from scratch")
+        manifest = None
+    if manifest is not None and not index_dir.exists():
+        print(f"Manifest found but no index at {index_dir}, rebuilding from scratch")
+        manifest = None
+    old_files = manifest["files"] if manifest else {}
+    
+    report = {
+        "files_unchanged": 0, "files_changed": 0, "files_added": 0, "files_removed": 0, "files_rechecked": 0,
+        "chunks_reused": 0, "chunks_added": 0, "chunks_deleted": 0, "chunks_duplicate": 0, "tokens_deduplicated": 0,
+    }
+    new_files: Dict[str, Dict[str, Any]] = {}
+    docs_to_add: List[Document] = []
+    ids_to_add: List[str] = []
+    ids_to_delete: List[str] = []
     
-    # Load documents
-    print("Loading documents...")
-    documents = load_documents()
-    print(f"Loaded {len(documents)} documents")
+    changed_files = []
+    source_paths = {}
+    for file_path in list_source_files():
+        source = get_relative_path(file_path, BASE_DIR)
+        source_paths[source] = file_path
+        digest = file_hash(file_path)
+        old_entry = old_files.get(source)
+        if old_entry is not None and old_entry["hash"] == digest:
+            new_files[source] = old_entry
+            report["files_unchanged"] += 1
+            report["chunks_reused"] += len(old_entry["chunks"])
+            continue
+        report["files_changed" if old_entry is not None else "files_added"] += 1
+        changed_files.append((file_path, source, digest))
     
-    # Split documents
-    print("Splitting documents into chunks...")
-    split_docs = split_documents(documents)
-    print(f"Split into {len(split_docs)} chunks")
+    # Unchanged files whose duplicates point into changed or removed files may now own the content
+    dirty = {source for _, source, _ in changed_files} | {source for source in old_files if source not in source_paths}
+    for source, entry in list(new_files.items()):
+        if any(chunk.get("duplicate_source") in dirty for chunk in entry["chunks"]):
+            del new_files[source]
+            report["files_unchanged"] -= 1
+            report["chunks_reused"] -= len(entry["chunks"])
+            report["files_rechecked"] += 1
+            changed_files.append((source_paths[source], source, entry["hash"]))
     
-    # Create and save vector store
-    create_vector_store(split_docs)
+    # Only changed, new and re-checked files are read and split
+    documents = []
+    for file_path, _, _ in changed_files:
+        documents.extend(load_file_documents(file_path))
+    chunks_by_source: Dict[str, List[Document]] = {}
+    for doc in split_documents(documents) if documents else []:
+        chunks_by_source.setdefault(doc.metadata["source"], []).append(doc)
+    
+    candidates = []
+    for _, source, digest in changed_files:
+        # Old chunks of this file, by content hash, that can be kept as they are
+        reusable: Dict[str, List[str]] = {}
+        for chunk in old_files.get(source, {}).get("chunks", []):
+            if chunk.get("id"):
+                reusable.setdefault(chunk["hash"], []).append(chunk["id"])
+        
+        chunks = []
+        for doc in chunks_by_source.get(source, []):
+            digest_chunk = chunk_hash(doc)
+            if reusable.get(digest_chunk):
+                chunks.append({"id": reusable[digest_chunk].pop(), "hash": digest_chunk})
+                report["chunks_reused"] += 1
+            else:
+                chunks.append({"hash": digest_chunk})
+                candidates.append((source, doc, chunks[-1]))
+        for stale_ids in reusable.values():
+            ids_to_delete.extend(stale_ids)
+        new_files[source] = {"hash": digest, "chunks": chunks}
+    
+    for source, old_entry in old_files.items():
+        if source not in new_files:
+            report["files_removed"] += 1
+            ids_to_delete.extend(chunk["id"] for chunk in old_entry["chunks"] if chunk.get("id"))
+    
+    embeddings = None
+    vector_store = None
+    if manifest is not None and dirty:
+        embeddings = get_embeddings(batch_size, concurrency)
+        vector_store = load_vector_store(embeddings)
+    
+    # De-duplicate new chunks against the chunks kept so far and against each
+    # other; markdown goes first so it, not the PDF extraction, is kept
+    candidates.sort(key=lambda candidate: candidate[1].metadata.get("file_type") == "pdf")
+    if candidates:
+        dedup = NearDuplicateIndex(threshold=DEDUP_THRESHOLD)
+        kept_sources = {}
+        for source, entry in new_files.items():
+            for chunk in entry["chunks"]:
+                if chunk.get("id") and vector_store is not None:
+                    kept_sources[chunk["id"]] = source
+                    dedup.add(chunk["id"], vector_store.docstore.search(chunk["id"]).page_content)
+        for source, doc, entry in candidates:
+            chunk_id = str(uuid.uuid4())
+            match = dedup.add_unless_duplicate(chunk_id, doc.page_content)
+            if match is not None:
+                entry.update({"duplicate_of": match[0], "duplicate_source": kept_sources[match[0]]})
+                report["chunks_duplicate"] += 1
+                report["tokens_deduplicated"] += estimate_tokens(doc.page_content)
+                continue
+            entry["id"] = chunk_id
+            kept_sources[chunk_id] = source
+            docs_to_add.append(doc)
+            ids_to_add.append(chunk_id)
+        if report["chunks_duplicate"]:
+            print(
+                f"Skipped {report['chunks_duplicate']} near-duplicate chunks "
+                f"(~{report['tokens_deduplicated']} tokens not embedded or retrieved)"
+            )
+    report["chunks_added"] = len(docs_to_add)
+    report["chunks_deleted"] = len(ids_to_delete)
+    
+    duplicates = duplicate_sources(new_files)
+    apply_duplicate_sources(dict(zip(ids_to_add, docs_to_add)), duplicates)
+    if manifest is None:
+        if not docs_to_add:
+            print("No documents found to ingest, vector store not created")
+            return report
+        create_vector_store(
+            docs_to_add, ids=ids_to_add, embeddings=get_embeddings(batch_size, concurrency), compact=compact
+        )
+    elif docs_to_add or ids_to_delete or duplicates != duplicate_sources(old_files):
+        existing = set(vector_store.index_to_docstore_id.values())
+        ids_to_delete = [chunk_id for chunk_id in ids_to_delete if chunk_id in existing]
+        if ids_to_delete:
+            print(f"Deleting {len(ids_to_delete)} stale chunks...")
+            vector_store.delete(ids_to_delete)
+        if docs_to_add:
+            print(f"Embedding {len(docs_to_add)} new or changed chunks...")
+            vector_store.add_documents(docs_to_add, ids=ids_to_add)
+            report_embedding_stats(embeddings, len(docs_to_add))
+        apply_duplicate_sources(
+            {chunk_id: vector_store.docstore.search(chunk_id) for chunk_id in vector_store.index_to_docstore_id.values()},
+            duplicates,
+        )
+        save_vector_store(vector_store, compact=compact)
+    else:
+        print("No changes detected, vector store left untouched")
+        if compact and not is_compact_store(VECTORSTORE_DIR / "compact_index"):
+            save_vector_store(load_vector_store(get_embeddings(batch_size, concurrency)), compact=True)
+        elif not (VECTORSTORE_DIR / LEXICAL_INDEX_FILE).exists() or not (VECTORSTORE_DIR / "shards" / SHARDS_MANIFEST).exists():
+            vector_store = load_vector_store(get_embeddings(batch_size, concurrency))
+            save_lexical_index(vector_store)
+            save_shards(vector_store)
+    save_manifest(new_files)
+    
+    print(
+        f"Files: {report['files_unchanged']} unchanged, {report['files_changed']} changed, "
+        f"{report['files_added']} added, {report['files_removed']} removed, {report['files_rechecked']} re-checked"
+    )
+    print(
+        f"Chunks: {report['chunks_reused']} reused, {report['chunks_added']} embedded, "
+        f"{report['chunks_deleted']} deleted, {report['chunks_duplicate']} near-duplicates skipped"
+    )
+    return report
+
+def main():
+    """Main function to run the ingestion process."""
+    parser = argparse.ArgumentParser(description="Ingest the CV and skills markdown into the vector store.")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and rebuild the index from scratch")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding request (INGEST_EMBED_BATCH_SIZE)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Embedding requests in flight (INGEST_EMBED_CONCURRENCY)")
+    parser.add_argument("--compact", action="store_true", help="Also write the compact memory-mapped index")
+    args = parser.parse_args()
+    
+    print("Starting document ingestion process...")
+    ingest(full=args.full, batch_size=args.batch_size, concurrency=args.concurrency, compact=args.compact)
     
     print("Document ingestion complete!")
     print(f"Vector store saved to: {VECTORSTORE_DIR / 'faiss_index'}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+"""
+Open-loop load generator for the HTTP API.
+
+Usage:
+    python -m src.scripts.load_test [--url http://localhost:8000] [--rps 5] [--duration 60]
+                                    [--endpoint ask --endpoint tts] [--corpus queries.jsonl]
+                                    [--output results.json]
+
+Requests are sent at a fixed target rate whether or not earlier ones have
+completed, so a slow server shows up as growing latency rather than as a
+lower request rate. Latency is measured from the moment a request was due,
+which keeps the generator's own lag in the numbers. Questions are taken in
+turn from the corpus, a JSON Lines file whose records carry the text under
+``query``, ``question``, ``text``, ``prompt`` or ``title``.
+
+To load-test without a model, start the stand-in Ollama server and point the
+app at it:
+
+    python -m src.scripts.fake_ollama --port 11435 --first-token-latency 0.2 --tokens-per-second 30
+    OLLAMA_BASE_URL=http://127.0.0.1:11435 uvicorn src.api.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from src.scripts.benchmark_suite import QUERIES
+
+# Path and JSON field carrying the text, per endpoint
+ENDPOINTS = {
+    "ask": ("/api/ask", "query"),
+    "stream": ("/api/ask/stream", "query"),
+    "chat": ("/api/chat", "query"),
+    "tts": ("/api/tts", "text"),
+}
+TEXT_FIELDS = ("query", "question", "text", "prompt", "title")
+_SSE_ERROR_RE = re.compile(rb"^event: error$", re.MULTILINE)
+
+
+def load_corpus(path: Path) -> List[str]:
+    """
+    Read the texts to replay from a JSON Lines file.
+
+    Args:
+        path: File with one JSON object per line
+
+    Returns:
+        List[str]: The text of every record that has one
+    """
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = next((record[field] for field in TEXT_FIELDS if record.get(field)), None)
+            if text:
+                texts.append(str(text))
+    if not texts:
+        raise ValueError(f"No texts found in {path} (expected one of the fields {', '.join(TEXT_FIELDS)})")
+    return texts
+
+
+class LoadResult:
+    """Outcome of one request."""
+
+    __slots__ = ("endpoint", "status", "error", "latency", "first_byte")
+
+    def __init__(self, endpoint: str, status: Optional[int], error: Optional[str], latency: float, first_byte: Optional[float]):
+        self.endpoint = endpoint
+        self.status = status
+        self.error = error
+        self.latency = latency
+        self.first_byte = first_byte
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, text: str, due: float) -> LoadResult:
+    """
+    Send one request and classify its outcome.
+
+    A response counts as failed on an HTTP error status, on a transport error
+    or timeout, on a JSON body with ``"status": "error"`` (``/api/ask`` and
+    ``/api/chat`` report errors that way with a 200), and on an SSE stream
+    carrying an ``error`` event (``/api/ask/stream`` fails mid-stream that way).
+
+    Args:
+        client: HTTP client pointing at the app
+        endpoint: Key of ``ENDPOINTS``
+        text: Question or text to speak
+        due: ``perf_counter`` time at which the request was scheduled
+
+    Returns:
+        LoadResult: Status, error kind and timings in seconds from ``due``
+    """
+    path, field = ENDPOINTS[endpoint]
+    first_byte = None
+    try:
+        async with client.stream("POST", path, json={field: text}) as response:
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - due
+                body.extend(chunk)
+        latency = time.perf_counter() - due
+    except httpx.TimeoutException:
+        return LoadResult(endpoint, None, "timeout", time.perf_counter() - due, first_byte)
+    except httpx.HTTPError as e:
+        return LoadResult(endpoint, None, type(e).__name__, time.perf_counter() - due, first_byte)
+
+    error = None
+    content_type = response.headers.get("content-type", "")
+    if response.status_code >= 400:
+        error = f"http_{response.status_code}"
+    elif content_type.startswith("text/event-stream"):
+        if _SSE_ERROR_RE.search(body):
+            error = "stream_error"
+    elif content_type.startswith("application/json"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict) and payload.get("status") == "error":
+            error = "api_error"
+    return LoadResult(endpoint, response.status_code, error, latency, first_byte)
+
+
+def summarize(results: Sequence[LoadResult], elapsed: float) -> Dict[str, Any]:
+    """
+    Aggregate request outcomes.
+
+    Args:
+        results: Completed requests
+        elapsed: Wall-clock seconds from the first request to the last completion
+
+    Returns:
+        Dict[str, Any]: Counts, throughput, error rate, and latency percentiles in ms
+    """
+    latencies = np.array([r.latency for r in results if r.error is None]) * 1000
+    first_bytes = np.array([r.first_byte for r in results if r.error is None and r.first_byte is not None]) * 1000
+    errors = Counter(r.error for r in results if r.error is not None)
+    summary: Dict[str, Any] = {
+        "requests": len(results),
+        "succeeded": int(latencies.size),
+        "failed": sum(errors.values()),
+        "error_rate": sum(errors.values()) / len(results) if results else 0.0,
+        "errors": dict(errors),
+        "throughput_rps": latencies.size / elapsed if elapsed > 0 else 0.0,
+    }
+    for name, values in (("latency_ms", latencies), ("first_byte_ms", first_bytes)):
+        if values.size:
+            summary[name] = {
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p90": float(np.percentile(values, 90)),
+                "p95": float(np.percentile(values, 95)),
+                "p99": float(np.percentile(values, 99)),
+                "max": float(values.max()),
+            }
+    return summary
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    texts: Sequence[str],
+    endpoints: Sequence[str] = ("ask",),
+    rps: float = 5.0,
+    total: int = 100,
+    max_in_flight: int = 256,
+) -> Dict[str, Any]:
+    """
+    Replay texts against the app at a target request rate.
+
+    Request ``i`` is due at ``i / rps`` seconds and uses the ``i``-th text and
+    endpoint, both taken round-robin.
+
+    Args:
+        client: HTTP client pointing at the app
+        texts: Questions or texts to speak
+        endpoints: Keys of ``ENDPOINTS`` to alternate between
+        rps: Target requests per second
+        total: Number of requests to send
+        max_in_flight: Cap on concurrent requests, beyond which sends are delayed
+
+    Returns:
+        Dict[str, Any]: Overall and per-endpoint summaries, plus the achieved send rate
+    """
+    slots = asyncio.Semaphore(max_in_flight)
+    results: List[LoadResult] = []
+    late = 0
+
+    async def one(i: int, due: float) -> None:
+        async with slots:
+            results.append(await send(client, endpoints[i % len(endpoints)], texts[i % len(texts)], due))
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        due = started + i / rps
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -0.01:
+            late += 1
+        tasks.append(asyncio.create_task(one(i, due)))
+    sent = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "target_rps": rps,
+        "send_rps": total / sent if sent > 0 else float(total),
+        "late_sends": late,
+        "elapsed_s": elapsed,
+        "overall": summarize(results, elapsed),
+    }
+    if len(set(endpoints)) > 1:
+        report["endpoints"] = {
+            name: summarize([r for r in results if r.endpoint == name], elapsed) for name in dict.fromkeys(endpoints)
+        }
+    return report
+
+
+def print_summary(name: str, summary: Dict[str, Any]) -> None:
+    """Print one summary as a short block."""
+    print(
+        f"{name}: {summary['requests']} requests, {summary['throughput_rps']:.2f} ok/s, "
+        f"error rate {summary['error_rate']:.1%} {summary['errors'] or ''}"
+    )
+    for key in ("latency_ms", "first_byte_ms"):
+        if key in summary:
+            stats = summary[key]
+            print(f"  {key}: p50 {stats['p50']:.1f}  p90 {stats['p90']:.1f}  p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f}  max {stats['max']:.1f}")
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    texts = load_corpus(args.corpus) if args.corpus else QUERIES
+    total = args.requests or max(1, int(args.rps * args.duration))
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(client, texts, args.endpoint or ["ask"], args.rps, total, args.max_in_flight)
+
+
+def main():
+    """Run the load test and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the app")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS), help="Endpoint to hit; repeat to mix")
+    parser.add_argument("--corpus", type=Path, default=None, help="JSON Lines file of texts to replay")
+    parser.add_argument("--rps", type=float, default=5.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of load, ignored with --requests")
+    parser.add_argument("--requests", type=int, default=None, help="Number of requests to send")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Cap on concurrent requests")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(f"Target {report['target_rps']:.1f} rps, sent at {report['send_rps']:.1f} rps ({report['late_sends']} late), {report['elapsed_s']:.1f}s")
+    print_summary("overall", report["overall"])
+    for name, summary in report.get("endpoints", {}).items():
+        print_summary(name, summary)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
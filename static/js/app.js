@@ -91,6 +91,7 @@ const app = createApp({
             isLoading.value = true;
 
             try {
+                if (await streamAnswer(userMessage.content)) return;
                 const response = await fetch('/api/ask', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
@@ -133,6 +134,79 @@ const app = createApp({
             }
         };
 
+        // Stream the answer from /api/ask/stream (Server-Sent Events), appending
+        // tokens to the assistant message as they arrive. Returns false if the
+        // stream could not be started so the caller can fall back to /api/ask.
+        const streamAnswer = async (query) => {
+            if (!window.ReadableStream || !window.TextDecoder) return false;
+            const response = await fetch('/api/ask/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ query })
+            });
+            const contentType = response.headers.get('content-type') || '';
+            if (response.status === 429 || response.status === 503) {
+                // Too busy: falling back to /api/ask would only be turned away too
+                const data = await response.json();
+                isLoading.value = false;
+                messages.value.push({
+                    id: Date.now() + 6,
+                    role: 'assistant',
+                    content: '⏳ ' + (data.message || 'The assistant is busy. Please try again shortly.'),
+                    timestamp: new Date()
+                });
+                return true;
+            }
+            if (!response.ok || !response.body || !contentType.startsWith('text/event-stream')) return false;
+
+            messages.value.push({
+                id: Date.now() + 5,
+                role: 'assistant',
+                content: '',
+                timestamp: new Date()
+            });
+            const message = messages.value[messages.value.length - 1];
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            const handleEvent = (block) => {
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (!data) return;
+                const payload = JSON.parse(data);
+                if (event === 'token') {
+                    isLoading.value = false;
+                    message.content += payload.text;
+                } else if (event === 'error') {
+                    message.content = payload.message || 'Sorry, something went wrong.';
+                } else if (event === 'done') {
+                    console.log('[Stream] time to first token (ms):', payload.time_to_first_token_ms, 'total (ms):', payload.total_ms);
+                }
+            };
+
+            try {
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let boundary;
+                    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                        handleEvent(buffer.slice(0, boundary));
+                        buffer = buffer.slice(boundary + 2);
+                    }
+                }
+            } finally {
+                isLoading.value = false;
+                if (!message.content) message.content = 'Sorry, something went wrong.';
+            }
+            return true;
+        };
+
         return {
             messages,
             userInput,
@@ -149,28 +223,90 @@ const app = createApp({
     }
 });
 
-// Function to play TTS
-function playTTS(text) {
-    if (!text) return;
-    const btn = event?.target;
-    if (btn) btn.disabled = true;
-    fetch('/api/tts', {
+// Play raw 16-bit PCM from /api/tts/stream as it arrives, so playback starts after the first sentence.
+// Resolves when playback has finished.
+async function streamTTS(text) {
+    const response = await fetch('/api/tts/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text, format: 'pcm' })
+    });
+    if (!response.ok || !response.body) throw new Error('TTS request failed: ' + response.status);
+    const sampleRate = Number(response.headers.get('X-Sample-Rate')) || 22050;
+    const context = new AudioContext({ sampleRate });
+    const reader = response.body.getReader();
+    let nextStart = context.currentTime;
+    let leftover = null;
+    let lastSource = null;
+    try {
+        for (;;) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            let bytes = value;
+            if (leftover) {
+                bytes = new Uint8Array(leftover.length + value.length);
+                bytes.set(leftover);
+                bytes.set(value, leftover.length);
+                leftover = null;
+            }
+            // Samples are 2 bytes; keep an odd trailing byte for the next chunk
+            const usable = bytes.length - (bytes.length % 2);
+            if (usable < bytes.length) leftover = bytes.slice(usable);
+            if (!usable) continue;
+            const view = new DataView(bytes.buffer, bytes.byteOffset, usable);
+            const samples = new Float32Array(usable / 2);
+            for (let i = 0; i < samples.length; i++) samples[i] = view.getInt16(i * 2, true) / 32768;
+            const buffer = context.createBuffer(1, samples.length, sampleRate);
+            buffer.copyToChannel(samples, 0);
+            const source = context.createBufferSource();
+            source.buffer = buffer;
+            source.connect(context.destination);
+            nextStart = Math.max(nextStart, context.currentTime);
+            source.start(nextStart);
+            nextStart += buffer.duration;
+            lastSource = source;
+        }
+        if (lastSource) await new Promise(resolve => { lastSource.onended = resolve; });
+    } finally {
+        context.close().catch(() => {});
+    }
+}
+
+// Fetch the whole WAV and play it; for browsers without streaming fetch or Web Audio
+function playWholeTTS(text) {
+    return fetch('/api/tts', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ text })
     })
         .then(response => {
-            if (!response.ok) throw new Error('TTS request failed');
+            if (!response.ok) throw new Error('TTS request failed: ' + response.status);
             return response.blob();
         })
-        .then(audioBlob => {
+        .then(audioBlob => new Promise((resolve, reject) => {
             const audioUrl = URL.createObjectURL(audioBlob);
             const audio = new Audio(audioUrl);
-            audio.onended = () => { if (btn) btn.disabled = false; };
-            audio.onerror = () => { if (btn) btn.disabled = false; };
-            audio.play();
-        })
-        .catch(() => { if (btn) btn.disabled = false; });
+            audio.onended = resolve;
+            audio.onerror = () => reject(new Error('Audio playback failed.'));
+            audio.play().catch(reject);
+        }));
+}
+
+function speak(text) {
+    if (typeof AudioContext !== 'undefined' && typeof ReadableStream !== 'undefined') {
+        return streamTTS(text);
+    }
+    return playWholeTTS(text);
+}
+
+// Function to play TTS
+function playTTS(text) {
+    if (!text) return;
+    const btn = event?.target;
+    if (btn) btn.disabled = true;
+    speak(text)
+        .catch(err => console.error('[TTS] Playback error:', err))
+        .finally(() => { if (btn) btn.disabled = false; });
 }
 
 // Global Vue component for TTS button
@@ -182,40 +318,13 @@ app.component('tts-button', {
         play() {
             if (!this.text || this.loading) return;
             this.loading = true;
-            console.log('[TTS] Sending request to /api/tts:', this.text);
-            fetch('/api/tts', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text: this.text })
-            })
-                .then(response => {
-                    if (!response.ok) {
-                        console.error('[TTS] Response not OK:', response.status, response.statusText);
-                        throw new Error('TTS request failed: ' + response.status);
-                    }
-                    return response.blob();
-                })
-                .then(audioBlob => {
-                    console.log('[TTS] Received audio blob:', audioBlob);
-                    const audioUrl = URL.createObjectURL(audioBlob);
-                    const audio = new Audio(audioUrl);
-                    audio.onended = () => { this.loading = false; };
-                    audio.onerror = (e) => {
-                        this.loading = false;
-                        alert('Audio playback failed.');
-                        console.error('[TTS] Audio playback error:', e);
-                    };
-                    audio.play().catch(e => {
-                        this.loading = false;
-                        alert('Audio playback failed.');
-                        console.error('[TTS] Audio play() error:', e);
-                    });
-                })
+            console.log('[TTS] Streaming speech from /api/tts/stream:', this.text);
+            speak(this.text)
                 .catch((err) => {
-                    this.loading = false;
                     alert('TTS request failed: ' + err.message);
-                    console.error('[TTS] Fetch error:', err);
-                });
+                    console.error('[TTS] Playback error:', err);
+                })
+                .finally(() => { this.loading = false; });
         }
     }
 });
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import src.api.main as api_main
+from src.core import rag_pipeline
+from src.core.admission import AdmissionController, AdmissionRejected
+from src.core.rag_pipeline import RAGChainManager
+from src.core.single_flight import SingleFlight, StreamFlight
+
+
+async def hold(controller, seconds, log, name):
+    async with controller.slot():
+        log.append(name)
+        await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_waiters_are_served_in_order():
+    controller = AdmissionController(max_concurrent=2, max_queue=4)
+    log = []
+    tasks = [asyncio.create_task(hold(controller, 0.05, log, i)) for i in range(5)]
+    await asyncio.sleep(0.01)
+    assert (controller.active, controller.queued) == (2, 3)
+    await asyncio.gather(*tasks)
+    assert log == [0, 1, 2, 3, 4]
+    assert controller.stats()["active"] == 0
+    assert controller.stats()["admitted"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_expired_wait_are_rejected():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    running = asyncio.create_task(hold(controller, 0.2, [], "running"))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+    with pytest.raises(AdmissionRejected) as full:
+        await controller.acquire()
+    assert full.value.status_code == 429 and full.value.retry_after >= 1
+    with pytest.raises(AdmissionRejected) as expired:
+        await waiting
+    assert expired.value.status_code == 503
+    await running
+    assert controller.stats()["rejected"] == 1 and controller.stats()["timed_out"] == 1
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(max_concurrent=1, max_queue=2)
+    running = asyncio.create_task(hold(controller, 0.05, [], "running"))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert controller.queued == 0
+    await running
+    assert controller.active == 0
+    assert controller.stats()["cancelled"] == 1
+
+
+class SlowChain:
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(0.3)
+        return f"answer to {inputs['question']}"
+
+    async def astream(self, inputs):
+        await asyncio.sleep(0.3)
+        yield f"answer to {inputs['question']}"
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", lambda vectorstore_dir=None: object())
+    monkeypatch.setattr(rag_pipeline, "create_rag_chain", lambda vector_store=None: SlowChain())
+    monkeypatch.setattr(rag_pipeline, "chain_manager", RAGChainManager())
+    monkeypatch.setattr(rag_pipeline, "answer_flights", SingleFlight())
+    monkeypatch.setattr(rag_pipeline, "stream_flights", StreamFlight())
+    monkeypatch.setattr(rag_pipeline, "admission", controller)
+    monkeypatch.setattr(api_main, "admission", controller)
+    return controller
+
+
+@pytest.mark.asyncio
+async def test_overflow_gets_429_while_cv_questions_bypass_the_queue(limited):
+    async with AsyncClient(transport=ASGITransport(app=api_main.app), base_url="http://test") as ac:
+        first = asyncio.create_task(ac.post("/api/ask", json={"query": "What about Flux?"}))
+        second = asyncio.create_task(ac.post("/api/chat", json={"query": "What about Terraform?"}))
+        await asyncio.sleep(0.1)
+        assert (limited.active, limited.queued) == (1, 1)
+        rejected = await ac.post("/api/ask", json={"query": "What about Podman?"})
+        rejected_stream = await ac.post("/api/ask/stream", json={"query": "What about Helm?"})
+        cv = await ac.post("/api/ask", json={"query": "Show me your CV"})
+        answers = await asyncio.gather(first, second)
+
+    assert rejected.status_code == rejected_stream.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert rejected.json()["status"] == "error"
+    assert cv.json()["status"] == "success"
+    assert answers[0].json()["data"]["answer"] == "answer to What about Flux?"
+    assert answers[1].json()["response"] == "answer to What about Terraform?"
+
+
+
+@pytest.mark.asyncio
+async def test_stream_joining_one_in_flight_is_not_turned_away(limited):
+    async with AsyncClient(transport=ASGITransport(app=api_main.app), base_url="http://test") as ac:
+        first = asyncio.create_task(ac.post("/api/ask/stream", json={"query": "What about Helm?"}))
+        second = asyncio.create_task(ac.post("/api/ask", json={"query": "What about Terraform?"}))
+        await asyncio.sleep(0.1)
+        assert (limited.active, limited.queued) == (1, 1)
+        joined = await ac.post("/api/ask/stream", json={"query": "what about  helm"})
+        answers = await asyncio.gather(first, second)
+
+    assert joined.status_code == answers[0].status_code == 200
+    token = 'event: token\ndata: {"text": "answer to What about Helm?"}'
+    assert token in joined.text
+    assert token in answers[0].text
+
+class FakeRequest:
+    """Request whose client disconnects after ``delay`` seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def receive(self):
+        await asyncio.sleep(self.delay)
+        return {"type": "http.disconnect"}
+
+
+@pytest.mark.asyncio
+async def test_queued_question_is_dropped_when_the_client_leaves(limited):
+    running = asyncio.create_task(rag_pipeline.answer_question_async("What about Flux?"))
+    await asyncio.sleep(0.05)
+    result = await api_main.answer_unless_disconnected(FakeRequest(0.05), "What about Terraform?")
+    assert result is None
+    assert limited.queued == 0
+    assert limited.stats()["cancelled"] == 1
+    assert (await running)["success"]
@@ -0,0 +1,94 @@
+import time
+
+import numpy as np
+
+from src.core.answer_cache import SemanticAnswerCache
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_same_question_hits():
+    cache = SemanticAnswerCache()
+    cache.store("What Kubernetes experience does he have?", unit(1.0, 0.0, 0.0), "lots", "v1")
+    assert cache.lookup("what kubernetes  experience does he have", unit(1.0, 0.0, 0.0), "v1") == "lots"
+    assert cache.lookup("What Flux experience does he have?", unit(0.0, 1.0, 0.0), "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_similar_questions_on_other_topics_miss_by_default():
+    cache = SemanticAnswerCache()
+    cache.store("What Kubernetes experience does he have?", unit(1.0, 0.0, 0.0), "Kubernetes answer", "v1")
+    # Generative-model embeddings of same-shape questions are nearly identical
+    assert cache.lookup("What Terraform experience does he have?", unit(1.0, 0.05, 0.0), "v1") is None
+
+
+def test_near_duplicate_question_hits_when_enabled():
+    cache = SemanticAnswerCache(max_distance=0.05)
+    cache.store("what kubernetes experience does he have", unit(1.0, 0.0, 0.0), "lots", "v1")
+    assert cache.lookup("what experience with kubernetes does he have", unit(1.0, 0.1, 0.0), "v1") == "lots"
+    assert cache.lookup("what flux experience does he have", unit(0.0, 1.0, 0.0), "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_new_index_version_invalidates_entries():
+    cache = SemanticAnswerCache()
+    cache.store("q", unit(1.0, 0.0), "old answer", "v1")
+    assert cache.lookup("q", unit(1.0, 0.0), "v2") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_answer_from_replaced_index_is_not_stored():
+    cache = SemanticAnswerCache()
+    cache.store("a", unit(1.0, 0.0), "old A", "v1")
+    # The index is reloaded while a v1 answer is still being generated
+    assert cache.lookup("b", unit(0.0, 1.0), "v2") is None
+    cache.store("b", unit(0.0, 1.0), "new B", "v2")
+    cache.store("c", unit(1.0, 1.0), "late old C", "v1")
+    assert cache.lookup("b", unit(0.0, 1.0), "v2") == "new B"
+    assert cache.lookup("c", unit(1.0, 1.0), "v2") is None
+    stats = cache.stats()
+    assert stats["version"] == "v2"
+    assert stats["entries"] == 1
+    assert stats["invalidations"] == 1
+    assert stats["stale_stores"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.store("a", unit(1.0, 0.0, 0.0), "A", "v1")
+    cache.store("b", unit(0.0, 1.0, 0.0), "B", "v1")
+    assert cache.lookup("a", unit(1.0, 0.0, 0.0), "v1") == "A"
+    cache.store("c", unit(0.0, 0.0, 1.0), "C", "v1")
+    assert cache.lookup("b", unit(0.0, 1.0, 0.0), "v1") is None
+    assert cache.lookup("a", unit(1.0, 0.0, 0.0), "v1") == "A"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_bound_is_enforced():
+    cache = SemanticAnswerCache(max_bytes=1000)
+    cache.store("a", unit(1.0, 0.0), "x" * 600, "v1")
+    cache.store("b", unit(0.0, 1.0), "y" * 600, "v1")
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] <= 1000
+
+
+def test_expired_entries_are_not_served():
+    cache = SemanticAnswerCache(ttl_seconds=0.01)
+    cache.store("a", unit(1.0, 0.0), "A", "v1")
+    time.sleep(0.02)
+    assert cache.lookup("a", unit(1.0, 0.0), "v1") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disabled_cache_never_hits():
+    cache = SemanticAnswerCache(enabled=False)
+    cache.store("a", unit(1.0, 0.0), "A", "v1")
+    assert cache.lookup("a", unit(1.0, 0.0), "v1") is None
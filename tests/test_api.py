@@ -0,0 +1,141 @@
+import asyncio
+import json
+import time
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from src.api.main import app, sse_answer_events
+from src.core import rag_pipeline
+from src.core.admission import AdmissionController
+
+LLM_DELAY = 0.5
+
+
+class FakeSlowChain:
+    """Stands in for the RAG chain; every generation takes LLM_DELAY seconds."""
+
+    def __init__(self, delay=LLM_DELAY):
+        self.delay = delay
+
+    def invoke(self, inputs):
+        time.sleep(self.delay)
+        return f"answer to {inputs['question']}"
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(self.delay)
+        return f"answer to {inputs['question']}"
+
+    async def astream(self, inputs):
+        self.stream_closed = False
+        try:
+            for token in ["answer ", "to ", inputs["question"]]:
+                await asyncio.sleep(self.delay / 10)
+                yield token
+        finally:
+            self.stream_closed = True
+
+
+@pytest.fixture
+def slow_chain(monkeypatch):
+    manager = rag_pipeline.chain_manager
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", lambda vectorstore_dir=None: object())
+    monkeypatch.setattr(rag_pipeline, "create_rag_chain", lambda vector_store=None: FakeSlowChain())
+    manager.reset()
+    manager.load()
+    yield manager
+    manager.reset()
+
+
+@pytest_asyncio.fixture
+async def client():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_ask_returns_answer(slow_chain, client):
+    response = await client.post("/api/ask", json={"query": "What about Terraform?"})
+    body = response.json()
+    assert body["status"] == "success"
+    assert body["data"]["answer"] == "answer to What about Terraform?"
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_do_not_block_each_other(slow_chain, client, monkeypatch):
+    requests = 8
+    # Admission control would otherwise queue generations beyond its limit
+    monkeypatch.setattr(rag_pipeline, "admission", AdmissionController(max_concurrent=requests))
+    started = time.perf_counter()
+    responses = await asyncio.gather(*[
+        client.post("/api/ask" if i % 2 else "/api/chat", json={"query": f"question {i}"})
+        for i in range(requests)
+    ])
+    elapsed = time.perf_counter() - started
+    assert all(r.status_code == 200 for r in responses)
+    # Sequential execution would take requests * LLM_DELAY
+    assert elapsed < LLM_DELAY * 2
+
+
+@pytest.mark.asyncio
+async def test_health_responds_during_generation(slow_chain, client):
+    pending = asyncio.create_task(client.post("/api/ask", json={"query": "slow question"}))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    health = await client.get("/health")
+    assert time.perf_counter() - started < LLM_DELAY / 2
+    assert health.json()["ready"] is True
+    assert not pending.done()
+    await pending
+
+
+@pytest.mark.asyncio
+async def test_answer_question_async_times_out(slow_chain):
+    result = await rag_pipeline.answer_question_async("slow question", timeout=0.05)
+    assert result["success"] is False
+    assert "took too long" in result["answer"]
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_emits_tokens_then_metadata(slow_chain, client):
+    response = await client.post("/api/ask/stream", json={"query": "Flux"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    tokens = [data["text"] for name, data in events if name == "token"]
+    assert "".join(tokens) == "answer to Flux"
+    name, done = events[-1]
+    assert name == "done"
+    assert done["chunks"] == 3
+    assert done["time_to_first_token_ms"] <= done["total_ms"]
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_rejects_empty_query(client):
+    response = await client.post("/api/ask/stream", json={"query": "  "})
+    assert response.json()["status"] == "error"
+
+
+class DisconnectingRequest:
+    def __init__(self, connected_polls):
+        self.connected_polls = connected_polls
+
+    async def is_disconnected(self):
+        self.connected_polls -= 1
+        return self.connected_polls < 0
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_generation_on_disconnect(slow_chain):
+    chain = slow_chain.get_chain()
+    messages = [m async for m in sse_answer_events(DisconnectingRequest(connected_polls=1), "Podman")]
+    assert len(messages) == 1
+    assert chain.stream_closed is True
@@ -0,0 +1,95 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.backend.api import tts
+from src.backend.audio_cache import AudioCache, audio_cache_key
+from src.backend.tts_pool import TTSWorkerPool
+
+
+def test_key_normalizes_whitespace_and_includes_settings():
+    assert audio_cache_key("Hello  world.\n", model="a") == audio_cache_key("Hello world.", model="a")
+    assert audio_cache_key("Hello world.", model="a") != audio_cache_key("Hello world.", model="b")
+    assert audio_cache_key("Hello world.", model="a") != audio_cache_key("Hello world!", model="a")
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=250)
+    for name in ("a", "b"):
+        cache.put(audio_cache_key(name), b"x" * 100)
+    assert cache.get(audio_cache_key("a")) is not None
+    cache.put(audio_cache_key("c"), b"x" * 100)
+    assert cache.get(audio_cache_key("b")) is None
+    assert sorted(p.stem for p in tmp_path.glob("*.wav")) == sorted(audio_cache_key(n) for n in ("a", "c"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_index_is_rebuilt_from_disk_in_recency_order(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=250)
+    for i, name in enumerate(("a", "b")):
+        path = cache.put(audio_cache_key(name), b"x" * 100)
+        os.utime(path, (i, i))
+    reopened = AudioCache(tmp_path, max_bytes=250)
+    assert reopened.stats()["entries"] == 2
+    reopened.put(audio_cache_key("c"), b"x" * 100)
+    assert audio_cache_key("a") not in reopened
+    assert audio_cache_key("b") in reopened
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_synthesis(tmp_path):
+    cache = AudioCache(tmp_path)
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return b"RIFF"
+
+    key = audio_cache_key("Hello")
+    paths = await asyncio.gather(*(cache.get_or_create(key, produce) for _ in range(5)))
+    assert len(calls) == 1
+    assert {path.read_bytes() for path in paths} == {b"RIFF"}
+    assert cache.stats()["coalesced"] == 4
+    await cache.get_or_create(key, produce)
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def cached_app(monkeypatch, tmp_path):
+    texts = []
+
+    def synthesize(model, text):
+        texts.append(text)
+        return b"RIFF" + bytes(range(100))
+
+    pool = TTSWorkerPool(model_factory=object, synthesize_fn=synthesize)
+    monkeypatch.setattr(tts, "tts_pool", pool)
+    monkeypatch.setattr(tts, "audio_cache", AudioCache(tmp_path))
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api")
+    yield app, texts
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_are_served_from_cache(cached_app):
+    app, texts = cached_app
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.post("/api/tts", json={"text": "Hello world."})
+        second = await ac.post("/api/tts", json={"text": "Hello   world."})
+        etag = first.headers["etag"]
+        not_modified = await ac.post("/api/tts", json={"text": "Hello world."}, headers={"If-None-Match": etag})
+        partial = await ac.get(first.headers["content-location"], headers={"Range": "bytes=0-3"})
+        missing = await ac.get("/api/tts/audio/" + "0" * 64)
+    assert texts == ["Hello world."]
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content == b"RIFF" + bytes(range(100))
+    assert second.headers["etag"] == etag
+    assert not_modified.status_code == 304
+    assert (partial.status_code, partial.content) == (206, b"RIFF")
+    assert partial.headers["content-range"] == "bytes 0-3/104"
+    assert missing.status_code == 404
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from src.scripts import benchmark_suite, ingest_data
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    skills = tmp_path / "skills_md"
+    skills.mkdir()
+    monkeypatch.setattr(ingest_data, "CV_DIR", tmp_path / "cv")
+    monkeypatch.setattr(ingest_data, "SKILLS_DIR", skills)
+    for name in ["flux", "kubernetes", "terraform", "nixos"]:
+        (skills / f"{name}.md").write_text(f"# {name}\n\n## Usage\n\n{name} usage notes.\n\n## Tips\n\n{name} tips.\n")
+    return skills
+
+
+def test_suite_runs_offline_and_reports_every_stage(corpus):
+    results = benchmark_suite.run(iterations=3, embedding_size=8, load_runs=1)
+    json.dumps(results)
+    assert results["ingest"]["chunks"] >= 4
+    assert set(results["load"]) == {"faiss", "compact"}
+    assert set(results["retrieval"]) == {f"k={k}" for k in benchmark_suite.RETRIEVAL_KS}
+    assert results["retrieval"]["k=5"]["hybrid_packed"]["n"] == 3
+    assert results["answer"]["p95_ms"] >= results["answer"]["p50_ms"] > 0
+
+
+def test_compare_reports_changed_timings_only():
+    previous = {"meta": {"iterations": 10}, "answer": {"p50_ms": 10.0, "n": 10}, "load": {"faiss": {"p50_ms": 5.0}}}
+    current = {"meta": {"iterations": 50}, "answer": {"p50_ms": 15.0, "n": 50}, "load": {"faiss": {"p50_ms": 5.1}}}
+    assert benchmark_suite.compare(previous, current) == ["answer.p50_ms: 10.000 -> 15.000 (+50%)"]
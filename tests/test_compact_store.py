@@ -0,0 +1,60 @@
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+
+from src.core import rag_pipeline
+from src.core.compact_store import CompactVectorStore, convert_faiss_store, is_compact_store
+
+
+@pytest.fixture
+def faiss_store():
+    texts = [f"Chunk {i} about {topic}" for i, topic in enumerate(["Kubernetes", "Terraform", "NixOS", "Azure"] * 10)]
+    metadatas = [{"source": f"doc{i % 4}.md", "category": "skills" if i % 2 else "cv"} for i in range(len(texts))]
+    return FAISS.from_texts(texts, DeterministicFakeEmbedding(size=32), metadatas=metadatas)
+
+
+@pytest.fixture
+def compact_store(faiss_store, tmp_path):
+    convert_faiss_store(faiss_store, tmp_path / "compact_index")
+    return CompactVectorStore.load(tmp_path / "compact_index", faiss_store.embeddings)
+
+
+def test_conversion_round_trips_chunks(faiss_store, compact_store):
+    assert len(compact_store) == faiss_store.index.ntotal
+    assert compact_store.dimension == 32
+    for position, doc_id in faiss_store.index_to_docstore_id.items():
+        original = faiss_store.docstore.search(doc_id)
+        converted = compact_store.document(position)
+        assert converted.id == doc_id
+        assert converted.page_content == original.page_content
+        assert converted.metadata == original.metadata
+
+
+def test_search_matches_faiss(faiss_store, compact_store):
+    query = faiss_store.embeddings.embed_query("Terraform modules")
+    expected = faiss_store.similarity_search_with_score_by_vector(query, k=10)
+    actual = compact_store.similarity_search_with_score_by_vector(query, k=10)
+    assert [doc.page_content for doc, _ in actual] == [doc.page_content for doc, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected], rel=1e-4)
+
+
+def test_search_applies_metadata_filter(compact_store):
+    results = compact_store.similarity_search("Azure", k=5, filter={"category": "cv"}, fetch_k=40)
+    assert len(results) == 5
+    assert all(doc.metadata["category"] == "cv" for doc in results)
+
+
+def test_reconversion_replaces_store(faiss_store, tmp_path):
+    target = tmp_path / "compact_index"
+    convert_faiss_store(faiss_store, target)
+    faiss_store.add_texts(["One more chunk"])
+    convert_faiss_store(faiss_store, target)
+    assert len(CompactVectorStore.load(target)) == faiss_store.index.ntotal
+    assert not (tmp_path / "compact_index.tmp").exists()
+
+
+def test_load_vector_store_detects_compact_format(faiss_store, tmp_path, monkeypatch):
+    convert_faiss_store(faiss_store, tmp_path / "compact_index")
+    monkeypatch.setattr(rag_pipeline, "create_embeddings", lambda **kwargs: DeterministicFakeEmbedding(size=32))
+    assert is_compact_store(tmp_path / "compact_index")
+    assert isinstance(rag_pipeline.load_vector_store(tmp_path / "compact_index"), CompactVectorStore)
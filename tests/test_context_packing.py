@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+
+from src.core.compact_store import CompactVectorStore, convert_faiss_store
+from src.core.context_packing import ContextPacker, estimate_tokens, search_with_vectors
+from src.core.rag_pipeline import create_rag_chain
+
+
+def candidate(text, vector):
+    return Document(page_content=text, metadata={"source": text[:10]}), np.asarray(vector, dtype=np.float32)
+
+
+def test_exact_and_near_duplicates_are_removed():
+    candidates = [
+        candidate("Kubernetes operator for Flux", [1.0, 0.0, 0.0]),
+        candidate("kubernetes   operator for flux!", [0.9, 0.1, 0.0]),
+        candidate("Kubernetes operator for Flux (PDF copy)", [1.0, 0.001, 0.0]),
+        candidate("Terraform modules", [0.5, 0.5, 0.0]),
+    ]
+    packed = ContextPacker(token_budget=1000).pack([1.0, 0.0, 0.0], candidates)
+    assert [doc.page_content for doc in packed.documents] == ["Kubernetes operator for Flux", "Terraform modules"]
+    assert packed.duplicates == 2
+
+
+def test_packing_respects_token_budget():
+    candidates = [candidate(f"{i}" + "x" * 399, [1.0, i * 0.1, 0.0]) for i in range(10)]
+    candidates.append(candidate("short", [0.0, 0.0, 1.0]))
+    packer = ContextPacker(token_budget=250, duplicate_threshold=1.1)
+    packed = packer.pack([1.0, 0.0, 0.0], candidates)
+    assert packed.packed_tokens <= 250
+    assert len(packed.documents) == 3  # two long chunks, then the short one still fits
+    assert packed.tokens_saved == packed.candidate_tokens - packed.packed_tokens > 0
+    assert packer.stats()["tokens_saved"] == packed.tokens_saved
+    assert packer.stats()["requests"] == 1
+
+
+def test_mmr_prefers_diverse_chunks():
+    candidates = [
+        candidate("first", [1.0, 0.0]),
+        candidate("second", [0.98, 0.2]),
+        candidate("other topic", [0.6, -0.8]),
+    ]
+    packed = ContextPacker(token_budget=1000, lambda_mult=0.3, duplicate_threshold=1.1, max_chunks=2).pack(
+        [1.0, 0.0], candidates
+    )
+    assert [doc.page_content for doc in packed.documents] == ["first", "other topic"]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+
+
+@pytest.fixture
+def faiss_store():
+    texts = [f"Chunk {i} about {topic}" for i, topic in enumerate(["Kubernetes", "Terraform", "NixOS"] * 5)]
+    return FAISS.from_texts(texts, DeterministicFakeEmbedding(size=16))
+
+
+def test_search_with_vectors_matches_between_formats(faiss_store, tmp_path):
+    compact = CompactVectorStore.load(convert_faiss_store(faiss_store, tmp_path / "compact"), faiss_store.embeddings)
+    query = faiss_store.embeddings.embed_query("NixOS")
+    from_faiss = search_with_vectors(faiss_store, query, 5)
+    from_compact = search_with_vectors(compact, query, 5)
+    assert [doc.page_content for doc, _ in from_faiss] == [doc.page_content for doc, _ in from_compact]
+    np.testing.assert_allclose([v for _, v in from_faiss], [v for _, v in from_compact], rtol=1e-6)
+
+
+def test_chain_context_is_deduplicated(faiss_store):
+    faiss_store.add_texts(["Chunk 0 about Kubernetes"] * 3)
+    chain = create_rag_chain(faiss_store, ContextPacker(token_budget=1000))
+    context = chain.first.steps__["context"].invoke({"question": "Kubernetes", "embedding": None})
+    assert context.count("Chunk 0 about Kubernetes") == 1
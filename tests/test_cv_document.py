@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from src.core import rag_pipeline
+from src.core.cv_document import CVDocument
+
+CV = """# Jane Doe
+
+## Professional Summary
+
+DevOps engineer.
+
+## Professional Experience
+
+### SRE | Acme | London, UK | 2020 – Present
+
+- Ran Kubernetes.
+
+### Engineer | Initech | Oslo | 2018 – 2020
+
+- Wrote Terraform.
+
+## Languages
+
+- English
+
+## Interests *(Optional)*
+
+Music.
+"""
+
+
+@pytest.fixture
+def cv_file(tmp_path):
+    path = tmp_path / "cv.md"
+    path.write_text(CV, encoding="utf-8")
+    return path
+
+
+def test_parses_sections_and_entries(cv_file):
+    cv = CVDocument(cv_file)
+    assert cv.full_markdown() == CV
+    assert list(cv.sections) == ["Professional Summary", "Professional Experience", "Languages", "Interests *(Optional)*"]
+    assert [(entry.role, entry.company, entry.period) for entry in cv.entries] == [
+        ("SRE", "Acme", "2020 – Present"),
+        ("Engineer", "Initech", "2018 – 2020"),
+    ]
+    assert cv.experience_markdown().startswith("## Professional Experience\n\n### SRE | Acme")
+    assert cv.section_markdown("Languages") == "## Languages\n- English"
+    assert cv.section_markdown("Interests") == "## Interests\n*(Optional)*\n\nMusic."
+    assert cv.section_markdown("Volunteering") == "No section 'Volunteering' found in the CV."
+
+
+def test_file_is_read_once_until_it_changes(cv_file, monkeypatch):
+    cv = CVDocument(cv_file, check_interval=0)
+    reads = []
+    original = type(cv_file).read_bytes
+    monkeypatch.setattr(type(cv_file), "read_bytes", lambda self: reads.append(self) or original(self))
+    for _ in range(5):
+        cv.section_markdown("Languages")
+    assert len(reads) == 1
+
+    cv_file.write_text(CV.replace("- English", "- English\n- Polish"), encoding="utf-8")
+    os.utime(cv_file, ns=(1, 1))
+    assert cv.section_markdown("Languages") == "## Languages\n- English\n- Polish"
+    assert (len(reads), cv.loads) == (2, 2)
+
+
+def test_touch_without_content_change_does_not_reparse(cv_file):
+    cv = CVDocument(cv_file, check_interval=0)
+    cv.full_markdown()
+    os.utime(cv_file, ns=(1, 1))
+    cv.full_markdown()
+    assert cv.loads == 1
+
+
+def test_missing_file(tmp_path):
+    cv = CVDocument(tmp_path / "missing.md")
+    assert cv.full_markdown() == "CV file not found."
+    assert cv.experience_markdown() == "CV file not found."
+
+
+@pytest.mark.asyncio
+async def test_cv_functions_serve_from_document(cv_file, monkeypatch):
+    monkeypatch.setattr(rag_pipeline, "cv_document", CVDocument(cv_file))
+    assert rag_pipeline.get_full_cv_markdown() == CV
+    assert await rag_pipeline.list_cv_full() == CV
+    assert "### Engineer | Initech" in await rag_pipeline.list_all_cv_entries()
+    assert await rag_pipeline.list_cv_section("Professional Summary") == "## Professional Summary\nDevOps engineer."
@@ -0,0 +1,40 @@
+from src.core.dedup import NearDuplicateIndex, shingles
+
+TEXT = (
+    "Olaf worked as a Senior DevOps Engineer at Example Corp, building Azure Kubernetes "
+    "Service platforms with Terraform, Flux and GitHub Actions for twenty product teams."
+)
+
+
+def test_shingles_ignore_markup_and_case():
+    assert shingles("**Flux**  reconciles\\nclusters", size=2) == {"flux reconciles", "reconciles nclusters"}
+    assert shingles("Flux", size=3) == {"flux"}
+    assert shingles("", size=3) == set()
+
+
+def test_reformatted_copy_is_a_duplicate():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("md", TEXT)
+    pdf_copy = TEXT.replace(",", "").replace("Kubernetes ", "Kubernetes\n").upper()
+    match = index.find(pdf_copy)
+    assert match is not None and match[0] == "md" and match[1] == 1.0
+
+
+def test_different_text_is_not_a_duplicate():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("md", TEXT)
+    assert index.find("Podman runs rootless containers without a daemon on Fedora and RHEL hosts.") is None
+
+
+def test_small_edit_stays_above_threshold_and_large_edit_does_not():
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("md", TEXT)
+    assert index.find(TEXT.replace("twenty", "thirty")) is not None
+    assert index.find(" ".join(TEXT.split()[:8]) + " and then something else entirely different happened") is None
+
+
+def test_add_unless_duplicate_keeps_first():
+    index = NearDuplicateIndex()
+    assert index.add_unless_duplicate("a", TEXT) is None
+    assert index.add_unless_duplicate("b", TEXT)[0] == "a"
+    assert len(index) == 1
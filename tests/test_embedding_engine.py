@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.core.embedding_engine import BatchEmbeddingEngine
+from src.core.embeddings import SafeOllamaEmbeddings
+from src.scripts.fake_ollama import FakeOllamaServer, fake_embedding
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def ollama():
+    with FakeOllamaServer(dimension=DIMENSION) as server:
+        yield server
+
+
+def make_engine(server, **options):
+    options.setdefault("backoff_seconds", 0.01)
+    options.setdefault("progress", None)
+    return BatchEmbeddingEngine(SafeOllamaEmbeddings(model="llama3", base_url=server.url), **options)
+
+
+def test_results_are_reassembled_in_input_order(ollama):
+    texts = [f"chunk {i}" for i in range(50)]
+    vectors = make_engine(ollama, batch_size=7, max_concurrency=4).embed_documents(texts)
+    expected = [fake_embedding(text, DIMENSION) for text in texts]
+    np.testing.assert_allclose(vectors, expected, rtol=1e-6)
+    assert ollama.stats()["requests"] == 8
+
+
+def test_concurrent_batches_overlap(ollama):
+    ollama.latency = 0.2
+    engine = make_engine(ollama, batch_size=10, max_concurrency=4)
+    started = time.perf_counter()
+    engine.embed_documents([f"chunk {i}" for i in range(80)])
+    elapsed = time.perf_counter() - started
+    assert ollama.stats()["max_in_flight"] == 4
+    # 8 batches sequentially would take 1.6s
+    assert elapsed < 1.0
+    assert engine.stats()["chunks_per_second"] > 0
+
+
+def test_transient_failures_are_retried(ollama):
+    ollama.fail_first = 2
+    engine = make_engine(ollama, batch_size=10, max_concurrency=1)
+    vectors = engine.embed_documents(["a", "b"])
+    assert len(vectors) == 2
+    assert engine.stats()["retries"] == 2
+
+
+def test_persistent_failure_is_raised(ollama):
+    ollama.error_rate = 1.0
+    engine = make_engine(ollama, max_retries=2)
+    with pytest.raises(Exception):
+        engine.embed_documents(["a"])
+    assert ollama.stats()["requests"] == 3
+
+
+def test_non_retryable_errors_fail_fast(ollama):
+    ollama.fail_first = 1
+    ollama.error_status = 400
+    engine = make_engine(ollama, max_retries=3)
+    with pytest.raises(Exception):
+        engine.embed_documents(["a"])
+    assert ollama.stats()["requests"] == 1
+
+
+def test_progress_is_reported(ollama):
+    reports = []
+    engine = make_engine(ollama, batch_size=5, progress=lambda done, total, elapsed: reports.append((done, total)))
+    engine.embed_documents([str(i) for i in range(12)])
+    assert reports[-1] == (12, 12)
+
+
+@pytest.mark.asyncio
+async def test_async_embedding_is_bounded_and_ordered(ollama):
+    ollama.latency = 0.05
+    texts = [f"chunk {i}" for i in range(30)]
+    vectors = await make_engine(ollama, batch_size=5, max_concurrency=2).aembed_documents(texts)
+    np.testing.assert_allclose(vectors, [fake_embedding(text, DIMENSION) for text in texts], rtol=1e-6)
+    assert ollama.stats()["max_in_flight"] <= 2
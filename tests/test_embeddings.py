@@ -0,0 +1,85 @@
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.core.embeddings import EmbeddingStore, MemoizedEmbeddings, normalize_query
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def _vector(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return self._vector(text)
+
+
+def test_normalize_query_ignores_case_and_whitespace():
+    assert normalize_query("  K8s   Experience?\n") == "k8s experience?"
+
+
+def test_normalized_duplicate_queries_embed_once():
+    backend = CountingEmbeddings()
+    embeddings = MemoizedEmbeddings(backend, namespace="llama3@http://ollama")
+    first = embeddings.embed_query("What Kubernetes experience?")
+    second = embeddings.embed_query("what  kubernetes experience?")
+    assert first == second
+    # The cache is keyed on the normalised query, the first spelling is embedded
+    assert backend.embedded == ["What Kubernetes experience?"]
+    stats = embeddings.stats()
+    assert stats["embeddings_saved"] == 1
+    assert stats["backend_calls"] == 1
+
+
+def test_queries_and_documents_do_not_share_keys():
+    backend = CountingEmbeddings()
+    embeddings = MemoizedEmbeddings(backend, namespace="ns")
+    embeddings.embed_query("flux")
+    embeddings.embed_documents(["flux"])
+    assert backend.embedded == ["flux", "flux"]
+
+
+def test_documents_only_embed_unseen_texts():
+    backend = CountingEmbeddings()
+    embeddings = MemoizedEmbeddings(backend, namespace="ns")
+    embeddings.embed_documents(["a", "b"])
+    vectors = embeddings.embed_documents(["b", "c", "c"])
+    assert backend.embedded == ["a", "b", "c"]
+    assert len(vectors) == 3
+    assert vectors[1] == vectors[2]
+
+
+def test_lru_is_bounded():
+    embeddings = MemoizedEmbeddings(CountingEmbeddings(), namespace="ns", max_entries=2)
+    embeddings.embed_documents(["a", "b", "c"])
+    assert embeddings.stats()["memory_entries"] == 2
+
+
+def test_persistent_store_is_shared_across_instances(tmp_path):
+    path = tmp_path / "embedding_cache.sqlite"
+    MemoizedEmbeddings(CountingEmbeddings(), namespace="ns", store=EmbeddingStore(path)).embed_documents(["chunk"])
+
+    backend = CountingEmbeddings()
+    embeddings = MemoizedEmbeddings(backend, namespace="ns", store=EmbeddingStore(path))
+    embeddings.embed_documents(["chunk"])
+    assert backend.embedded == []
+    assert embeddings.stats()["store_hits"] == 1
+
+    other_model = MemoizedEmbeddings(backend, namespace="other", store=EmbeddingStore(path))
+    other_model.embed_documents(["chunk"])
+    assert backend.embedded == ["chunk"]
+
+
+@pytest.mark.asyncio
+async def test_async_query_uses_cache():
+    backend = CountingEmbeddings()
+    embeddings = MemoizedEmbeddings(backend, namespace="ns")
+    await embeddings.aembed_query("Flux")
+    await embeddings.aembed_query("flux")
+    assert backend.embedded == ["Flux"]
@@ -0,0 +1,147 @@
+import shutil
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from src.core.compact_store import CompactVectorStore
+from src.core.embeddings import MemoizedEmbeddings
+from src.core.lexical_index import LEXICAL_INDEX_FILE, BM25Index, lexical_index_matches
+from src.core.shards import ShardSet
+from src.scripts import ingest_data
+
+
+class CountingFakeEmbeddings(DeterministicFakeEmbedding):
+    embedded: list = []
+
+    def embed_documents(self, texts):
+        CountingFakeEmbeddings.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def use_checkout(root, monkeypatch):
+    vectorstore = root / "data" / "vectorstore"
+    monkeypatch.setattr(ingest_data, "BASE_DIR", root)
+    monkeypatch.setattr(ingest_data, "CV_DIR", root / "data" / "cv")
+    monkeypatch.setattr(ingest_data, "SKILLS_DIR", root / "data" / "skills_md")
+    monkeypatch.setattr(ingest_data, "VECTORSTORE_DIR", vectorstore)
+    monkeypatch.setattr(ingest_data, "MANIFEST_PATH", vectorstore / "ingest_manifest.json")
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    skills = tmp_path / "data" / "skills_md" / "pages"
+    skills.mkdir(parents=True)
+    use_checkout(tmp_path, monkeypatch)
+    monkeypatch.setattr(ingest_data, "get_embeddings", lambda *args: MemoizedEmbeddings(CountingFakeEmbeddings(size=8), namespace="test"))
+    CountingFakeEmbeddings.embedded = []
+    for name in ["flux", "podman", "terraform"]:
+        (skills / f"{name}.md").write_text(f"# {name}\n\n## Usage\n\n{name} usage notes.\n\n## Tips\n\n{name} tips.\n")
+    return skills
+
+
+def index_size():
+    store = ingest_data.load_vector_store(DeterministicFakeEmbedding(size=8))
+    assert store.index.ntotal == len(store.docstore._dict)
+    return store.index.ntotal
+
+
+def test_first_run_embeds_everything(corpus):
+    report = ingest_data.ingest()
+    assert report["files_added"] == 3
+    assert report["chunks_added"] == len(CountingFakeEmbeddings.embedded) == index_size()
+
+
+def test_rerun_without_changes_embeds_nothing(corpus):
+    first = ingest_data.ingest()
+    CountingFakeEmbeddings.embedded = []
+    report = ingest_data.ingest()
+    assert CountingFakeEmbeddings.embedded == []
+    assert report["files_unchanged"] == 3
+    assert report["chunks_reused"] == first["chunks_added"]
+
+
+def test_moved_checkout_reuses_unchanged_chunks_of_edited_files(corpus, tmp_path, monkeypatch):
+    ingest_data.ingest()
+    moved = tmp_path / "moved"
+    shutil.copytree(tmp_path / "data", moved / "data")
+    use_checkout(moved, monkeypatch)
+    (moved / "data" / "skills_md" / "pages" / "flux.md").write_text("# flux\n\n## Usage\n\nflux usage notes.\n\n## Tips\n\nnew flux tips.\n")
+    CountingFakeEmbeddings.embedded = []
+    report = ingest_data.ingest()
+    assert len(CountingFakeEmbeddings.embedded) == 1
+    assert report["files_changed"] == 1
+
+
+def test_edit_and_removal_only_touch_affected_chunks(corpus):
+    first = ingest_data.ingest()
+    (corpus / "flux.md").write_text("# flux\n\n## Usage\n\nflux usage notes.\n\n## Tips\n\nnew flux tips.\n")
+    (corpus / "podman.md").unlink()
+    CountingFakeEmbeddings.embedded = []
+
+    report = ingest_data.ingest()
+    assert report["files_changed"] == 1
+    assert report["files_removed"] == 1
+    assert CountingFakeEmbeddings.embedded == ["new flux tips."]
+    assert report["chunks_added"] == 1
+    # the old flux tip plus both podman chunks
+    assert report["chunks_deleted"] == 3
+    assert index_size() == first["chunks_added"] - 2
+
+
+def test_full_flag_rebuilds_everything(corpus):
+    first = ingest_data.ingest()
+    CountingFakeEmbeddings.embedded = []
+    report = ingest_data.ingest(full=True)
+    assert report["chunks_added"] == first["chunks_added"]
+    assert index_size() == first["chunks_added"]
+
+
+def test_compact_index_is_kept_in_sync(corpus):
+    ingest_data.ingest(compact=True)
+    compact_dir = ingest_data.VECTORSTORE_DIR / "compact_index"
+    assert len(CompactVectorStore.load(compact_dir)) == index_size()
+
+    (corpus / "terraform.md").unlink()
+    ingest_data.ingest()
+    assert len(CompactVectorStore.load(compact_dir)) == index_size()
+
+
+def test_lexical_index_follows_the_vector_store(corpus):
+    ingest_data.ingest()
+    (corpus / "podman.md").unlink()
+    ingest_data.ingest()
+    lexical_index = BM25Index.load(ingest_data.VECTORSTORE_DIR / LEXICAL_INDEX_FILE)
+    assert lexical_index_matches(lexical_index, ingest_data.load_vector_store(DeterministicFakeEmbedding(size=8)))
+    assert lexical_index.search("podman") == []
+
+
+def test_shards_are_written(corpus):
+    ingest_data.ingest()
+    shard_set = ShardSet.load(ingest_data.VECTORSTORE_DIR / "shards")
+    assert len(shard_set) == index_size()
+    assert shard_set.matches(ingest_data.load_vector_store(DeterministicFakeEmbedding(size=8)))
+
+
+def test_near_duplicate_chunks_are_not_embedded(corpus):
+    (corpus / "flux2.md").write_text((corpus / "flux.md").read_text().replace("notes.", "notes"))
+    report = ingest_data.ingest()
+    assert (report["chunks_added"], report["chunks_duplicate"]) == (6, 2)
+    assert not any("flux2" in text for text in CountingFakeEmbeddings.embedded)
+
+    store = ingest_data.load_vector_store(DeterministicFakeEmbedding(size=8))
+    provenance = [doc.metadata.get("duplicate_sources") for doc in store.docstore._dict.values()]
+    assert ["data/skills_md/pages/flux2.md"] in provenance
+
+
+def test_copy_is_embedded_once_the_original_is_removed(corpus):
+    (corpus / "flux2.md").write_text((corpus / "flux.md").read_text())
+    first = ingest_data.ingest()
+    (corpus / "flux.md").unlink()
+    CountingFakeEmbeddings.embedded = []
+
+    report = ingest_data.ingest()
+    assert report["files_rechecked"] == 1
+    assert report["chunks_added"] == first["chunks_duplicate"]
+    assert index_size() == first["chunks_added"]
+    store = ingest_data.load_vector_store(DeterministicFakeEmbedding(size=8))
+    assert not any(doc.metadata.get("duplicate_sources") for doc in store.docstore._dict.values())
@@ -0,0 +1,94 @@
+import pytest
+
+from src.core import rag_pipeline
+from src.core.cv_document import CVDocument
+from src.core.intent_router import EXPERIENCE, FULL_CV, RAG, SECTION, IntentRouter, Route
+from src.core.tracing import RequestTrace, traced
+
+CV = """# Jane Doe
+
+## Professional Experience
+
+### SRE | Acme | London, UK | 2020 – Present
+
+- Ran Kubernetes.
+
+## Languages
+
+- English
+
+## Interests *(Optional)*
+
+Music.
+"""
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("Can I see your CV?", Route(FULL_CV, matched="cv")),
+    ("Please download the full Resume", Route(FULL_CV, matched="resume")),
+    ("Show me your curriculum vitae and all roles", Route(FULL_CV, matched="curriculum vitae")),
+    ("List all professional experience", Route(EXPERIENCE, matched="professional experience")),
+    ("What is your work history?", Route(EXPERIENCE, matched="work history")),
+    ("Show me your languages", Route(SECTION, "Languages", "languages")),
+    ("What are your core competencies?", Route(SECTION, "Core Competencies & Technical Skills", "core competencies")),
+    ("Any hobbies?", Route(SECTION, "Interests", "hobbies")),
+    ("What Kubernetes experience do you have?", Route(RAG)),
+    ("Which programming languages do you use?", Route(RAG)),
+    ("Give me a summary of your Azure work", Route(RAG)),
+    ("Describe the cvss scoring in your pipelines", Route(RAG)),
+    ("Languages?", Route(SECTION, "Languages", "languages")),
+    ("What technical skills does he have?", Route(SECTION, "Core Competencies & Technical Skills", "technical skills")),
+    ("Show me your hobbies, interests and languages please", Route(SECTION, "Interests", "hobbies")),
+    ("What professional experience does he have with Terraform?", Route(RAG)),
+    ("Which technical skills in Kubernetes does he have?", Route(RAG)),
+    ("What languages does he program in?", Route(RAG)),
+    ("Show me your programming languages", Route(RAG)),
+])
+def test_classify(question, expected):
+    assert IntentRouter().classify(question) == expected
+
+
+def test_route_records_decisions():
+    router = IntentRouter()
+    router.route("Show me your CV")
+    router.route("Show me your languages")
+    router.route("How do you use Terraform?")
+    router.route("Explain GitOps")
+    stats = router.stats()
+    assert stats["decisions"] == {FULL_CV: 1, EXPERIENCE: 0, SECTION: 1, RAG: 2}
+    assert stats["served_from_cv"] == 0.5
+    assert stats["mean_us"] > 0
+
+
+def test_route_annotates_the_trace_without_printing(capsys):
+    trace = RequestTrace("POST", "/api/ask")
+    with traced(trace):
+        IntentRouter().route("Show me your languages")
+    assert trace.attributes["route"] == SECTION
+    assert trace.attributes["section"] == "Languages"
+    assert trace.attributes["router_us"] >= 0
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.asyncio
+async def test_section_questions_skip_the_rag_chain(tmp_path, monkeypatch):
+    path = tmp_path / "cv.md"
+    path.write_text(CV, encoding="utf-8")
+    monkeypatch.setattr(rag_pipeline, "cv_document", CVDocument(path))
+    monkeypatch.setattr(rag_pipeline, "intent_router", IntentRouter())
+
+    def no_chain():
+        raise AssertionError("the RAG chain must not be used")
+
+    monkeypatch.setattr(rag_pipeline.chain_manager, "get_chain", no_chain)
+    monkeypatch.setattr(rag_pipeline.chain_manager, "aget_chain", no_chain)
+
+    result = rag_pipeline.answer_question("Show me your languages")
+    assert (result["success"], result["answer"]) == (True, "## Languages\n- English")
+    result = await rag_pipeline.answer_question_async("List all professional experience")
+    assert result["answer"].startswith("## Professional Experience\n\n### SRE | Acme")
+    events = [event async for event in rag_pipeline.astream_answer("Send me your resume")]
+    assert events[0] == {"type": "token", "text": CV}
+    assert events[-1]["source"] == "cv"
+    assert await rag_pipeline.generate_response("Any hobbies?") == "## Interests\n*(Optional)*\n\nMusic."
+    assert rag_pipeline.intent_router.stats()["decisions"] == {FULL_CV: 1, EXPERIENCE: 1, SECTION: 2, RAG: 0}
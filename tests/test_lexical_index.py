@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+
+from src.core.compact_store import CompactVectorStore, convert_faiss_store
+from src.core.lexical_index import (
+    BM25Index,
+    hybrid_search,
+    lexical_index_matches,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+TEXTS = [
+    "Flux reconciles Kubernetes clusters from Git repositories.",
+    "Podman runs rootless containers without a daemon.",
+    "OpenShift is Red Hat's Kubernetes distribution.",
+    "Terraform provisions Azure and AWS infrastructure.",
+    "Worked as a DevOps engineer on Kubernetes platforms.",
+]
+
+
+@pytest.fixture
+def faiss_store():
+    return FAISS.from_texts(TEXTS, DeterministicFakeEmbedding(size=16))
+
+
+def index_for(store):
+    ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+    return BM25Index.from_documents([store.docstore.search(i) for i in ids], ids=ids)
+
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("What is the Flux-CD setup?") == ["flux", "cd", "setup"]
+
+
+def test_bm25_ranks_exact_terms_first():
+    index = BM25Index.from_documents([Document(page_content=text) for text in TEXTS])
+    assert index.search("podman", k=3)[0][0] == 1
+    assert [position for position, _ in index.search("kubernetes openshift", k=5)][0] == 2
+    assert index.search("nixos") == []
+
+
+def test_bm25_search_is_fast():
+    docs = [Document(page_content=f"{TEXTS[i % 5]} chunk {i}") for i in range(5000)]
+    index = BM25Index.from_documents(docs)
+    started = time.perf_counter()
+    for _ in range(100):
+        index.search("podman rootless containers", k=20)
+    assert (time.perf_counter() - started) / 100 < 0.005
+
+
+def test_save_and_load_round_trip(faiss_store, tmp_path):
+    index = index_for(faiss_store)
+    index.save(tmp_path / "bm25_index.npz")
+    loaded = BM25Index.load(tmp_path / "bm25_index.npz")
+    assert loaded.search("terraform azure") == index.search("terraform azure")
+    assert lexical_index_matches(loaded, faiss_store)
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+    assert [key for key, _ in fused] == ["a", "c", "b"]
+
+
+def test_hybrid_search_adds_lexical_hits(faiss_store, tmp_path):
+    index = index_for(faiss_store)
+    query = faiss_store.embeddings.embed_query("unrelated")
+    vector_only, _ = hybrid_search(faiss_store, None, "Podman", query, k=1, lexical_k=1)
+    assert "Podman" not in vector_only[0][0].page_content
+
+    for store in (faiss_store, CompactVectorStore.load(convert_faiss_store(faiss_store, tmp_path / "c"), faiss_store.embeddings)):
+        candidates, relevance = hybrid_search(store, index, "Podman", query, k=1, lexical_k=1)
+        assert any("Podman" in doc.page_content for doc, _ in candidates)
+        assert relevance[0] == 1.0 and len(relevance) == len(candidates)
+
+
+def test_stale_index_is_detected(faiss_store):
+    index = index_for(faiss_store)
+    faiss_store.add_texts(["Ansible playbooks"])
+    assert not lexical_index_matches(index, faiss_store)
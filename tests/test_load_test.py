@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from langchain_ollama import OllamaLLM
+
+from src.api import main as api_main
+from src.core import rag_pipeline
+from src.core.rag_pipeline import RAGChainManager
+from src.core.single_flight import SingleFlight, StreamFlight
+from src.scripts.fake_ollama import FakeOllamaServer, fake_tokens
+from src.scripts.load_test import load_corpus, run_load
+
+
+def test_fake_generate_streams_at_configured_speed():
+    with FakeOllamaServer(tokens_per_second=200, response_tokens=10) as server:
+        llm = OllamaLLM(model="llama3", base_url=server.url)
+        assert "".join(llm.stream("Hello")) == "".join(fake_tokens(10))
+        reply = httpx.post(f"{server.url}/api/generate", json={"model": "llama3", "prompt": "Hi", "stream": False}).json()
+        assert reply["response"] == "".join(fake_tokens(10))
+        assert reply["done"] and reply["eval_count"] == 10
+        assert reply["eval_duration"] >= 10 / 200 * 1e9 * 0.9
+        assert server.stats()["tokens_generated"] == 20
+
+
+def test_fake_generate_injects_errors():
+    with FakeOllamaServer(fail_first=1) as server:
+        failed = httpx.post(f"{server.url}/api/generate", json={"model": "llama3", "prompt": "Hi"})
+        ok = httpx.post(f"{server.url}/api/generate", json={"model": "llama3", "prompt": "Hi", "stream": False})
+    assert failed.status_code == 503
+    assert ok.status_code == 200
+
+
+def test_load_corpus_accepts_common_fields(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(json.dumps(r) for r in [{"query": "a"}, {"title": "b", "body": "x"}, {"id": 3}]) + "\n")
+    assert load_corpus(corpus) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_run_load_reports_latency_and_errors():
+    app = FastAPI()
+    seen = []
+
+    @app.post("/api/ask")
+    async def ask(body: dict):
+        seen.append(body["query"])
+        await asyncio.sleep(0.01)
+        if body["query"] == "bad":
+            return JSONResponse({"status": "error", "message": "boom"})
+        return JSONResponse({"status": "success", "data": {"answer": "ok"}})
+
+    @app.post("/api/tts")
+    async def tts(body: dict):
+        return JSONResponse({"detail": "busy"}, status_code=503)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        report = await run_load(client, ["good", "bad"], ["ask", "ask", "tts"], rps=100, total=6)
+
+    assert sorted(seen) == ["bad", "bad", "good", "good"]
+    assert report["overall"]["requests"] == 6
+    assert report["overall"]["errors"] == {"api_error": 2, "http_503": 2}
+    assert report["endpoints"]["ask"]["succeeded"] == 2
+    assert report["endpoints"]["ask"]["latency_ms"]["p50"] >= 10
+    assert report["endpoints"]["tts"]["error_rate"] == 1.0
+
+
+class FailingChain:
+    async def ainvoke(self, inputs):
+        raise RuntimeError("model not found")
+
+    async def astream(self, inputs):
+        raise RuntimeError("model not found")
+        yield
+
+
+@pytest.fixture
+def failing_app(monkeypatch):
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", lambda vectorstore_dir=None: object())
+    monkeypatch.setattr(rag_pipeline, "create_rag_chain", lambda vector_store=None: FailingChain())
+    monkeypatch.setattr(rag_pipeline, "chain_manager", RAGChainManager())
+    monkeypatch.setattr(rag_pipeline, "answer_flights", SingleFlight())
+    monkeypatch.setattr(rag_pipeline, "stream_flights", StreamFlight())
+    return api_main.app
+
+
+@pytest.mark.asyncio
+async def test_chat_errors_answered_with_200_count_as_failed(failing_app):
+    async with AsyncClient(transport=ASGITransport(app=failing_app), base_url="http://test") as client:
+        report = await run_load(client, ["What about Helm?"], ["chat"], rps=100, total=2)
+    assert report["overall"]["errors"] == {"api_error": 2}
+
+
+@pytest.mark.asyncio
+async def test_stream_error_events_count_as_failed(failing_app):
+    async with AsyncClient(transport=ASGITransport(app=failing_app), base_url="http://test") as client:
+        report = await run_load(client, ["What about Helm?"], ["stream"], rps=100, total=2)
+    assert report["overall"]["errors"] == {"stream_error": 2}
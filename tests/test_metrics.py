@@ -0,0 +1,79 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+
+from src.api.main import app
+from src.core import metrics, rag_pipeline
+from src.core.lexical_index import BM25Index
+from src.scripts.fake_ollama import FakeOllamaServer
+
+
+def test_render_exposition_format():
+    registry = metrics.MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requests.", ["route"])
+    latency = registry.histogram("app_latency_seconds", "Latency.", buckets=(0.1, 1))
+    registry.callback_gauge("app_ratio", "Ratio.", lambda: 0.25)
+    registry.callback_gauge("app_broken", "Broken.", lambda: 1 / 0)
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+
+    text = registry.render()
+    assert 'app_requests_total{route="/a\\"b"} 3' in text
+    assert 'app_latency_seconds_bucket{le="0.1"} 1\n' in text
+    assert 'app_latency_seconds_bucket{le="1"} 2\n' in text
+    assert 'app_latency_seconds_bucket{le="+Inf"} 3\n' in text
+    assert "app_latency_seconds_count 3\n" in text
+    assert "app_ratio 0.25\n" in text
+    assert "# TYPE app_broken gauge\n" in text
+    assert registry.counter("app_requests_total", "Again.", ["route"]) is requests
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+
+
+def test_chain_stages_are_measured(monkeypatch, tmp_path):
+    monkeypatch.setattr(rag_pipeline, "SHARDS_DIR", tmp_path / "shards")
+    docs = [Document(page_content=f"{name} experience in production", metadata={"source": f"{name}.md"}) for name in ["Flux", "Terraform", "Kubernetes"]]
+    store = FAISS.from_documents(docs, DeterministicFakeEmbedding(size=16))
+    ids = [store.index_to_docstore_id[i] for i in range(len(docs))]
+    lexical_index = BM25Index.from_documents(docs, ids)
+    before = {
+        metric: metric.count()
+        for metric in (
+            metrics.QUERY_EMBEDDING_SECONDS, metrics.SEARCH_SECONDS, metrics.CONTEXT_PACKING_SECONDS,
+            metrics.CONTEXT_FORMAT_SECONDS, metrics.LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+            metrics.LLM_GENERATION_SECONDS, metrics.PROMPT_CHUNKS, metrics.COMPLETION_TOKENS,
+        )
+    }
+    with FakeOllamaServer(response_tokens=12) as server:
+        monkeypatch.setenv("OLLAMA_BASE_URL", server.url)
+        chain = rag_pipeline.create_rag_chain(store, lexical_index=lexical_index)
+        answer = chain.invoke({"question": "Flux experience"})
+
+    assert answer
+    for metric, count in before.items():
+        assert metric.count() == count + 1, metric.name
+    assert metrics.LLM_IN_FLIGHT.value() == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_requests_per_route():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        await ac.get("/health")
+        await ac.get("/no/such/page")
+        await ac.get("/api/tts/audio/" + "0" * 64)
+        await ac.get("/api/tts/audio/audio")
+        response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{route="/health",method="GET",status="200"}' in text
+    assert 'http_requests_total{route="unmatched",method="GET",status="404"}' in text
+    assert 'http_requests_total{route="/api/tts/audio/{key}",method="GET",status="404"}' in text
+    assert 'route="/api/tts/{key}' not in text
+    assert "http_requests_in_flight 1\n" in text
+    for name in ("rag_llm_time_to_first_token_seconds", "tts_synthesis_seconds", "rag_answer_cache_hit_ratio", "tts_queue_depth"):
+        assert f"# TYPE {name} " in text
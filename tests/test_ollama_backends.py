@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_ollama import OllamaLLM
+
+from src.core import ollama_backends, ollama_http
+from src.core.embedding_engine import BatchEmbeddingEngine
+from src.core.embeddings import SafeOllamaEmbeddings
+from src.core.ollama_backends import BackendPool
+from src.core.ollama_http import OllamaHTTPPool
+from src.scripts import ingest_data
+from src.scripts.fake_ollama import FakeOllamaServer
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def servers():
+    with FakeOllamaServer(dimension=DIMENSION) as first, FakeOllamaServer(dimension=DIMENSION) as second:
+        yield first, second
+
+
+def dead_url():
+    with FakeOllamaServer() as server:
+        return server.url
+
+
+def make_pool(urls, **options):
+    options.setdefault("retry_backoff", 0.0)
+    return OllamaHTTPPool(backends=BackendPool(urls, probe_interval=60.0, probe_timeout=1.0), **options)
+
+
+def embeddings_for(pool):
+    return SafeOllamaEmbeddings(model="llama3", base_url=pool.backends.url, **pool.client_options())
+
+
+def test_idle_backends_take_turns(servers):
+    pool = make_pool([server.url for server in servers])
+    embeddings = embeddings_for(pool)
+    for i in range(6):
+        embeddings.embed_query(f"question {i}")
+    assert [server.stats()["requests"] for server in servers] == [3, 3]
+    assert [backend.in_flight for backend in pool.backends.backends] == [0, 0]
+
+
+def test_requests_go_to_the_least_busy_backend(servers):
+    first, second = servers
+    first.latency = 0.5
+    pool = make_pool([first.url, second.url])
+    embeddings = embeddings_for(pool)
+    slow = threading.Thread(target=embeddings.embed_query, args=("slow question",))
+    slow.start()
+    while pool.backends.backends[0].in_flight == 0:
+        time.sleep(0.001)
+    for i in range(4):
+        embeddings.embed_query(f"question {i}")
+    slow.join()
+    assert first.stats()["requests"] == 1
+    assert second.stats()["requests"] == 4
+
+
+def test_streamed_generation_keeps_its_backend_busy_until_done(servers):
+    first, second = servers
+    pool = make_pool([first.url, second.url])
+    llm = OllamaLLM(model="llama3", base_url=pool.backends.url, **pool.client_options())
+    stream = llm.stream("question")
+    next(stream)
+    assert sum(backend.in_flight for backend in pool.backends.backends) == 1
+    list(stream)
+    assert sum(backend.in_flight for backend in pool.backends.backends) == 0
+
+
+def test_unreachable_backend_fails_over_and_is_ejected(servers):
+    first, _ = servers
+    pool = make_pool([dead_url(), first.url])
+    # Generations fail over too: a refused connection never reached a model
+    llm = OllamaLLM(model="llama3", base_url=pool.backends.url, **pool.client_options())
+    assert llm.invoke("question")
+    dead = pool.backends.backends[0]
+    assert not dead.healthy
+    assert dead.failures == 1
+    embeddings_for(pool).embed_query("question")
+    assert dead.requests == 1
+    assert first.stats()["requests"] == 2
+    assert pool.backends.stats()["failovers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_calls_fail_over(servers):
+    first, _ = servers
+    pool = make_pool([dead_url(), first.url])
+    embeddings = embeddings_for(pool)
+    vectors = await asyncio.gather(*(embeddings.aembed_query(f"question {i}") for i in range(3)))
+    assert all(len(vector) == DIMENSION for vector in vectors)
+    assert first.stats()["requests"] == 3
+    assert sum(backend.in_flight for backend in pool.backends.backends) == 0
+
+
+def test_overloaded_backend_embedding_is_retried_elsewhere(servers):
+    first, second = servers
+    first.fail_first = 1
+    pool = make_pool([first.url, second.url])
+    embeddings_for(pool).embed_query("question")
+    assert second.stats()["texts_embedded"] == 1
+    # An overloaded backend is not ejected, it only failed one request
+    assert all(backend.healthy for backend in pool.backends.backends)
+
+
+def test_overloaded_backend_generation_is_not_retried(servers):
+    first, second = servers
+    first.fail_first = 1
+    pool = make_pool([first.url, second.url])
+    llm = OllamaLLM(model="llama3", base_url=pool.backends.url, **pool.client_options())
+    with pytest.raises(Exception):
+        llm.invoke("question")
+    assert second.stats()["requests"] == 0
+
+
+def test_probe_ejects_and_readmits(servers):
+    first, second = servers
+    pool = make_pool([first.url, second.url])
+    assert pool.backends.probe() == 2
+    host, port = second._httpd.server_address[:2]
+    second.stop()
+    assert pool.backends.probe() == 1
+    embeddings = embeddings_for(pool)
+    for i in range(3):
+        embeddings.embed_query(f"question {i}")
+    assert first.stats()["requests"] == 3
+    with FakeOllamaServer(host=host, port=port, dimension=DIMENSION) as restarted:
+        assert pool.backends.probe() == 2
+        embeddings.embed_query("another question")
+        assert restarted.stats()["requests"] == 1
+
+
+def test_background_probes(servers):
+    first, _ = servers
+    pool = make_pool([first.url, dead_url()])
+    pool.backends.probe_interval = 0.05
+    pool.backends.start()
+    try:
+        while pool.backends.probes < 2:
+            time.sleep(0.01)
+    finally:
+        pool.backends.stop()
+    assert [backend.healthy for backend in pool.backends.backends] == [True, False]
+
+
+def test_requests_to_other_hosts_are_not_routed(servers):
+    first, second = servers
+    pool = make_pool([first.url])
+    SafeOllamaEmbeddings(model="llama3", base_url=second.url, **pool.client_options()).embed_query("question")
+    assert second.stats()["requests"] == 1
+    assert first.stats()["requests"] == 0
+
+
+def test_ingestion_batches_spread_over_backends(servers):
+    pool = make_pool([server.url for server in servers])
+    for server in servers:
+        server.latency = 0.05
+    engine = BatchEmbeddingEngine(embeddings_for(pool), batch_size=4, max_concurrency=4, progress=None)
+    engine.embed_documents([f"chunk {i}" for i in range(64)])
+    embedded = [server.stats()["texts_embedded"] for server in servers]
+    assert sum(embedded) == 64
+    assert min(embedded) >= 16
+
+
+def test_get_embeddings_scales_concurrency_with_healthy_backends(servers, monkeypatch, tmp_path):
+    monkeypatch.setattr(ollama_http, "pool", make_pool([server.url for server in servers] + [dead_url()]))
+    monkeypatch.setenv("INGEST_EMBED_CONCURRENCY", "3")
+    monkeypatch.setenv("RAG_EMBEDDING_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    embeddings = ingest_data.get_embeddings()
+    assert embeddings.embeddings.max_concurrency == 6
+
+
+def test_configuration_from_env(monkeypatch):
+    monkeypatch.delenv("OLLAMA_BASE_URLS", raising=False)
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://ollama:11434/")
+    assert ollama_backends.configured_urls() == ["http://ollama:11434"]
+    assert BackendPool.from_env() is None
+    monkeypatch.setenv("OLLAMA_BASE_URLS", "http://a:11434, http://b:11434,")
+    assert ollama_backends.base_url() == "http://a:11434"
+    backends = BackendPool.from_env()
+    assert [backend.url for backend in backends.backends] == ["http://a:11434", "http://b:11434"]
+    assert OllamaHTTPPool.from_env().backends is not None
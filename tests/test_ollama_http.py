@@ -0,0 +1,189 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from langchain_ollama import OllamaLLM
+from ollama import ResponseError
+
+from src.core import metrics, ollama_http, rag_pipeline  # noqa: F401 - registers the pool gauges
+from src.core.embeddings import SafeOllamaEmbeddings, create_embeddings
+from src.core.ollama_http import OllamaHTTPPool
+from src.scripts.benchmark_ollama_http import run
+from src.scripts.fake_ollama import FakeOllamaServer
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def ollama():
+    with FakeOllamaServer(dimension=DIMENSION) as server:
+        yield server
+
+
+@pytest.fixture
+def pool():
+    pool = OllamaHTTPPool(retry_backoff=0.0)
+    yield pool
+    pool.close()
+
+
+def pooled_embeddings(server, pool):
+    return SafeOllamaEmbeddings(model="llama3", base_url=server.url, **pool.client_options())
+
+
+def test_rebuilt_clients_share_one_connection(ollama, pool):
+    for i in range(5):
+        pooled_embeddings(ollama, pool).embed_query(f"question {i}")
+    assert ollama.stats()["connections"] == 1
+    stats = pool.stats()
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_idle"] == 1
+    assert stats["connection_reuse_ratio"] == pytest.approx(0.8)
+
+
+@pytest.mark.asyncio
+async def test_async_requests_reuse_connections(ollama, pool):
+    embeddings = pooled_embeddings(ollama, pool)
+    for i in range(3):
+        await embeddings.aembed_query(f"question {i}")
+    await asyncio.gather(*(embeddings.aembed_query(f"other {i}") for i in range(4)))
+    assert pool.stats()["requests"] == 7
+    assert ollama.stats()["connections"] <= 4
+
+
+def test_embedding_calls_are_retried(ollama, pool):
+    ollama.fail_first = 2
+    assert len(pooled_embeddings(ollama, pool).embed_query("question")) == DIMENSION
+    assert pool.stats()["retries"] == 2
+    assert ollama.stats()["requests"] == 3
+
+
+def test_retries_give_up_after_the_limit(ollama, pool):
+    ollama.fail_first = 5
+    with pytest.raises(ResponseError):
+        pooled_embeddings(ollama, pool).embed_query("question")
+    assert ollama.stats()["requests"] == pool.retries + 1
+
+
+def test_generations_are_not_retried(ollama, pool):
+    ollama.fail_first = 1
+    llm = OllamaLLM(model="llama3", base_url=ollama.url, **pool.client_options())
+    with pytest.raises(ResponseError):
+        llm.invoke("question")
+    assert ollama.stats()["requests"] == 1
+    assert pool.stats()["retries"] == 0
+
+
+def test_connection_errors_are_retried_then_raised(pool):
+    with FakeOllamaServer() as server:
+        url = server.url
+    embeddings = SafeOllamaEmbeddings(model="llama3", base_url=url, **pool.client_options())
+    with pytest.raises(ConnectionError):
+        embeddings.embed_query("question")
+    stats = pool.stats()
+    assert stats["retries"] == pool.retries
+    assert stats["failures"] == 1
+
+
+def test_closing_a_client_keeps_the_pool_open(ollama, pool):
+    embeddings = pooled_embeddings(ollama, pool)
+    embeddings.embed_query("question")
+    embeddings._client.close()
+    pooled_embeddings(ollama, pool).embed_query("question")
+    assert ollama.stats()["connections"] == 1
+
+
+def test_pool_reopens_after_close(ollama, pool):
+    pooled_embeddings(ollama, pool).embed_query("question")
+    pool.close()
+    assert pool.stats()["connections_open"] == 0
+    pooled_embeddings(ollama, pool).embed_query("question")
+    assert ollama.stats()["connections"] == 2
+
+
+
+def test_close_closes_async_pools_on_their_loops(ollama, pool):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        embeddings = pooled_embeddings(ollama, pool)
+        asyncio.run_coroutine_threadsafe(embeddings.aembed_query("question"), loop).result()
+        connections = pool._async[loop]._pool.connections
+        assert len(connections) == 1
+        pool.close()
+        # Let the loop run the scheduled close
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result()
+        assert connections[0].is_closed()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_close_keeps_the_current_loops_pool_until_aclose(ollama, pool):
+    await pooled_embeddings(ollama, pool).aembed_query("question")
+    pool.close()
+    assert pool.stats()["connections_open"] == 1
+    await pool.aclose()
+    assert pool.stats()["connections_open"] == 0
+
+
+def test_stats_without_httpx_connection_internals(pool, monkeypatch):
+    # A transport that does not expose its connections, as a future httpx might not
+    pool._sync = httpx.MockTransport(lambda request: httpx.Response(200, json={"embeddings": [[0.0] * DIMENSION]}))
+    SafeOllamaEmbeddings(model="llama3", base_url="http://ollama:11434", **pool.client_options()).embed_query("question")
+    stats = pool.stats()
+    assert stats["requests"] == 1
+    assert stats["connections_open"] is stats["connections_opened"] is stats["connection_reuse_ratio"] is None
+
+    monkeypatch.setattr(ollama_http, "pool", pool)
+    text = metrics.registry.render()
+    assert "ollama_http_connections{" not in text
+    assert "\nollama_http_connection_reuse_ratio " not in text
+
+
+def test_create_embeddings_uses_the_shared_pool(ollama, pool, monkeypatch):
+    monkeypatch.setattr(ollama_http, "pool", pool)
+    create_embeddings(base_url=ollama.url).embed_query("question")
+    create_embeddings(base_url=ollama.url).embed_query("another question")
+    assert pool.stats()["requests"] == 2
+    assert ollama.stats()["connections"] == 1
+
+
+def test_ingestion_batches_are_retried_by_the_pool_only(ollama, pool, monkeypatch):
+    monkeypatch.setattr(ollama_http, "pool", pool)
+    ollama.fail_first = 10
+    embeddings = create_embeddings(base_url=ollama.url, engine_options={})
+    assert embeddings.embeddings.max_retries == 0
+    with pytest.raises(ResponseError):
+        embeddings.embed_documents(["chunk"])
+    assert ollama.stats()["requests"] == pool.retries + 1
+
+
+def test_engine_retries_when_the_pool_does_not(ollama, monkeypatch):
+    monkeypatch.setattr(ollama_http, "pool", OllamaHTTPPool(retries=0))
+    engine = create_embeddings(base_url=ollama.url, engine_options={}).embeddings
+    assert engine.max_retries == 3
+    ollama_http.pool.close()
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HTTP_MAX_CONNECTIONS", "4")
+    monkeypatch.setenv("OLLAMA_HTTP_READ_TIMEOUT", "7.5")
+    monkeypatch.setenv("OLLAMA_HTTP_RETRIES", "0")
+    pool = OllamaHTTPPool.from_env()
+    assert pool.limits.max_connections == 4
+    assert pool.timeout.read == 7.5
+    assert pool.retries == 0
+
+
+def test_benchmark_counts_connections_per_scenario(ollama):
+    results = run(ollama.url, "llama3", requests=4, concurrency=2, server=ollama)
+    assert results["sequential/rebuilt"]["connections"] == 4
+    assert results["sequential/no_keepalive"]["connections"] == 4
+    assert results["sequential/pooled"]["connections"] == 0
+    assert results["concurrent/pooled"]["connections"] <= 2
@@ -0,0 +1,95 @@
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from src.core import rag_pipeline
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.rag_pipeline import RAGChainManager
+
+
+class FakeChain:
+    def __init__(self, answer="fake answer"):
+        self.answer = answer
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return self.answer
+
+
+@pytest.fixture
+def build_counter(monkeypatch):
+    counts = {"vector_store": 0, "chain": 0}
+
+    def fake_load_vector_store(vectorstore_dir=None):
+        counts["vector_store"] += 1
+        return object()
+
+    def fake_create_rag_chain(vector_store=None):
+        counts["chain"] += 1
+        return FakeChain()
+
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", fake_load_vector_store)
+    monkeypatch.setattr(rag_pipeline, "create_rag_chain", fake_create_rag_chain)
+    return counts
+
+
+def test_chain_manager_builds_once(build_counter):
+    manager = RAGChainManager()
+    assert manager.state == RAGChainManager.NOT_LOADED
+    first = manager.get_chain()
+    second = manager.get_chain()
+    assert first is second
+    assert build_counter == {"vector_store": 1, "chain": 1}
+    assert manager.status()["ready"] is True
+
+
+def test_chain_manager_records_failure(monkeypatch):
+    def missing(vectorstore_dir=None):
+        raise FileNotFoundError("Vector store not found")
+
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", missing)
+    manager = RAGChainManager()
+    with pytest.raises(FileNotFoundError):
+        manager.load()
+    status = manager.status()
+    assert status["state"] == RAGChainManager.FAILED
+    assert status["ready"] is False
+    assert "Vector store not found" in status["error"]
+
+
+def test_chain_manager_reset_rebuilds(build_counter):
+    manager = RAGChainManager()
+    manager.load()
+    manager.reset()
+    assert manager.state == RAGChainManager.NOT_LOADED
+    manager.get_chain()
+    assert build_counter["chain"] == 2
+
+
+def test_answer_question_reuses_shared_chain(build_counter, monkeypatch):
+    monkeypatch.setattr(rag_pipeline, "chain_manager", RAGChainManager())
+    for _ in range(3):
+        result = rag_pipeline.answer_question("What Kubernetes experience do you have?")
+        assert result["success"] is True
+        assert result["answer"] == "fake answer"
+    assert build_counter == {"vector_store": 1, "chain": 1}
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+
+
+def test_repeated_question_is_served_from_answer_cache(monkeypatch):
+    chain = FakeChain("generated")
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", lambda vectorstore_dir=None: FakeVectorStore())
+    monkeypatch.setattr(rag_pipeline, "create_rag_chain", lambda vector_store=None: chain)
+    monkeypatch.setattr(rag_pipeline, "chain_manager", RAGChainManager())
+    monkeypatch.setattr(rag_pipeline, "answer_cache", SemanticAnswerCache())
+
+    first = rag_pipeline.answer_question("What Terraform work has he done?")
+    second = rag_pipeline.answer_question("What Terraform work has he done?")
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["answer"] == "generated"
+    assert len(chain.calls) == 1
+    assert chain.calls[0]["embedding"] is not None
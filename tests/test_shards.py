@@ -0,0 +1,86 @@
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+
+from src.core.context_packing import search_with_vectors
+from src.core.shards import SHARD_KEYWORDS, ShardSet, convert_faiss_to_shards, shard_for
+
+SOURCES = {
+    "Worked at Example Corp as a DevOps engineer.": {"category": "cv", "source": "data/cv/cv.md"},
+    "Podman runs rootless containers.": {"category": "podman", "source": "data/skills_md/pages/containers/podman/README.md"},
+    "Flux reconciles clusters from Git.": {"category": "gitops", "source": "data/skills_md/pages/gitops/flux.md"},
+    "Terraform provisions Azure resources.": {"category": "terraform", "source": "data/skills_md/pages/terraform/azurerm.md"},
+    "Glossary of DevOps terms.": {"category": "reference", "source": "data/skills_md/pages/reference/glossary.md"},
+    "Python scripting notes.": {"category": "pages", "source": "data/skills_md/pages/python.md"},
+}
+
+
+@pytest.fixture
+def faiss_store():
+    return FAISS.from_texts(list(SOURCES), DeterministicFakeEmbedding(size=16), metadatas=list(SOURCES.values()))
+
+
+@pytest.fixture
+def shard_set(faiss_store, tmp_path):
+    convert_faiss_to_shards(faiss_store, tmp_path / "shards")
+    return ShardSet.load(tmp_path / "shards", faiss_store.embeddings, fanout=10)
+
+
+def test_shard_for_groups_categories():
+    assert [shard_for(metadata) for metadata in SOURCES.values()] == [
+        "cv", "containers", "containers", "iac", "general", "general"
+    ]
+
+
+def test_shards_cover_every_chunk(faiss_store, shard_set):
+    assert len(shard_set) == faiss_store.index.ntotal
+    assert shard_set.stats() == {"containers": 2, "cv": 1, "general": 2, "iac": 1}
+
+
+def test_keywords_route_to_shards(faiss_store, shard_set):
+    embedding = faiss_store.embeddings.embed_query("Worked at Example Corp as a DevOps engineer.")
+    shard_set.fanout = 1
+    assert shard_set.route("Which companies has he worked for?", embedding) == ["cv"]
+    assert shard_set.route("How does he use Podman and Terraform?", embedding) == ["containers", "iac", "cv"]
+    shard_set.fanout = 2
+    assert len(shard_set.route("Tell me something", embedding)) == 2
+
+
+def test_keyword_questions_still_search_the_nearest_shard(faiss_store, shard_set):
+    shard_set.fanout = 1
+    query = faiss_store.embeddings.embed_query("Terraform provisions Azure resources.")
+    assert shard_set.route("How does he manage secrets in his Kubernetes platform?", query) == ["containers", "iac"]
+    hits = shard_set.search_with_vectors("What about Podman?", query, k=1)
+    assert [doc.page_content for doc, _ in hits] == ["Terraform provisions Azure resources."]
+
+
+def test_ambiguous_words_do_not_route():
+    for word in ("zero", "arm", "ai", "ci", "cd", "platform", "work", "experience", "history"):
+        assert not any(word in keywords for keywords in SHARD_KEYWORDS.values()), word
+
+
+def test_searching_all_shards_matches_whole_index(faiss_store, shard_set):
+    query = faiss_store.embeddings.embed_query("anything")
+    merged = shard_set.search_with_vectors("anything", query, k=4)
+    whole = search_with_vectors(faiss_store, query, 4)
+    assert [doc.page_content for doc, _ in merged] == [doc.page_content for doc, _ in whole]
+
+
+def test_routed_search_only_returns_routed_shards(faiss_store, shard_set):
+    shard_set.fanout = 1
+    query = faiss_store.embeddings.embed_query("Podman runs rootless containers.")
+    hits = shard_set.search_with_vectors("podman setup", query, k=10)
+    assert {shard_for(doc.metadata) for doc, _ in hits} == {"containers"}
+
+
+def test_shards_match_only_the_store_they_were_split_from(faiss_store, shard_set):
+    assert shard_set.matches(faiss_store)
+    texts = list(SOURCES)
+    texts[1] = "Podman runs rootful containers."
+    edited = FAISS.from_texts(texts, faiss_store.embeddings, metadatas=list(SOURCES.values()))
+    assert edited.index.ntotal == len(shard_set)
+    assert not shard_set.matches(edited)
+
+
+def test_missing_shards_load_as_none(tmp_path):
+    assert ShardSet.load(tmp_path / "missing") is None
@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+
+from src.core import rag_pipeline
+from src.core.rag_pipeline import RAGChainManager
+from src.core.single_flight import SingleFlight, StreamFlight, normalize_question
+from src.core.tracing import RequestTrace, traced
+
+
+def test_normalize_question():
+    assert normalize_question("  What is   GitOps? ") == normalize_question("what is gitops")
+    assert normalize_question("What is GitOps?") != normalize_question("What is DevOps?")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flights.run("key", compute) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+    await flights.run("key", compute)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_and_cancelled_waiter_does_not_cancel_others():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    impatient = asyncio.create_task(asyncio.wait_for(flights.run("slow", slow), timeout=0.01))
+    patient = asyncio.create_task(flights.run("slow", slow))
+    with pytest.raises(asyncio.TimeoutError):
+        await impatient
+    assert await patient == "done"
+
+
+@pytest.mark.asyncio
+async def test_computation_is_cancelled_when_every_caller_left():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def compute():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(flights.run("key", compute), timeout=0.01)
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+async def ticker(opened, count=5, delay=0.02):
+    opened.append(1)
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield i
+
+
+@pytest.mark.asyncio
+async def test_stream_subscribers_share_one_stream_and_late_ones_replay():
+    flights = StreamFlight()
+    opened = []
+
+    async def collect(delay=0.0):
+        await asyncio.sleep(delay)
+        return [event async for event in flights.subscribe("key", lambda: ticker(opened))]
+
+    results = await asyncio.gather(collect(), collect(0.05), collect(0.01))
+    assert results == [[0, 1, 2, 3, 4]] * 3
+    assert len(opened) == 1
+    assert flights.stats() == {"leaders": 1, "coalesced": 2, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_followers_are_marked_on_their_traces():
+    flights = SingleFlight()
+    streams = StreamFlight()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return "answer"
+
+    async def ask(trace):
+        with traced(trace):
+            return await flights.run("key", compute)
+
+    async def stream(trace):
+        with traced(trace):
+            return [event async for event in streams.subscribe("key", lambda: ticker([]))]
+
+    leader, follower = RequestTrace(), RequestTrace()
+    calls = [asyncio.ensure_future(ask(leader))]
+    await asyncio.sleep(0)
+    calls.append(asyncio.ensure_future(ask(follower)))
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*calls) == ["answer", "answer"]
+    assert "coalesced" not in leader.attributes
+    assert follower.attributes == {"coalesced": True, "leader_trace_id": leader.trace_id}
+
+    leader, follower = RequestTrace(), RequestTrace()
+    await asyncio.gather(stream(leader), stream(follower))
+    assert "coalesced" not in leader.attributes
+    assert follower.attributes == {"coalesced": True, "leader_trace_id": leader.trace_id}
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_when_last_subscriber_leaves():
+    flights = StreamFlight()
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "tick"
+        finally:
+            closed.set()
+
+    events = flights.subscribe("key", endless)
+    assert await events.__anext__() == "tick"
+    await events.aclose()
+    await asyncio.wait_for(closed.wait(), timeout=1)
+    assert flights.stats()["in_flight"] == 0
+
+
+class CountingChain:
+    """Fake RAG chain counting generations."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        await asyncio.sleep(0.1)
+        return f"answer to {inputs['question']}"
+
+    async def astream(self, inputs):
+        self.calls += 1
+        for token in ["answer ", "to ", inputs["question"]]:
+            await asyncio.sleep(0.03)
+            yield token
+
+
+@pytest.fixture
+def counting_chain(monkeypatch):
+    chain = CountingChain()
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", lambda vectorstore_dir=None: object())
+    monkeypatch.setattr(rag_pipeline, "create_rag_chain", lambda vector_store=None: chain)
+    monkeypatch.setattr(rag_pipeline, "chain_manager", RAGChainManager())
+    monkeypatch.setattr(rag_pipeline, "answer_flights", SingleFlight())
+    monkeypatch.setattr(rag_pipeline, "stream_flights", StreamFlight())
+    return chain
+
+
+@pytest.mark.asyncio
+async def test_identical_questions_share_one_generation(counting_chain):
+    questions = ["What is GitOps?", "what is gitops", "What is  GitOps ?"]
+    results = await asyncio.gather(*(rag_pipeline.answer_question_async(q) for q in questions))
+    assert counting_chain.calls == 1
+    assert [r["question"] for r in results] == questions
+    assert {r["answer"] for r in results} == {"answer to What is GitOps?"}
+    assert rag_pipeline.answer_flights.stats()["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_streams_share_one_generation(counting_chain):
+    async def collect(question, delay=0.0):
+        await asyncio.sleep(delay)
+        return [event async for event in rag_pipeline.astream_answer(question)]
+
+    first, second = await asyncio.gather(collect("Explain Flux"), collect("explain flux", 0.05))
+    assert counting_chain.calls == 1
+    assert [e["text"] for e in first if e["type"] == "token"] == [e["text"] for e in second if e["type"] == "token"]
+    assert (first[-1]["question"], second[-1]["question"]) == ("Explain Flux", "explain flux")
+    assert rag_pipeline.stream_flights.stats()["coalesced"] == 1
@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+
+from src.api.main import app
+from src.core import rag_pipeline, tracing
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.metrics import Histogram
+from src.core.single_flight import SingleFlight
+from src.scripts.fake_ollama import FakeOllamaServer
+
+
+def test_stages_are_recorded_in_the_current_trace_only():
+    histogram = Histogram("test_stage_seconds", "Test.")
+    with tracing.stage("outside", histogram):
+        tracing.annotate(ignored=True)
+    trace = tracing.RequestTrace("POST", "/api/ask")
+    with tracing.traced(trace):
+        with tracing.stage("search", histogram) as details:
+            details["candidates"] = 3
+        tracing.annotate(intent="rag")
+    trace.finish(200)
+    assert histogram.count() == 2
+    assert [(s["name"], s["candidates"]) for s in trace.stages] == [("search", 3)]
+    assert trace.to_dict()["intent"] == "rag"
+    assert trace.server_timing().startswith("search;dur=")
+    assert trace.server_timing().endswith(f"total;dur={trace.total_ms:.1f}")
+
+
+def test_sampling_keeps_failed_and_slow_requests():
+    trace = tracing.RequestTrace()
+    trace.finish(200)
+    assert not tracing.should_log(trace, sample_rate=0.0, slow_ms=1000)
+    assert tracing.should_log(trace, sample_rate=1.0, slow_ms=1000)
+    assert tracing.should_log(trace, sample_rate=0.0, slow_ms=0)
+    trace.status = 503
+    assert tracing.should_log(trace, sample_rate=0.0, slow_ms=1000)
+
+
+def test_traces_are_written_by_the_background_listener(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    output = io.StringIO()
+    trace_logging = tracing.TraceLogging(logging.StreamHandler(output))
+    trace_logging.start()
+    try:
+        trace = tracing.RequestTrace("GET", "/api/x")
+        trace.finish(200)
+        tracing.emit(trace)
+    finally:
+        trace_logging.stop()
+    assert json.loads(output.getvalue())["trace_id"] == trace.trace_id
+
+
+@pytest.fixture
+def real_chain(monkeypatch, tmp_path):
+    docs = [Document(page_content=f"{name} experience in production", metadata={"source": f"{name}.md"}) for name in ["Flux", "Terraform", "Kubernetes"]]
+    store = FAISS.from_documents(docs, DeterministicFakeEmbedding(size=16))
+    monkeypatch.setattr(rag_pipeline, "LEXICAL_INDEX_PATH", tmp_path / "missing.pkl")
+    monkeypatch.setattr(rag_pipeline, "SHARDS_DIR", tmp_path / "shards")
+    monkeypatch.setattr(rag_pipeline, "load_vector_store", lambda vectorstore_dir=None: store)
+    monkeypatch.setattr(rag_pipeline, "answer_cache", SemanticAnswerCache(enabled=False))
+    monkeypatch.setattr(rag_pipeline, "answer_flights", SingleFlight())
+    with FakeOllamaServer(response_tokens=8) as server:
+        monkeypatch.setenv("OLLAMA_BASE_URL", server.url)
+        manager = rag_pipeline.chain_manager
+        manager.reset()
+        manager.load()
+        yield store
+        manager.reset()
+
+
+@pytest.mark.asyncio
+async def test_api_responses_carry_server_timing_without_dumping_context(real_chain, capsys):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/api/ask", json={"query": "Tell me about Flux"})
+        health = await ac.get("/health")
+    assert response.json()["status"] == "success"
+    names = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert names == ["embed", "search", "pack", "format", "llm_ttft", "llm", "total"]
+    assert len(response.headers["x-trace-id"]) == 16
+    assert "server-timing" not in health.headers
+    assert "experience in production" not in capsys.readouterr().out
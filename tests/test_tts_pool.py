@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.backend.api import tts
+from src.backend.audio_cache import AudioCache
+from src.backend.tts_pool import WARMUP_TEXT, TTSQueueFull, TTSWorkerPool
+
+
+class FakeModel:
+    """Stands in for a Coqui model; records what it synthesized."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.texts = []
+
+
+def make_pool(delay=0.0, models=None, **kwargs):
+    models = [] if models is None else models
+
+    def factory():
+        model = FakeModel(delay)
+        models.append(model)
+        return model
+
+    def synthesize(model, text):
+        model.texts.append(text)
+        time.sleep(model.delay)
+        return f"RIFF{text}".encode()
+
+    return TTSWorkerPool(model_factory=factory, synthesize_fn=synthesize, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_workers_preload_and_warm_up_models():
+    models = []
+    pool = make_pool(models=models, workers=2, warmup=True)
+    pool.start()
+    for _ in range(100):
+        if pool.stats()["ready_workers"] == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert [model.texts for model in models] == [[WARMUP_TEXT], [WARMUP_TEXT]]
+    assert await pool.synthesize("Hello") == b"RIFFHello"
+    assert len(models) == 2
+    pool.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_synthesis_does_not_block_the_event_loop():
+    pool = make_pool(delay=0.5)
+    task = asyncio.create_task(pool.synthesize("Hello"))
+    started = time.perf_counter()
+    await asyncio.sleep(0.05)
+    assert time.perf_counter() - started < 0.3
+    assert await task == b"RIFFHello"
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected():
+    pool = make_pool(delay=0.3, workers=1, queue_size=1)
+    first = asyncio.create_task(pool.synthesize("one"))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(pool.synthesize("two"))
+    await asyncio.sleep(0)
+    with pytest.raises(TTSQueueFull) as excinfo:
+        await pool.synthesize("three")
+    assert excinfo.value.retry_after >= 1
+    assert await asyncio.gather(first, second) == [b"RIFFone", b"RIFFtwo"]
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_queued_request_is_skipped():
+    models = []
+    pool = make_pool(delay=0.3, models=models, workers=1)
+    first = asyncio.create_task(pool.synthesize("one"))
+    await asyncio.sleep(0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.synthesize("two", timeout=0.05)
+    await first
+    pool.shutdown(wait=True)
+    assert models[0].texts == ["one"]
+    assert pool.stats()["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_endpoint_returns_503_with_retry_after(monkeypatch, tmp_path):
+    release = threading.Event()
+    pool = TTSWorkerPool(workers=1, queue_size=1, timeout=5, model_factory=FakeModel,
+                         synthesize_fn=lambda model, text: release.wait(5) and b"RIFF")
+    monkeypatch.setattr(tts, "tts_pool", pool)
+    monkeypatch.setattr(tts, "audio_cache", AudioCache(tmp_path))
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api")
+    busy = []
+    for text in ("one", "two"):
+        busy.append(asyncio.create_task(pool.synthesize(text)))
+        await asyncio.sleep(0.05)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/api/tts", json={"text": "three"})
+    release.set()
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+    assert await asyncio.gather(*busy) == [b"RIFF", b"RIFF"]
+    pool.shutdown()
@@ -0,0 +1,141 @@
+import io
+import struct
+import time
+import wave
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.backend import audio
+from src.backend.api import tts
+from src.backend.audio_cache import AudioCache
+from src.backend.tts_pool import TTSWorkerPool
+
+SAMPLE_RATE = 16000
+
+
+class FakeCoquiModel:
+    """Mimics ``TTS.api.TTS``: 100 samples per character, optionally slow."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.synthesizer = SimpleNamespace(output_sample_rate=SAMPLE_RATE)
+        self.sentences = []
+
+    def tts(self, text):
+        self.sentences.append(text)
+        time.sleep(self.delay)
+        return [0.5] * (100 * len(text))
+
+
+def test_split_sentences():
+    text = "Hello there. How are you?\n\n- Terraform; Azure\n---\nDone!"
+    assert audio.split_sentences(text) == ["Hello there.", "How are you?", "- Terraform;", "Azure", "Done!"]
+
+
+def test_synthesize_wav_in_memory():
+    data = audio.synthesize_wav(FakeCoquiModel(), "Hi.")
+    with wave.open(io.BytesIO(data)) as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth(), wav.getnframes()) == (SAMPLE_RATE, 1, 2, 300)
+        assert struct.unpack("<h", wav.readframes(1)) == (16383,)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_each_sentence_as_it_is_synthesized():
+    pool = TTSWorkerPool(model_factory=lambda: FakeCoquiModel(delay=0.2))
+    started = time.perf_counter()
+    pieces = pool.stream("One. Two. Three.")
+    sample_rate, first = await pieces.__anext__()
+    assert time.perf_counter() - started < 0.4
+    assert (sample_rate, len(first)) == (SAMPLE_RATE, 2 * 100 * len("One."))
+    rest = [pcm async for _, pcm in pieces]
+    assert [len(pcm) for pcm in rest] == [800, 1200]
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_stops_synthesis():
+    models = []
+    pool = TTSWorkerPool(model_factory=lambda: models.append(FakeCoquiModel(delay=0.1)) or models[-1])
+    pieces = pool.stream("One. Two. Three. Four. Five.")
+    await pieces.__anext__()
+    await pieces.aclose()
+    pool.shutdown(wait=True)
+    assert len(models[0].sentences) < 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["wav", "pcm"])
+async def test_stream_endpoint(monkeypatch, tmp_path, fmt):
+    pool = TTSWorkerPool(model_factory=FakeCoquiModel)
+    monkeypatch.setattr(tts, "tts_pool", pool)
+    monkeypatch.setattr(tts, "audio_cache", AudioCache(tmp_path))
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/api/tts/stream", json={"text": "Hello. World!", "format": fmt})
+    pool.shutdown()
+    assert response.status_code == 200
+    assert response.headers["x-sample-rate"] == str(SAMPLE_RATE)
+    pcm_size = 2 * 100 * len("Hello.World!")
+    if fmt == "wav":
+        assert response.headers["content-type"] == "audio/wav"
+        assert response.content[:4] == b"RIFF"
+        assert len(response.content) == 44 + pcm_size
+    else:
+        assert response.headers["content-type"].startswith("audio/L16")
+        assert len(response.content) == pcm_size
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_rejects_unspeakable_text(monkeypatch, tmp_path):
+    pool = TTSWorkerPool(model_factory=FakeCoquiModel)
+    monkeypatch.setattr(tts, "tts_pool", pool)
+    monkeypatch.setattr(tts, "audio_cache", AudioCache(tmp_path))
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/api/tts/stream", json={"text": "---"})
+        invalid = await ac.post("/api/tts/stream", json={"text": "Hi.", "format": "mp3"})
+    pool.shutdown()
+    assert response.status_code == 400
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_completed_stream_is_cached(monkeypatch, tmp_path):
+    models = []
+    pool = TTSWorkerPool(model_factory=lambda: models.append(FakeCoquiModel()) or models[-1])
+    monkeypatch.setattr(tts, "tts_pool", pool)
+    monkeypatch.setattr(tts, "audio_cache", AudioCache(tmp_path))
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        streamed = await ac.post("/api/tts/stream", json={"text": "Hello. World!", "format": "pcm"})
+        cached = await ac.post("/api/tts/stream", json={"text": "Hello. World!", "format": "pcm"})
+        whole = await ac.post("/api/tts", json={"text": "Hello. World!"})
+    pool.shutdown()
+    assert models[0].sentences == ["Hello.", "World!"]
+    assert cached.content == streamed.content
+    assert cached.headers["x-sample-rate"] == str(SAMPLE_RATE)
+    assert whole.content[44:] == streamed.content
+
+
+@pytest.mark.asyncio
+async def test_cached_wav_with_extra_chunks_streams_its_frames(monkeypatch, tmp_path):
+    pcm = audio.to_pcm16([0.25] * 300)
+    fmt = struct.pack("<HHIIHH", 1, 1, 22050, 22050 * 2, 2, 16)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"LIST" + struct.pack("<I", 4) + b"INFO"
+    chunks += b"data" + struct.pack("<I", len(pcm)) + pcm
+    cache = AudioCache(tmp_path)
+    cache.put(tts.audio_cache_key("Hello.", model=tts.TTS_MODEL_NAME), b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+    monkeypatch.setattr(tts, "audio_cache", cache)
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/api/tts/stream", json={"text": "Hello.", "format": "pcm"})
+    assert response.headers["x-sample-rate"] == "22050"
+    assert response.content == pcm
+    assert audio.read_wav(audio.wav_header(22050, len(pcm)) + pcm) == (22050, pcm)